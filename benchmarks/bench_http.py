@@ -0,0 +1,125 @@
+"""Time the NodeNorm client and the investigation page against recorded responses.
+
+Record a cassette once on a machine that can reach NodeNorm, then replay it
+anywhere (e.g. an offline CI box) so timings only reflect our own code, or
+the recorded network latency with --latency 1.
+
+Usage:
+    python benchmarks/bench_http.py --record benchmarks/pairs.cassette.json
+    python benchmarks/bench_http.py benchmarks/pairs.cassette.json [--latency 0] [--runs 5] [--json]
+
+Pairs come from --database (default: nn_investigator.db), which is copied
+so the benchmark never writes to it.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.nn_investigator import database, nodenorm, transport  # noqa: E402
+from src.nn_investigator.app import create_app  # noqa: E402
+from src.nn_investigator.config import load_config  # noqa: E402
+
+
+def copy_database(source: str, target: str) -> None:
+    """Copy a SQLite database, including anything still in its WAL."""
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(target)
+    src.backup(dst)
+    src.close()
+    dst.close()
+
+
+def run_workload(pairs: list[dict], client) -> dict[str, list[float]]:
+    """Normalize every pair through the client and render its page; returns per-call seconds."""
+    timings = {"client": [], "page": []}
+
+    for pair in pairs:
+        start = time.perf_counter()
+        nodenorm.normalize_curies([pair["curie_1"], pair["curie_2"]])
+        timings["client"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        response = client.get(f"/pair/{pair['id']}")
+        response.get_data()  # the page is streamed; time the whole body
+        timings["page"].append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f"/pair/{pair['id']} returned {response.status_code}")
+
+    return timings
+
+
+def summarize(seconds: list[float]) -> dict:
+    ordered = sorted(seconds)
+    return {
+        "calls": len(ordered),
+        "median_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "total_ms": sum(ordered) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cassette", help="Cassette file to replay (or write with --record)")
+    parser.add_argument("--record", action="store_true", help="Call the live services and record the cassette")
+    parser.add_argument("--latency", type=float, default=0.0, help="Replay latency as a multiple of the recorded one (default: 0)")
+    parser.add_argument("--runs", type=int, default=5, help="Replays of the whole workload (default: 5)")
+    parser.add_argument("--pairs", type=int, default=30, help="Maximum number of pairs to use (default: 30)")
+    parser.add_argument("--database", default="nn_investigator.db", help="Database to take pairs from")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object instead of a table")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    db_path = os.path.join(workdir, "bench.db")
+    copy_database(args.database, db_path)
+
+    # Always go to the client (no cache) so every page render exercises it
+    app = create_app({
+        **load_config({}),
+        "DATABASE": db_path,
+        "CACHE_DATABASE": os.path.join(workdir, "cache.db"),
+        "NORMALIZATION_BACKENDS": "remote",
+        "JOB_WORKERS": 0,
+        "TESTING": True,
+    })
+    pairs = database.get_all_pairs(db_path)[:args.pairs]
+    client = app.test_client()
+    cassette = transport.Cassette(args.cassette)
+
+    if args.record:
+        with transport.use_transport(transport.RecordingTransport(cassette)):
+            run_workload(pairs, client)
+        cassette.save()
+        print(f"Recorded {len(cassette)} responses for {len(pairs)} pairs to {args.cassette}")
+        return
+
+    timings = {"client": [], "page": []}
+    for _ in range(args.runs):
+        with transport.use_transport(transport.ReplayTransport(transport.Cassette(args.cassette), latency=args.latency)):
+            for name, seconds in run_workload(pairs, client).items():
+                timings[name].extend(seconds)
+
+    results = {name: summarize(seconds) for name, seconds in timings.items()}
+
+    if args.json:
+        print(json.dumps({"pairs": len(pairs), "runs": args.runs, "latency": args.latency, "results": results}))
+        return
+
+    print(f"{'path':<8} {'calls':>6} {'median ms':>10} {'p95 ms':>8} {'total ms':>10}")
+    for name, result in results.items():
+        print(f"{name:<8} {result['calls']:>6} {result['median_ms']:>10.2f} {result['p95_ms']:>8.2f} {result['total_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Measure cold-start import time of the app and the batch tools.
+
+Each module is imported in a fresh interpreter several times and the median
+wall time is reported, together with whether Flask and requests were loaded.
+
+Usage:
+    python benchmarks/bench_import.py [--runs N]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = [
+    "src.nn_investigator.app",
+    "src.nn_investigator.cli",
+    "src.nn_investigator.database",
+]
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, "flask" in sys.modules, "requests" in sys.modules)
+"""
+
+
+def measure(module: str, runs: int) -> tuple[float, bool, bool]:
+    """Import a module in fresh interpreters and return (median seconds, flask loaded, requests loaded)."""
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.split()
+        timings.append(float(output[0]))
+
+    return statistics.median(timings), output[1] == "True", output[2] == "True"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="Imports per module (default: 10)")
+    args = parser.parse_args()
+
+    print(f"{'module':<32} {'median ms':>10} {'flask':>6} {'requests':>9}")
+    for module in MODULES:
+        seconds, flask_loaded, requests_loaded = measure(module, args.runs)
+        print(f"{module:<32} {seconds * 1000:>10.1f} {str(flask_loaded):>6} {str(requests_loaded):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""Gunicorn settings for serving NN Investigator in production.
+
+All settings can be overridden through environment variables, e.g.
+NN_INVESTIGATOR_WORKERS=8 NN_INVESTIGATOR_THREADS=16.
+"""
+
+import multiprocessing
+import os
+
+
+bind = os.environ.get("NN_INVESTIGATOR_BIND", "0.0.0.0:8000")
+
+# Several processes, each with a thread pool, so a request blocked on a slow
+# NodeNorm call does not hold up other evaluators.
+worker_class = "gthread"
+workers = int(os.environ.get("NN_INVESTIGATOR_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("NN_INVESTIGATOR_THREADS", 4))
+timeout = int(os.environ.get("NN_INVESTIGATOR_WORKER_TIMEOUT", 60))
+
+# Run create_app (and its database initialization) once in the master
+# process rather than concurrently in every worker.
+preload_app = True
+
+accesslog = "-"
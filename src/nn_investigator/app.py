@@ -1,29 +1,134 @@
 """Flask application for NN Investigator."""
 
-from flask import Flask, render_template, request, redirect, url_for, flash
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Optional
+
+from flask import (
+    Flask, Response, abort, flash, g, get_flashed_messages, jsonify, redirect, render_template, request, session,
+    stream_with_context, url_for
+)
 from . import database
-from . import nodenorm
+from . import identifiers
+from . import overlap
+from . import triage
+from .cache import SQLiteCache
+from .config import load_config
 from .linkouts import get_curie_url
 
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
+    from .backends import NormalizationBackend
+    from .nodenorm import NormalizationResult
+
+# The HTTP clients (and requests) are imported on first use rather than here,
+# so that starting a worker or importing the app in tests stays cheap.
 
 app = Flask(__name__, template_folder="../../templates", static_folder="../../static")
-app.config["SECRET_KEY"] = "dev-secret-key-change-in-production"
+app.config.update(load_config({}))
 
 # Register the linkout function as a template filter
 app.jinja_env.globals.update(get_curie_url=get_curie_url)
 
 
+def _db_path() -> str:
+    """Path of the database configured for this app."""
+    return app.config["DATABASE"]
+
+
+def _get_cache() -> SQLiteCache:
+    """Get the shared response cache for the configured cache database."""
+    caches = app.extensions.setdefault("nn_investigator_caches", {})
+    path = app.config["CACHE_DATABASE"]
+    if path not in caches:
+        caches[path] = SQLiteCache(path, ttl=app.config["CACHE_TTL"])
+    return caches[path]
+
+
+# Rendered pages keyed by (endpoint, database, data version). Entries are
+# only valid for the data version they were built from, so a write in any
+# worker invalidates them everywhere.
+_page_cache: dict[tuple, tuple[bytes, dict]] = {}
+_page_cache_lock = threading.Lock()
+
+
+def _versioned_response(build: Callable[[], Response]) -> Response:
+    """
+    Serve a page that only depends on the database contents.
+
+    Responses carry an ETag derived from the data version, so browsers that
+    already have the current page get a 304. Otherwise the rendered page is
+    served from memory until the next write.
+    """
+    # Flash messages are per-user and rendered into the page, so skip caching
+    if session.get("_flashes"):
+        return build()
+
+    version = database.get_data_version(db_path=_db_path())
+    etag = f"{request.endpoint}-{version}"
+
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        key = (request.endpoint, _db_path(), version)
+        cached = _page_cache.get(key)
+
+        if cached is None:
+            built = build()
+            cached = (built.get_data(), dict(built.headers))
+            with _page_cache_lock:
+                for stale_key in [k for k in _page_cache if k[:2] == key[:2]]:
+                    del _page_cache[stale_key]
+                _page_cache[key] = cached
+
+        body, headers = cached
+        response = Response(body, headers=headers)
+
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
 @app.route("/")
 def index():
     """Landing page showing all entity pairs."""
-    pairs = database.get_all_pairs()
-    return render_template("index.html", pairs=pairs)
+    def build():
+        pairs = database.get_all_pairs(db_path=_db_path())
+
+        # Pairs involving the same clique are listed together, ahead of the rest
+        pairs_by_id = {pair["id"]: pair for pair in pairs}
+        groups = []
+        for group in triage.group_pairs(database.get_clique_members(db_path=_db_path())):
+            members = [pairs_by_id[pair_id] for pair_id in group["pair_ids"] if pair_id in pairs_by_id]
+            if len(members) > 1:
+                members.sort(key=lambda pair: pair["entity_name"])
+                groups.append({"preferred_ids": group["preferred_ids"], "pairs": members})
+        grouped_ids = {pair["id"] for group in groups for pair in group["pairs"]}
+
+        return Response(render_template(
+            "index.html",
+            pairs=pairs,
+            groups=groups,
+            ungrouped=[pair for pair in pairs if pair["id"] not in grouped_ids]
+        ))
+
+    return _versioned_response(build)
 
 
 @app.route("/export")
 def export_markdown():
     """Export all pairs to markdown table format."""
-    pairs = database.get_all_pairs()
+    return _versioned_response(_build_markdown_export)
+
+
+def _build_markdown_export() -> Response:
+    """Build the markdown table download for all pairs."""
+    pairs = database.get_all_pairs(db_path=_db_path())
 
     # Build markdown table
     md_lines = []
@@ -45,7 +150,6 @@ def export_markdown():
     markdown_content = "\n".join(md_lines)
 
     # Return as downloadable file
-    from flask import Response
     return Response(
         markdown_content,
         mimetype="text/markdown",
@@ -53,83 +157,782 @@ def export_markdown():
     )
 
 
+# Config keys that determine how the normalization backend is built
+BACKEND_CONFIG_KEYS = ("NORMALIZATION_BACKENDS", "NODENORM_URL", "LOCAL_INDEX", "REPLAY_FIXTURE", "CACHE_DATABASE", "CACHE_TTL")
+
+
+def _get_backend() -> "NormalizationBackend":
+    """Get the normalization backend described by the app config."""
+    from .backends import build_backend
+
+    backends = app.extensions.setdefault("nn_investigator_backends", {})
+    key = tuple(app.config[name] for name in BACKEND_CONFIG_KEYS)
+    if key not in backends:
+        backends[key] = build_backend(app.config, _get_cache())
+    return backends[key]
+
+
+def _upstream_errors() -> tuple:
+    """Exception types meaning an upstream service could not be reached."""
+    import requests
+    from .resilience import CircuitOpenError
+
+    return (requests.RequestException, CircuitOpenError)
+
+
+def _normalize_pair(pair: dict) -> tuple["NormalizationResult", Optional[str]]:
+    """
+    Normalize both CURIEs of a pair through the configured backend.
+
+    Returns:
+        The normalization result (empty on failure, or only the cached CURIEs
+        if the rest could not be fetched) and an error message if the upstream could not be reached
+    """
+    from .nodenorm import NormalizationResult
+
+    try:
+        norm_result = _get_backend().normalize_curies(
+            [pair["curie_1"], pair["curie_2"]],
+            conflate=True,
+            drug_chemical_conflate=True
+        )
+    except _upstream_errors() as e:
+        return NormalizationResult(), str(e)
+
+    if not isinstance(norm_result, NormalizationResult):
+        norm_result = NormalizationResult(norm_result)
+    # Cached entries survive a partial outage; the rest of the pair is unknown
+    return norm_result, norm_result.error
+
+
 @app.route("/pair/<int:pair_id>", methods=["GET", "POST"])
 def investigate_pair(pair_id):
     """Investigation page for a specific entity pair."""
-    pair = database.get_pair(pair_id)
+    pair = database.get_pair(pair_id, db_path=_db_path())
 
     if not pair:
         flash("Pair not found", "error")
         return redirect(url_for("index"))
 
+    status = 200
+    form_evaluation = pair["evaluation"]
+    form_evaluation_notes = pair["evaluation_notes"]
+
     # Handle evaluation submission
     if request.method == "POST":
         evaluation = request.form.get("evaluation")
         evaluation_notes = request.form.get("evaluation_notes")
+        expected_version = request.form.get("evaluation_version", type=int)
 
         if evaluation:
-            database.update_evaluation(pair_id, evaluation, evaluation_notes or None)
-            flash("Evaluation saved", "success")
-            return redirect(url_for("investigate_pair", pair_id=pair_id))
+            try:
+                database.update_evaluation(
+                    pair_id,
+                    evaluation,
+                    evaluation_notes or None,
+                    expected_version=expected_version,
+                    db_path=_db_path()
+                )
+            except database.EvaluationConflictError as e:
+                # Someone else saved first: show their evaluation but keep ours in the form
+                current = e.current or {}
+                flash(
+                    f"This pair was re-evaluated as \"{current.get('evaluation')}\" while you were editing. "
+                    "Review the latest evaluation and save again to overwrite it.",
+                    "error"
+                )
+                pair = database.get_pair(pair_id, db_path=_db_path())
+                form_evaluation = evaluation
+                form_evaluation_notes = evaluation_notes
+                status = 409
+            else:
+                flash("Evaluation saved", "success")
+                return redirect(url_for("investigate_pair", pair_id=pair_id))
         else:
             flash("Please select an evaluation", "error")
 
-    # Normalize both CURIEs
-    norm_result = nodenorm.normalize_curies(
-        [pair["curie_1"], pair["curie_2"]],
-        conflate=True,
-        drug_chemical_conflate=True
+    # Get all pair IDs for navigation
+    all_pairs = database.get_all_pairs(db_path=_db_path())
+    pair_ids = [p["id"] for p in all_pairs]
+
+    # Find previous and next pair IDs
+    try:
+        current_index = pair_ids.index(pair_id)
+        prev_id = pair_ids[current_index - 1] if current_index > 0 else None
+        next_id = pair_ids[current_index + 1] if current_index < len(pair_ids) - 1 else None
+    except ValueError:
+        prev_id = None
+        next_id = None
+
+    context = dict(
+        pair=pair,
+        prev_id=prev_id,
+        next_id=next_id,
+        form_evaluation=form_evaluation,
+        form_evaluation_notes=form_evaluation_notes,
+        evaluation_history=database.get_evaluation_history(pair_id, db_path=_db_path()),
+        evaluations=triage.EVALUATIONS
     )
 
+    # Stream GET pages: the database fields are sent while NodeNorm is still answering
+    if request.method == "GET" and request.args.get("stream") != "0":
+        analyze = _analyze_pair
+        if "profile" in g:
+            analyze = g.profile.follow(analyze)
+        pending = _background_executor().submit(analyze, pair)
+        return _stream_template("investigate.html", pending, analysis=pending.result, **context)
+
+    analysis = _analyze_pair(pair)
+    if analysis["upstream_error"] and status == 200:
+        status = 503
+
+    return render_template("investigate.html", analysis=lambda: analysis, **context), status
+
+
+def _analyze_pair(pair: dict) -> dict:
+    """
+    Analyze a pair for the investigation page (see _build_analysis).
+
+    Never raises: a streamed page has already been sent with a 200 by the
+    time this finishes, so any failure is returned as upstream_error for the
+    page's banner instead of cutting the page off.
+    """
+    try:
+        return _build_analysis(pair)
+    except Exception as e:
+        app.logger.exception("Could not analyze pair %s", pair["id"])
+        return {
+            "curie_1_data": None,
+            "curie_2_data": None,
+            "same_clique": False,
+            "different_types_cell_chemical": False,
+            "upstream_error": f"Could not analyze this pair ({type(e).__name__}: {e})",
+            "stale_since": None,
+            "prefix_counts": [],
+            "identifier_overlap": {},
+            "related_pairs": [],
+        }
+
+
+def _build_analysis(pair: dict) -> dict:
+    """Normalize a pair and work out everything the investigation page shows about its cliques."""
+    # Normalize both CURIEs, falling back to stale cached results if the upstream is down
+    norm_result, upstream_error = _normalize_pair(pair)
+
+    stale_since = None
+    if norm_result.stale:
+        stale_since = datetime.fromtimestamp(norm_result.fetched_at).strftime("%Y-%m-%d %H:%M")
+
     # Extract normalization data
     curie_1_data = norm_result.get(pair["curie_1"])
     curie_2_data = norm_result.get(pair["curie_2"])
 
-    # Check if they normalize to the same preferred ID
-    same_clique = False
-    different_types_cell_chemical = False
+    # Check if they normalize to the same preferred ID, and for Cell vs ChemicalEntity
+    snapshot = triage.build_snapshot(pair, norm_result)
+
+    # Keep the triage view and the clique membership index up to date with what was just seen
+    if not upstream_error:
+        try:
+            database.save_snapshots([snapshot], db_path=_db_path())
+        except sqlite3.Error:
+            # e.g. the database is locked by a bulk job; the page does not depend on it
+            app.logger.warning("Could not save the clique snapshot of pair %s", pair["id"], exc_info=True)
+
+    return {
+        "curie_1_data": curie_1_data,
+        "curie_2_data": curie_2_data,
+        "same_clique": snapshot["same_clique"],
+        "different_types_cell_chemical": triage.is_cell_chemical_mismatch(curie_1_data, curie_2_data),
+        "upstream_error": upstream_error,
+        "stale_since": stale_since,
+        # Equivalent identifiers are loaded on demand; render only their summary
+        "prefix_counts": identifiers.compare_prefixes(curie_1_data, curie_2_data),
+        "identifier_overlap": overlap.analyze_overlap(curie_1_data, curie_2_data),
+        "related_pairs": database.get_related_pairs(pair["id"], db_path=_db_path()),
+    }
+
+
+_background_lock = threading.Lock()
+
+
+def _background_executor() -> "ThreadPoolExecutor":
+    """Thread pool for upstream calls that run while a page is already streaming."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    with _background_lock:
+        # Created per process, since threads do not survive gunicorn forking workers
+        executors = app.extensions.setdefault("nn_investigator_background", {})
+        if os.getpid() not in executors:
+            executors[os.getpid()] = ThreadPoolExecutor(max_workers=8, thread_name_prefix="nn-investigator")
+        return executors[os.getpid()]
+
+
+def _stream_template(template_name: str, pending: "Future", **context) -> Response:
+    """
+    Stream a rendered template, sending what is ready while pending is still running.
+
+    Chunks are flushed one by one until pending finishes (so the browser can
+    show the top of the page while the template waits on its result) and are
+    batched after that.
+    """
+    # Consume flashed messages now: the session cookie is sent before the body
+    get_flashed_messages(with_categories=True)
+
+    template = app.jinja_env.get_template(template_name)
+    app.update_template_context(context)
+
+    def generate():
+        buffer = []
+        for chunk in template.generate(context):
+            buffer.append(chunk)
+            if not pending.done() or len(buffer) >= 100:
+                yield "".join(buffer)
+                buffer.clear()
+        yield "".join(buffer)
+
+    response = Response(stream_with_context(generate()), mimetype="text/html")
+    # Ask reverse proxies such as nginx not to hold the stream back
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _form_expected_versions(pair_ids: list[int]) -> dict[int, int]:
+    """The evaluation version the form saw for each pair (its version_<pair_id> field), where given."""
+    versions = {pair_id: request.form.get(f"version_{pair_id}", type=int) for pair_id in pair_ids}
+    return {pair_id: version for pair_id, version in versions.items() if version is not None}
+
+
+@app.route("/pair/<int:pair_id>/carry-over", methods=["POST"])
+def carry_over_evaluation(pair_id):
+    """Apply a pair's evaluation to selected pairs of its group (see get_related_pairs), in one transaction."""
+    pair = database.get_pair(pair_id, db_path=_db_path())
+    if not pair:
+        flash("Pair not found", "error")
+        return redirect(url_for("index"))
 
-    if curie_1_data and curie_2_data:
-        preferred_1 = curie_1_data.get("id", {}).get("identifier")
-        preferred_2 = curie_2_data.get("id", {}).get("identifier")
-        same_clique = preferred_1 == preferred_2
+    if not pair["evaluation"]:
+        flash("Save an evaluation for this pair before carrying it over", "error")
+        return redirect(url_for("investigate_pair", pair_id=pair_id))
 
-        # Check for different types: Cell vs ChemicalEntity
-        types_1 = set(curie_1_data.get("type", []))
-        types_2 = set(curie_2_data.get("type", []))
+    if request.form.get("evaluation_version", type=int) != pair["evaluation_version"]:
+        flash("This pair was re-evaluated in the meantime; review its evaluation before carrying it over.", "error")
+        return redirect(url_for("investigate_pair", pair_id=pair_id))
 
-        has_cell_1 = any("Cell" in t for t in types_1)
-        has_cell_2 = any("Cell" in t for t in types_2)
-        has_chemical_1 = any("Chemical" in t for t in types_1)
-        has_chemical_2 = any("Chemical" in t for t in types_2)
+    related = {related["id"] for related in database.get_related_pairs(pair_id, db_path=_db_path())}
+    pair_ids = [related_id for related_id in request.form.getlist("pair_id", type=int) if related_id in related]
+    if not pair_ids:
+        flash("Please select at least one related pair", "error")
+        return redirect(url_for("investigate_pair", pair_id=pair_id))
 
-        different_types_cell_chemical = (has_cell_1 and has_chemical_2) or (has_chemical_1 and has_cell_2)
+    expected_versions = _form_expected_versions(pair_ids)
+    notes = f"Carried over from pair #{pair_id} ({pair['entity_name']})"
+    if pair["evaluation_notes"]:
+        notes += f": {pair['evaluation_notes']}"
 
-    # Get all pair IDs for navigation
-    all_pairs = database.get_all_pairs()
-    pair_ids = [p["id"] for p in all_pairs]
+    try:
+        updated = database.bulk_update_evaluation(
+            pair_ids,
+            pair["evaluation"],
+            notes,
+            expected_versions=expected_versions,
+            db_path=_db_path()
+        )
+    except database.EvaluationConflictError as e:
+        flash(f"Pair {e.pair_id} was re-evaluated in the meantime; nothing was saved. Review and try again.", "error")
+    else:
+        flash(f"Applied \"{pair['evaluation']}\" to {len(updated)} related pair(s)", "success")
+
+    return redirect(url_for("investigate_pair", pair_id=pair_id))
+
+
+@app.route("/pair/<int:pair_id>/identifiers")
+def pair_identifiers(pair_id):
+    """
+    JSON page of equivalent identifiers for one side of a pair.
+
+    Query parameters: side (1 or 2), offset, limit (max 500) and prefix.
+    """
+    pair = database.get_pair(pair_id, db_path=_db_path())
+    if not pair:
+        return jsonify({"error": "Pair not found"}), 404
+
+    side = request.args.get("side", type=int)
+    if side not in (1, 2):
+        return jsonify({"error": "side must be 1 or 2"}), 400
+
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    limit = min(max(request.args.get("limit", 100, type=int), 1), 500)
+    prefix = request.args.get("prefix") or None
+
+    curie = pair[f"curie_{side}"]
+    norm_result, upstream_error = _normalize_pair(pair)
+    # In a partial outage the requested side may still have come from the cache
+    if upstream_error and norm_result.get(curie) is None:
+        return jsonify({"error": upstream_error}), 503
+
+    page = identifiers.page_identifiers(norm_result.get(curie), offset=offset, limit=limit, prefix=prefix)
+    # The identifier dicts belong to the backend (and may be shared fixture data), so copy them
+    page["identifiers"] = [
+        {**equiv, "url": get_curie_url(equiv["identifier"])}
+        for equiv in page["identifiers"]
+    ]
+
+    return jsonify({"curie": curie, "prefix": prefix, **page})
+
+
+# Columns the overlap report can be sorted by
+OVERLAP_SORT_KEYS = [
+    "split_score",
+    "label_token_jaccard",
+    "identifier_jaccard",
+    "prefix_jaccard",
+    "shared_count",
+    "near_duplicate_count",
+    "entity_name",
+]
+
+
+def _report_jobs(kind: str) -> tuple[Optional[dict], Optional[dict]]:
+    """The latest successful job of a report kind, and a newer one if it is still queued or running."""
+    from . import jobs
+
+    report_job = jobs.latest_job(kind, jobs.SUCCEEDED, db_path=_db_path())
+    pending_job = jobs.latest_job(kind, db_path=_db_path())
+    if pending_job is None or pending_job["status"] in jobs.FINISHED:
+        pending_job = None
+    return report_job, pending_job
+
+
+def _queue_report(kind: str, endpoint: str):
+    """Queue a job of a report kind unless one is already pending, and go back to the report."""
+    from . import jobs
+
+    _, pending_job = _report_jobs(kind)
+    if pending_job:
+        flash(f"Job #{pending_job['id']} is already building this report", "error")
+    else:
+        job_id = jobs.enqueue(kind, db_path=_db_path())
+        flash(f"Queued job #{job_id} to build the report", "success")
+    return redirect(url_for(endpoint))
+
+
+@app.route("/report/overlap", methods=["GET", "POST"])
+def overlap_report():
+    """
+    Clique overlap of every pair, sortable, most suspicious splits first by default.
+
+    The report is built by an "overlap" job, since it normalizes every pair;
+    this shows the latest finished one, and POST queues a new one.
+    """
+    if request.method == "POST":
+        return _queue_report("overlap", "overlap_report")
+
+    sort = request.args.get("sort", "split_score")
+    if sort not in OVERLAP_SORT_KEYS:
+        sort = "split_score"
+    descending = request.args.get("order", "asc" if sort == "entity_name" else "desc") == "desc"
+
+    report_job, pending_job = _report_jobs("overlap")
+    rows = list(report_job["result"]["rows"]) if report_job else []
+    rows.sort(key=lambda row: row["entity_name"])
+    rows.sort(key=lambda row: row[sort], reverse=descending)
+
+    return render_template(
+        "overlap_report.html",
+        rows=rows,
+        sort=sort,
+        descending=descending,
+        report_job=report_job,
+        pending_job=pending_job
+    )
+
+
+@app.route("/report/compare", methods=["GET", "POST"])
+def compare_report():
+    """
+    Clique outcomes of every pair on each configured NodeNorm/NameRes instance, side by side.
+
+    The report is built by a "compare" job, since it queries every instance
+    for every pair; this shows the latest finished one, and POST queues a new one.
+    """
+    from . import compare
 
-    # Find previous and next pair IDs
     try:
-        current_index = pair_ids.index(pair_id)
-        prev_id = pair_ids[current_index - 1] if current_index > 0 else None
-        next_id = pair_ids[current_index + 1] if current_index < len(pair_ids) - 1 else None
-    except ValueError:
-        prev_id = None
-        next_id = None
+        compare.configured_endpoints(app.config)
+    except ValueError as e:
+        flash(f"Invalid endpoint configuration: {e}", "error")
+        return redirect(url_for("index"))
+
+    if request.method == "POST":
+        return _queue_report("compare", "compare_report")
+
+    only_differences = request.args.get("only") == "differences"
+
+    report_job, pending_job = _report_jobs("compare")
+    report = report_job["result"] if report_job else None
+    rows = [row for row in report["rows"] if row["differs"] or not only_differences] if report else []
 
     return render_template(
-        "investigate.html",
-        pair=pair,
-        curie_1_data=curie_1_data,
-        curie_2_data=curie_2_data,
-        same_clique=same_clique,
-        different_types_cell_chemical=different_types_cell_chemical,
-        prev_id=prev_id,
-        next_id=next_id
+        "compare_report.html",
+        report=report,
+        rows=rows,
+        only_differences=only_differences,
+        report_job=report_job,
+        pending_job=pending_job
+    )
+
+
+# Which pairs the triage view lists
+TRIAGE_FILTERS = ("unevaluated", "suggested", "all")
+
+
+@app.route("/triage")
+def triage_pairs():
+    """
+    Many pairs at once with their stored clique snapshots, for bulk evaluation.
+
+    show is one of TRIAGE_FILTERS, or an evaluation to revisit the pairs that currently have it.
+    """
+    show = request.args.get("show", "unevaluated")
+    if show not in TRIAGE_FILTERS and show not in triage.EVALUATIONS:
+        show = "unevaluated"
+
+    snapshots = database.get_snapshots(db_path=_db_path())
+    # Snapshots are deleted along with their pairs, so the rest have none
+    missing_count = database.count_pairs(db_path=_db_path()) - len(snapshots)
+
+    def with_snapshots(pairs):
+        return [{**pair, "snapshot": snapshots.get(pair["id"])} for pair in pairs]
+
+    # Unevaluated pairs grouped by suggested evaluation, for one-click bulk saves
+    unevaluated = with_snapshots(database.get_pairs_by_evaluation(None, db_path=_db_path()))
+    suggested = {}
+    for row in unevaluated:
+        if row["snapshot"] and row["snapshot"]["suggestion"]:
+            suggested.setdefault(row["snapshot"]["suggestion"], []).append(row)
+
+    if show == "unevaluated":
+        rows = unevaluated
+    elif show == "suggested":
+        rows = [row for row_group in suggested.values() for row in row_group]
+        rows.sort(key=lambda row: row["entity_name"])
+    elif show == "all":
+        rows = with_snapshots(database.get_all_pairs(db_path=_db_path()))
+    else:
+        rows = with_snapshots(database.get_pairs_by_evaluation(show, db_path=_db_path()))
+
+    return render_template(
+        "triage.html",
+        rows=rows,
+        show=show,
+        filters=TRIAGE_FILTERS,
+        suggested=suggested,
+        missing_count=missing_count,
+        evaluations=triage.EVALUATIONS
+    )
+
+
+@app.route("/triage/snapshots", methods=["POST"])
+def refresh_snapshots():
+    """Queue a job that stores clique snapshots (only for pairs without one unless scope=all)."""
+    from . import jobs
+
+    scope = "all" if request.form.get("scope") == "all" else "missing"
+    job_id = jobs.enqueue("snapshots", {"scope": scope}, db_path=_db_path())
+    flash(f"Queued job #{job_id} to capture clique snapshots", "success")
+    return redirect(url_for("list_jobs"))
+
+
+@app.route("/evaluations/bulk", methods=["POST"])
+def bulk_evaluate():
+    """
+    Save one evaluation for many pairs in a single transaction.
+
+    Accepts the triage form (pair_id repeated, evaluation, evaluation_notes and
+    version_<pair_id>) and redirects back to it, or JSON
+    {"pair_ids": [...], "evaluation": ..., "evaluation_notes": ..., "expected_versions": {pair_id: version}}
+    and answers with {"updated": [...], "missing": [...]}.
+    """
+    if request.is_json:
+        data = request.get_json(silent=True) or {}
+        pair_ids = data.get("pair_ids") or []
+        evaluation = data.get("evaluation")
+        evaluation_notes = data.get("evaluation_notes") or None
+        try:
+            expected_versions = {int(k): int(v) for k, v in (data.get("expected_versions") or {}).items()}
+        except (TypeError, ValueError, AttributeError):
+            return jsonify({"error": "expected_versions must map pair IDs to versions"}), 400
+        if not isinstance(pair_ids, list) or not all(isinstance(pair_id, int) for pair_id in pair_ids):
+            return jsonify({"error": "pair_ids must be a list of integers"}), 400
+    else:
+        pair_ids = request.form.getlist("pair_id", type=int)
+        evaluation = request.form.get("evaluation")
+        evaluation_notes = request.form.get("evaluation_notes") or None
+        expected_versions = _form_expected_versions(pair_ids)
+
+    show = request.form.get("show", "unevaluated")
+    error = None
+    if evaluation not in triage.EVALUATIONS:
+        error = "Please select an evaluation"
+    elif not pair_ids:
+        error = "Please select at least one pair"
+
+    if error:
+        if request.is_json:
+            return jsonify({"error": error}), 400
+        flash(error, "error")
+        return redirect(url_for("triage_pairs", show=show))
+
+    try:
+        updated = database.bulk_update_evaluation(
+            pair_ids,
+            evaluation,
+            evaluation_notes,
+            expected_versions=expected_versions,
+            db_path=_db_path()
+        )
+    except database.EvaluationConflictError as e:
+        message = f"Pair {e.pair_id} was re-evaluated while you were triaging; nothing was saved. Review and try again."
+        if request.is_json:
+            return jsonify({"error": message, "pair_id": e.pair_id}), 409
+        flash(message, "error")
+        return redirect(url_for("triage_pairs", show=show))
+
+    if request.is_json:
+        return jsonify({"updated": updated, "missing": [pair_id for pair_id in pair_ids if pair_id not in updated]})
+
+    flash(f"Saved \"{evaluation}\" for {len(updated)} pair(s)", "success")
+    return redirect(url_for("triage_pairs", show=show))
+
+
+_job_workers_lock = threading.Lock()
+
+
+@app.before_request
+def _start_job_worker():
+    """Run queued jobs on background threads in each process that serves requests."""
+    if app.config["JOB_WORKERS"] <= 0:
+        return
+
+    # Started per process, since threads do not survive gunicorn forking workers
+    workers = app.extensions.setdefault("nn_investigator_job_workers", {})
+    if os.getpid() in workers:
+        return
+
+    from .jobs import JobWorker
+
+    with _job_workers_lock:
+        if os.getpid() not in workers:
+            worker = JobWorker(dict(app.config), threads=app.config["JOB_WORKERS"])
+            worker.start()
+            workers[os.getpid()] = worker
+
+
+@app.route("/jobs", methods=["GET", "POST"])
+def list_jobs():
+    """Recent background jobs with their progress; POST queues a new job."""
+    from . import jobs
+
+    if request.method == "POST":
+        kind = request.form.get("kind")
+        params = {}
+
+        if kind == "snapshots":
+            params["scope"] = "all" if request.form.get("scope") == "all" else "missing"
+        elif kind == "import_pairs":
+            upload = request.files.get("file")
+            if not upload or not upload.filename:
+                flash("Please choose a TSV file to import", "error")
+                return redirect(url_for("list_jobs"))
+            fd, path = tempfile.mkstemp(suffix=".tsv", prefix="import-", dir=app.config["JOB_FILES_DIR"] or None)
+            with os.fdopen(fd, "wb") as f:
+                upload.save(f)
+            params = {"path": path, "delete_after": True, "filename": upload.filename}
+        elif kind not in jobs.HANDLERS:
+            flash("Unknown job type", "error")
+            return redirect(url_for("list_jobs"))
+
+        job_id = jobs.enqueue(kind, params, db_path=_db_path())
+        flash(f"Queued job #{job_id}", "success")
+        return redirect(url_for("list_jobs"))
+
+    return render_template(
+        "jobs.html",
+        jobs=jobs.list_jobs(db_path=_db_path()),
+        finished=jobs.FINISHED,
+        workers_enabled=app.config["JOB_WORKERS"] > 0
     )
 
 
+@app.route("/jobs/status")
+def jobs_status():
+    """JSON progress of recent jobs, polled by the jobs page."""
+    from . import jobs
+
+    return jsonify([
+        {key: job[key] for key in ("id", "status", "progress", "total", "message", "error", "cancel_requested")}
+        for job in jobs.list_jobs(results=False, db_path=_db_path())
+    ])
+
+
+@app.route("/jobs/<int:job_id>")
+def job_detail(job_id):
+    """JSON status and result of one job."""
+    from . import jobs
+
+    job = jobs.get_job(job_id, db_path=_db_path())
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+
+@app.route("/jobs/<int:job_id>/cancel", methods=["POST"])
+def cancel_job(job_id):
+    """Cancel a queued or running job."""
+    from . import jobs
+
+    if jobs.cancel(job_id, db_path=_db_path()):
+        flash(f"Cancelling job #{job_id}", "success")
+    else:
+        flash(f"Job #{job_id} has already finished", "error")
+    return redirect(url_for("list_jobs"))
+
+
+@app.before_request
+def _start_profile():
+    """Profile a sample of requests, and watch the rest for slow ones, when profiling is enabled."""
+    rate = app.config["PROFILE_SAMPLE_RATE"]
+    slow_ms = app.config["PROFILE_SLOW_MS"]
+    if rate <= 0 and slow_ms <= 0:
+        return
+    if request.endpoint in (None, "static", "debug_profiles", "debug_profile"):
+        return
+
+    sampled = random.random() < rate
+    if not sampled and slow_ms <= 0:
+        return
+
+    from . import profiling
+
+    # Full profiling is too slow for every request; slow ones are caught with the sampler
+    mode = app.config["PROFILE_MODE"] if sampled else "sample"
+    g.profile = profiling.start(mode, interval=app.config["PROFILE_INTERVAL"])
+    g.profile_reason = "sampled" if sampled else "slow"
+    g.profile_started = time.perf_counter()
+
+
+@app.after_request
+def _finish_profile(response: Response) -> Response:
+    """Store the request's profile once the response (including a streamed body) has been sent."""
+    capture = g.pop("profile", None)
+    if capture is None:
+        return response
+
+    profile = {
+        "method": request.method,
+        "path": request.full_path.rstrip("?"),
+        "endpoint": request.endpoint,
+        "pair_id": (request.view_args or {}).get("pair_id"),
+        "status": response.status_code,
+        "mode": capture.mode,
+        "reason": g.profile_reason,
+    }
+    started = g.profile_started
+    config = dict(app.config)
+
+    def store():
+        capture.stop()
+        duration_ms = (time.perf_counter() - started) * 1000
+        if profile["reason"] == "slow" and duration_ms < config["PROFILE_SLOW_MS"]:
+            return
+
+        from . import profiling
+
+        profiling.save_profile(
+            {**profile, "duration_ms": duration_ms, "functions": capture.top_functions(config["PROFILE_TOP"])},
+            keep=config["PROFILE_KEEP"],
+            db_path=config["DATABASE"]
+        )
+
+    response.call_on_close(store)
+    return response
+
+
+def _profile_token_digest(token: str) -> str:
+    """Keyed digest of a profile token, so the session can vouch for it without holding it."""
+    import hashlib
+    import hmac
+
+    return hmac.new(app.config["SECRET_KEY"].encode(), token.encode(), hashlib.sha256).hexdigest()
+
+
+def _profiles_authorized() -> bool:
+    """Whether the request carries PROFILE_TOKEN as an X-Profile-Token header, or its session signed in with it."""
+    import hmac
+
+    expected = app.config["PROFILE_TOKEN"]
+    given = request.headers.get("X-Profile-Token")
+    if given:
+        return hmac.compare_digest(given.encode(), expected.encode())
+    # Changing the token signs every session out
+    return hmac.compare_digest(session.get("profiles_authorized", ""), _profile_token_digest(expected))
+
+
+@app.route("/debug/profiles", methods=["GET", "POST"])
+def debug_profiles():
+    """Recent request profiles and the functions that are hot across them; POST signs in with the token."""
+    import hmac
+
+    if not app.config["PROFILE_TOKEN"]:
+        abort(404)
+
+    if request.method == "POST":
+        token = request.form.get("token", "")
+        if hmac.compare_digest(token.encode(), app.config["PROFILE_TOKEN"].encode()):
+            session["profiles_authorized"] = _profile_token_digest(token)
+            return redirect(url_for("debug_profiles"))
+        flash("Wrong token", "error")
+        return render_template("profiles_login.html"), 403
+
+    if not _profiles_authorized():
+        return render_template("profiles_login.html"), 403
+
+    from . import profiling
+
+    endpoint = request.args.get("route") or None
+    profiles = profiling.list_profiles(endpoint=endpoint, db_path=_db_path())
+
+    if request.args.get("format") == "json":
+        return jsonify({"profiles": profiles, "hot_functions": profiling.hot_functions(profiles)})
+
+    return render_template(
+        "profiles.html",
+        profiles=profiles,
+        hot_functions=profiling.hot_functions(profiles),
+        endpoint=endpoint,
+        enabled=app.config["PROFILE_SAMPLE_RATE"] > 0 or app.config["PROFILE_SLOW_MS"] > 0
+    )
+
+
+@app.route("/debug/profiles/<int:profile_id>")
+def debug_profile(profile_id):
+    """One request profile with its top functions."""
+    if not app.config["PROFILE_TOKEN"]:
+        abort(404)
+    if not _profiles_authorized():
+        abort(403)
+
+    from . import profiling
+
+    profile = profiling.get_profile(profile_id, db_path=_db_path())
+    if not profile:
+        abort(404)
+
+    if request.args.get("format") == "json":
+        return jsonify(profile)
+    return render_template("profile.html", profile=profile)
+
+
 @app.route("/add", methods=["GET", "POST"])
 def add_pair():
     """Add a new entity pair."""
@@ -145,13 +948,20 @@ def add_pair():
             flash("Entity name, curie_1, and curie_2 are required", "error")
             return redirect(url_for("add_pair"))
 
+        # The same two CURIEs (in either order) are the same pair, whatever it is called
+        for existing in database.get_pairs_by_curies([curie_1, curie_2], db_path=_db_path()):
+            if {existing["curie_1"], existing["curie_2"]} == {curie_1, curie_2}:
+                flash(f"This pair is already being investigated as \"{existing['entity_name']}\"", "error")
+                return redirect(url_for("investigate_pair", pair_id=existing["id"]))
+
         pair_id = database.add_pair(
             entity_name=entity_name,
             curie_1=curie_1,
             curie_2=curie_2,
             curie_1_label=curie_1_label or None,
             curie_2_label=curie_2_label or None,
-            notes=notes or None
+            notes=notes or None,
+            db_path=_db_path()
         )
 
         flash(f"Added new pair: {entity_name}", "success")
@@ -163,7 +973,7 @@ def add_pair():
 @app.route("/pair/<int:pair_id>/delete", methods=["POST"])
 def delete_pair(pair_id):
     """Delete an entity pair."""
-    deleted = database.delete_pair(pair_id)
+    deleted = database.delete_pair(pair_id, db_path=_db_path())
 
     if deleted:
         flash("Pair deleted successfully", "success")
@@ -173,10 +983,29 @@ def delete_pair(pair_id):
     return redirect(url_for("index"))
 
 
+def create_app(config: Optional[dict] = None) -> Flask:
+    """
+    Configure the application and initialize its database.
+
+    Args:
+        config: Config values to apply (default: read from NN_INVESTIGATOR_* environment variables)
+
+    Returns:
+        The configured Flask app
+    """
+    app.config.update(load_config() if config is None else config)
+    database.init_db(app.config["DATABASE"])
+
+    if app.config["HTTP_MODE"]:
+        from . import transport
+        transport.set_transport(transport.from_config(app.config))
+
+    return app
+
+
 def init_app():
     """Initialize the application and database."""
-    database.init_db()
-    return app
+    return create_app()
 
 
 if __name__ == "__main__":
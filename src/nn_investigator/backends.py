@@ -0,0 +1,220 @@
+"""Interchangeable sources of CURIE normalization results.
+
+Every backend has the normalize_curies() signature of nodenorm.normalize_curies
+and returns results in the same shape, so route code does not need to know
+where cliques come from. build_backend() assembles a backend from a
+comma-separated NORMALIZATION_BACKENDS setting such as "cache,local,remote":
+
+- remote: the live Node Normalization API (NODENORM_URL)
+- local: a local clique dump index (LOCAL_INDEX, see local_index.py)
+- replay: recorded results from a JSON fixture (REPLAY_FIXTURE)
+- cache: the shared SQLite cache, in front of every backend listed after it
+
+Backends are consulted left to right; a CURIE that one backend cannot
+resolve is passed on to the next.
+"""
+
+import json
+import threading
+from typing import Optional, Protocol
+
+from .nodenorm import NormalizationResult, normalize_curies_cached
+
+
+class NormalizationBackend(Protocol):
+    """A source of normalization results."""
+
+    name: str
+
+    def normalize_curies(
+        self,
+        curies: list[str],
+        conflate: bool = True,
+        drug_chemical_conflate: bool = True
+    ) -> dict:
+        """Map each CURIE to its normalized clique, or None if it cannot be resolved."""
+        ...
+
+
+class HttpBackend:
+    """The live Node Normalization API."""
+
+    def __init__(self, url: Optional[str] = None):
+        self.url = url or None
+        self.name = f"remote({url})" if url else "remote"
+
+    def normalize_curies(self, curies, conflate=True, drug_chemical_conflate=True) -> dict:
+        from . import nodenorm
+
+        return nodenorm.normalize_curies(
+            curies,
+            conflate=conflate,
+            drug_chemical_conflate=drug_chemical_conflate,
+            url=self.url
+        )
+
+
+class CachedBackend:
+    """Serve results from the shared cache, fetching misses from another backend."""
+
+    def __init__(self, inner: NormalizationBackend, cache):
+        self.inner = inner
+        self.cache = cache
+        self.name = f"cache({inner.name})"
+
+    def normalize_curies(self, curies, conflate=True, drug_chemical_conflate=True) -> NormalizationResult:
+        # Cache keys are namespaced by the source so different chains never share entries
+        namespace = "nodenorm" if self.inner.name == "remote" else self.inner.name
+        return normalize_curies_cached(
+            curies,
+            self.cache,
+            conflate=conflate,
+            drug_chemical_conflate=drug_chemical_conflate,
+            fetch=self.inner.normalize_curies,
+            namespace=namespace
+        )
+
+
+class LocalIndexBackend:
+    """Look cliques up in a local clique dump index."""
+
+    name = "local"
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self._index = None
+        self._index_lock = threading.Lock()
+
+    def normalize_curies(self, curies, conflate=True, drug_chemical_conflate=True) -> dict:
+        if self._index is None:
+            from .local_index import LocalCliqueIndex
+
+            # The backend is shared by request, background and job threads; open the index once
+            with self._index_lock:
+                if self._index is None:
+                    self._index = LocalCliqueIndex(self.index_path)
+        return self._index.normalize_curies(curies)
+
+
+class ReplayBackend:
+    """
+    Replay recorded normalization results from a JSON fixture.
+
+    The fixture maps CURIEs to results, e.g. a saved NodeNorm response.
+    CURIEs that are not in the fixture resolve to None.
+    """
+
+    name = "replay"
+
+    def __init__(self, fixture_path: str):
+        self.fixture_path = fixture_path
+        with open(fixture_path, encoding="utf-8") as f:
+            self._results = json.load(f)
+
+    def normalize_curies(self, curies, conflate=True, drug_chemical_conflate=True) -> dict:
+        return {curie: self._results.get(curie) for curie in curies}
+
+
+class ChainBackend:
+    """Ask several backends in turn, passing unresolved CURIEs on to the next one."""
+
+    def __init__(self, backends: list[NormalizationBackend]):
+        self.backends = backends
+        self.name = ">".join(backend.name for backend in backends)
+
+    def normalize_curies(self, curies, conflate=True, drug_chemical_conflate=True) -> NormalizationResult:
+        combined = NormalizationResult({curie: None for curie in curies})
+        pending = list(dict.fromkeys(curies))
+
+        for backend in self.backends:
+            if not pending:
+                break
+            result = backend.normalize_curies(pending, conflate=conflate, drug_chemical_conflate=drug_chemical_conflate)
+            _merge_staleness(combined, result)
+            for curie in pending:
+                if result.get(curie) is not None:
+                    combined[curie] = result[curie]
+            pending = [curie for curie in pending if combined[curie] is None]
+
+        return combined
+
+
+def _merge_staleness(combined: NormalizationResult, result: dict) -> None:
+    if getattr(result, "stale", False):
+        combined.stale = True
+        combined.fetched_at = min(filter(None, [combined.fetched_at, result.fetched_at]))
+    combined.error = combined.error or getattr(result, "error", None)
+
+
+def normalize_bulk(
+    backend: NormalizationBackend,
+    curies: list[str],
+    conflate: bool = True,
+    drug_chemical_conflate: bool = True,
+    batch_size: int = 1000
+) -> NormalizationResult:
+    """
+    Normalize any number of CURIEs through a backend, in batches.
+
+    Returns:
+        NormalizationResult for all CURIEs; stale if any batch was stale
+    """
+    unique = list(dict.fromkeys(curies))
+    combined = NormalizationResult()
+
+    for start in range(0, len(unique), batch_size):
+        batch = backend.normalize_curies(
+            unique[start:start + batch_size],
+            conflate=conflate,
+            drug_chemical_conflate=drug_chemical_conflate
+        )
+        combined.update(batch)
+        _merge_staleness(combined, batch)
+
+    return combined
+
+
+def backend_names(config: dict) -> list[str]:
+    """The backends listed in config["NORMALIZATION_BACKENDS"], in order."""
+    return [name.strip() for name in config["NORMALIZATION_BACKENDS"].split(",") if name.strip()]
+
+
+def build_backend(config: dict, cache=None) -> NormalizationBackend:
+    """
+    Build the backend described by config["NORMALIZATION_BACKENDS"].
+
+    Args:
+        config: App config with NORMALIZATION_BACKENDS and the settings the listed backends need
+        cache: Shared cache (required if "cache" is listed)
+
+    Raises:
+        ValueError: If the setting names an unknown backend or a required setting is missing
+    """
+    names = backend_names(config)
+    if not names:
+        raise ValueError("NORMALIZATION_BACKENDS must list at least one backend")
+
+    # Build from the right so that "cache" wraps everything after it
+    chain: list[NormalizationBackend] = []
+    for name in reversed(names):
+        if name == "cache":
+            if not chain:
+                raise ValueError("'cache' must be followed by the backend(s) it caches")
+            if cache is None:
+                raise ValueError("A cache is required for the 'cache' backend")
+            inner = chain[0] if len(chain) == 1 else ChainBackend(chain)
+            chain = [CachedBackend(inner, cache)]
+        elif name in ("remote", "http"):
+            chain.insert(0, HttpBackend(config.get("NODENORM_URL")))
+        elif name == "local":
+            if not config.get("LOCAL_INDEX"):
+                raise ValueError("LOCAL_INDEX must be set to use the 'local' backend")
+            chain.insert(0, LocalIndexBackend(config["LOCAL_INDEX"]))
+        elif name == "replay":
+            if not config.get("REPLAY_FIXTURE"):
+                raise ValueError("REPLAY_FIXTURE must be set to use the 'replay' backend")
+            chain.insert(0, ReplayBackend(config["REPLAY_FIXTURE"]))
+        else:
+            raise ValueError(f"Unknown normalization backend: {name}")
+
+    return chain[0] if len(chain) == 1 else ChainBackend(chain)
@@ -0,0 +1,110 @@
+"""SQLite-backed cache shared by all worker processes."""
+
+import json
+import sqlite3
+import time
+from typing import Any, Optional
+
+
+class SQLiteCache:
+    """
+    Key/value cache stored in a SQLite file.
+
+    Unlike a per-process dict, every worker of a multi-process server reads and
+    writes the same entries, so an upstream response fetched by one worker is
+    reused by all of them. Values must be JSON-serializable.
+    """
+
+    def __init__(self, db_path: str = "nn_investigator_cache.db", ttl: int = 86400):
+        self.db_path = db_path
+        self.ttl = ttl
+
+        conn = self._connect()
+        # WAL lets readers in other workers proceed while one worker writes
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                stored_at REAL NOT NULL
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        """Get the fresh cached values for the given keys, skipping missing or expired ones."""
+        if not keys:
+            return {}
+
+        cutoff = time.time() - self.ttl
+        placeholders = ",".join("?" for _ in keys)
+
+        conn = self._connect()
+        rows = conn.execute(f"""
+            SELECT key, value FROM cache_entries
+            WHERE key IN ({placeholders}) AND stored_at >= ?
+        """, (*keys, cutoff)).fetchall()
+        conn.close()
+
+        return {key: json.loads(value) for key, value in rows}
+
+    def get_entries(self, keys: list[str]) -> dict[str, tuple[Any, float]]:
+        """
+        Get cached values with the time they were stored, including expired ones.
+
+        Expired entries are still useful as a fallback when the upstream
+        service cannot be reached; use is_fresh() to tell them apart.
+
+        Returns:
+            Dictionary mapping keys to (value, stored_at) tuples
+        """
+        if not keys:
+            return {}
+
+        placeholders = ",".join("?" for _ in keys)
+
+        conn = self._connect()
+        rows = conn.execute(f"""
+            SELECT key, value, stored_at FROM cache_entries
+            WHERE key IN ({placeholders})
+        """, keys).fetchall()
+        conn.close()
+
+        return {key: (json.loads(value), stored_at) for key, value, stored_at in rows}
+
+    def is_fresh(self, stored_at: float) -> bool:
+        """Whether an entry stored at the given time is still within the TTL."""
+        return stored_at >= time.time() - self.ttl
+
+    def set_many(self, items: dict[str, Any]) -> None:
+        """Store several values at once."""
+        if not items:
+            return
+
+        now = time.time()
+        conn = self._connect()
+        conn.executemany("""
+            INSERT OR REPLACE INTO cache_entries (key, value, stored_at)
+            VALUES (?, ?, ?)
+        """, [(key, json.dumps(value), now) for key, value in items.items()])
+        conn.commit()
+        conn.close()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a single cached value, or None if missing or expired."""
+        return self.get_many([key]).get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a single value."""
+        self.set_many({key: value})
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        conn = self._connect()
+        conn.execute("DELETE FROM cache_entries")
+        conn.commit()
+        conn.close()
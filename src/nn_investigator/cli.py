@@ -0,0 +1,184 @@
+"""Command-line tools for batch work that do not need the web app.
+
+This module deliberately avoids importing Flask so that short-lived batch
+runs start quickly.
+
+Examples:
+    python -m src.nn_investigator.cli overlap > overlap.tsv
+    python -m src.nn_investigator.cli build-index --output cliques.idx SmallMolecule.txt Protein.txt
+    python -m src.nn_investigator.cli overlap --local-index cliques.idx > overlap.tsv
+    python -m src.nn_investigator.cli compare --only-differences > compare.tsv
+    python -m src.nn_investigator.cli worker --threads 2
+"""
+
+import argparse
+import sys
+from typing import Optional
+
+from . import database
+from .cache import SQLiteCache
+from .config import load_config
+
+
+OVERLAP_COLUMNS = [
+    "id",
+    "entity_name",
+    "curie_1",
+    "preferred_1",
+    "curie_2",
+    "preferred_2",
+    "split_score",
+    "label_token_jaccard",
+    "identifier_jaccard",
+    "prefix_jaccard",
+    "shared_count",
+    "near_duplicate_count",
+    "evaluation",
+]
+
+
+def overlap_report(config: dict, out=sys.stdout, local_index: Optional[str] = None) -> int:
+    """
+    Write the clique overlap of every pair as TSV, most suspicious splits first.
+
+    Cliques come from the configured normalization backends, or only from a
+    local clique dump index if local_index is given.
+    """
+    from . import overlap
+    from .backends import backend_names, build_backend, normalize_bulk
+
+    if local_index:
+        config = {**config, "NORMALIZATION_BACKENDS": "local", "LOCAL_INDEX": local_index}
+
+    cache = None
+    if "cache" in backend_names(config):
+        cache = SQLiteCache(config["CACHE_DATABASE"], ttl=config["CACHE_TTL"])
+
+    pairs = database.get_all_pairs(db_path=config["DATABASE"])
+    curies = [curie for pair in pairs for curie in (pair["curie_1"], pair["curie_2"])]
+
+    norm_results = normalize_bulk(build_backend(config, cache), curies)
+    rows = overlap.analyze_pairs(pairs, norm_results)
+    rows.sort(key=lambda row: row["split_score"], reverse=True)
+
+    out.write("\t".join(OVERLAP_COLUMNS) + "\n")
+    for row in rows:
+        values = [row[column] for column in OVERLAP_COLUMNS]
+        out.write("\t".join(
+            f"{value:.3f}" if isinstance(value, float) else ("" if value is None else str(value))
+            for value in values
+        ) + "\n")
+
+    return 0
+
+
+def compare_report(config: dict, out=sys.stdout, only_differences: bool = False) -> int:
+    """
+    Write the clique outcome of every pair on each configured instance as TSV.
+
+    Pairs the instances disagree on come first.
+    """
+    from . import compare
+
+    nodenorm_endpoints, nameres_endpoints = compare.configured_endpoints(config)
+    report = compare.compare_endpoints(
+        database.get_all_pairs(db_path=config["DATABASE"]),
+        nodenorm_endpoints,
+        nameres_endpoints,
+        max_workers=config["COMPARE_WORKERS"]
+    )
+
+    for endpoint, error in {**report["nodenorm_errors"], **report["nameres_errors"]}.items():
+        sys.stderr.write(f"{endpoint} unavailable: {error}\n")
+
+    columns = ["id", "entity_name", "curie_1", "curie_2", "differs"]
+    for endpoint in report["nodenorm"]:
+        columns += [f"{endpoint}:preferred_1", f"{endpoint}:preferred_2", f"{endpoint}:same_clique"]
+    columns += [f"nameres:{endpoint}:top_hit" for endpoint in report["nameres"]]
+    out.write("\t".join(columns) + "\n")
+
+    for row in report["rows"]:
+        if only_differences and not row["differs"]:
+            continue
+        values = [row["id"], row["entity_name"], row["curie_1"], row["curie_2"], row["differs"]]
+        for endpoint in report["nodenorm"]:
+            outcome = row["outcomes"][endpoint] or {}
+            values += [outcome.get("preferred_1"), outcome.get("preferred_2"), outcome.get("same_clique")]
+        values += [row["name_hits"][endpoint] for endpoint in report["nameres"]]
+        out.write("\t".join("" if value is None else str(value) for value in values) + "\n")
+
+    return 0
+
+
+def build_index(dump_paths: list[str], output: str, out=sys.stdout) -> int:
+    """Build a local CURIE index over clique dump files."""
+    from .local_index import build_index as build
+
+    count = build(dump_paths, output)
+    out.write(f"Indexed {count} CURIEs from {len(dump_paths)} file(s) into {output}\n")
+    return 0
+
+
+def run_worker(config: dict, threads: int = 1, once: bool = False, out=sys.stdout) -> int:
+    """Run background jobs queued from the web app, until interrupted (or the queue is empty with once)."""
+    from . import jobs
+
+    if once:
+        count = jobs.run_pending(config)
+        out.write(f"Ran {count} job(s)\n")
+        return 0
+
+    worker = jobs.JobWorker(config, threads=threads)
+    worker.start()
+    out.write(f"Running jobs from {config['DATABASE']} on {threads} thread(s); press Ctrl+C to stop\n")
+    try:
+        worker.join()
+    except KeyboardInterrupt:
+        out.write("Finishing running jobs...\n")
+        worker.stop()
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Run a command-line tool."""
+    parser = argparse.ArgumentParser(prog="nn-investigator", description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    overlap_parser = subparsers.add_parser("overlap", help="Write the clique overlap report for all pairs as TSV")
+    overlap_parser.add_argument("--local-index", help="Look cliques up in this local index instead of NodeNorm")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare pair outcomes across NodeNorm/NameRes instances as TSV")
+    compare_parser.add_argument("--only-differences", action="store_true", help="Only list pairs the instances disagree on")
+
+    worker_parser = subparsers.add_parser("worker", help="Run queued background jobs")
+    worker_parser.add_argument("--threads", type=int, default=1, help="Number of jobs to run at once")
+    worker_parser.add_argument("--once", action="store_true", help="Run the jobs already queued, then exit")
+
+    index_parser = subparsers.add_parser("build-index", help="Index clique dump files for local lookups")
+    index_parser.add_argument("--output", required=True, help="Path of the index file to write")
+    index_parser.add_argument("dumps", nargs="+", help="JSONL clique dump files")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build-index":
+        return build_index(args.dumps, args.output)
+
+    config = load_config()
+    database.init_db(config["DATABASE"])
+
+    if config["HTTP_MODE"]:
+        from . import transport
+        transport.set_transport(transport.from_config(config))
+
+    if args.command == "overlap":
+        return overlap_report(config, local_index=args.local_index)
+    if args.command == "compare":
+        return compare_report(config, only_differences=args.only_differences)
+    if args.command == "worker":
+        return run_worker(config, threads=args.threads, once=args.once)
+
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
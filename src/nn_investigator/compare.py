@@ -0,0 +1,215 @@
+"""Compare normalization outcomes across several NodeNorm and NameRes instances.
+
+Instances are configured as comma-separated name=url lists, for example
+
+    NN_INVESTIGATOR_NODENORM_ENDPOINTS="prod=https://nodenormalization-sri.renci.org,dev=https://nodenormalization-sri-dev.renci.org"
+    NN_INVESTIGATOR_NAMERES_ENDPOINTS="prod=https://name-resolution-sri.renci.org,dev=https://name-resolution-sri-dev.renci.org"
+
+Every pair is normalized against every NodeNorm instance (and every entity
+name looked up on every NameRes instance), in batches, concurrently on a bounded thread
+pool, so comparing three instances takes about as long as querying one.
+Results always come live from the instances, never from the shared cache.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+import requests
+
+from . import nameres
+from . import nodenorm
+from .backends import HttpBackend
+from .resilience import CircuitOpenError
+
+
+NODENORM_PATH = "/get_normalized_nodes"
+
+
+def parse_endpoints(setting: str) -> dict[str, str]:
+    """
+    Parse a "name=url,name=url" setting into an ordered name -> URL mapping.
+
+    Raises:
+        ValueError: If an entry has no name or URL, or a name is used twice
+    """
+    endpoints = {}
+    for entry in setting.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, sep, url = entry.partition("=")
+        name, url = name.strip(), url.strip()
+        if not sep or not name or not url:
+            raise ValueError(f"Endpoint must be written as name=url: {entry!r}")
+        if name in endpoints:
+            raise ValueError(f"Endpoint name used twice: {name!r}")
+        endpoints[name] = url
+    return endpoints
+
+
+def nodenorm_endpoint(url: str) -> str:
+    """Turn a NodeNorm base URL into its get_normalized_nodes endpoint (full endpoints are kept)."""
+    url = url.rstrip("/")
+    return url if url.endswith(NODENORM_PATH) else url + NODENORM_PATH
+
+
+def configured_endpoints(config: dict) -> tuple[dict[str, str], dict[str, str]]:
+    """
+    Get the NodeNorm and NameRes instances to compare from the app config.
+
+    Without NODENORM_ENDPOINTS, the single configured NodeNorm instance is used;
+    NameRes lookups only run when NAMERES_ENDPOINTS is set.
+
+    Returns:
+        NodeNorm name -> get_normalized_nodes URL, and NameRes name -> base URL
+    """
+    nodenorm_endpoints = parse_endpoints(config.get("NODENORM_ENDPOINTS", ""))
+    if not nodenorm_endpoints:
+        nodenorm_endpoints = {"default": config.get("NODENORM_URL") or nodenorm.NODENORM_URL}
+    nodenorm_endpoints = {name: nodenorm_endpoint(url) for name, url in nodenorm_endpoints.items()}
+
+    return nodenorm_endpoints, parse_endpoints(config.get("NAMERES_ENDPOINTS", ""))
+
+
+def _preferred_id(result: Optional[dict]) -> Optional[str]:
+    return result["id"]["identifier"] if result else None
+
+
+def _top_hits(names: list[str], base_url: str) -> dict[str, Optional[str]]:
+    """The CURIE of the best Name Resolution match for each name (or None), in one bulk request."""
+    results = nameres.bulk_lookup(
+        {str(i): {"string": name, "limit": 1} for i, name in enumerate(names)},
+        base_url=base_url
+    )
+
+    hits = {}
+    for i, name in enumerate(names):
+        matches = results.get(str(i)) or []
+        hits[name] = matches[0]["curie"] if matches else None
+    return hits
+
+
+def compare_endpoints(
+    pairs: list[dict],
+    nodenorm_endpoints: dict[str, str],
+    nameres_endpoints: Optional[dict[str, str]] = None,
+    max_workers: int = 4,
+    batch_size: int = 1000,
+    name_batch_size: int = 100,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> dict:
+    """
+    Normalize every pair against several instances and diff the clique outcomes.
+
+    Args:
+        pairs: Entity pairs (with id, entity_name, curie_1 and curie_2)
+        nodenorm_endpoints: Name -> get_normalized_nodes URL of each NodeNorm instance
+        nameres_endpoints: Name -> base URL of each NameRes instance to look entity names up on
+        max_workers: Maximum number of requests in flight at once, across all instances
+        batch_size: Maximum number of CURIEs per NodeNorm request
+        name_batch_size: Maximum number of names per NameRes bulk lookup
+        progress: Called with (requests done, total requests) as each request
+            completes; an exception it raises cancels the remaining requests
+
+    Returns:
+        Dictionary with the endpoint names ("nodenorm", "nameres"), the first
+        error from each instance that failed ("nodenorm_errors",
+        "nameres_errors"), the number of pairs each NodeNorm instance puts in
+        one clique ("same_clique_counts") and one row per pair ("rows"). Each
+        row is the pair plus "outcomes" (NodeNorm name -> preferred_1,
+        preferred_2 and same_clique, or None if the instance failed),
+        "name_hits" (NameRes name -> top CURIE) and "differs", which is True
+        when the instances disagree; differing rows come first.
+    """
+    nameres_endpoints = nameres_endpoints or {}
+    curies = list(dict.fromkeys(curie for pair in pairs for curie in (pair["curie_1"], pair["curie_2"])))
+    names = list(dict.fromkeys(pair["entity_name"] for pair in pairs))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        norm_futures = {
+            endpoint: [
+                executor.submit(HttpBackend(url).normalize_curies, curies[start:start + batch_size])
+                for start in range(0, len(curies), batch_size)
+            ]
+            for endpoint, url in nodenorm_endpoints.items()
+        }
+        name_futures = {
+            endpoint: [
+                executor.submit(_top_hits, names[start:start + name_batch_size], url)
+                for start in range(0, len(names), name_batch_size)
+            ]
+            for endpoint, url in nameres_endpoints.items()
+        }
+
+        total = sum(len(futures) for futures in [*norm_futures.values(), *name_futures.values()])
+        done = 0
+
+        def collect(futures_by_endpoint: dict, errors: dict) -> dict:
+            nonlocal done
+            collected = {}
+            for endpoint, futures in futures_by_endpoint.items():
+                results = {}
+                for future in futures:
+                    try:
+                        results.update(future.result())
+                    except (requests.RequestException, CircuitOpenError) as e:
+                        errors.setdefault(endpoint, str(e))
+                    done += 1
+                    if progress:
+                        progress(done, total)
+                if endpoint not in errors:
+                    collected[endpoint] = results
+            return collected
+
+        nodenorm_errors, nameres_errors = {}, {}
+        try:
+            normalized = collect(norm_futures, nodenorm_errors)
+            hits = collect(name_futures, nameres_errors)
+        except BaseException:
+            for futures in [*norm_futures.values(), *name_futures.values()]:
+                for future in futures:
+                    future.cancel()
+            raise
+
+    rows = []
+    for pair in pairs:
+        outcomes = {}
+        for endpoint in nodenorm_endpoints:
+            if endpoint not in normalized:
+                outcomes[endpoint] = None
+                continue
+            preferred_1 = _preferred_id(normalized[endpoint].get(pair["curie_1"]))
+            preferred_2 = _preferred_id(normalized[endpoint].get(pair["curie_2"]))
+            outcomes[endpoint] = {
+                "preferred_1": preferred_1,
+                "preferred_2": preferred_2,
+                "same_clique": preferred_1 is not None and preferred_1 == preferred_2,
+            }
+
+        name_hits = {
+            endpoint: hits[endpoint][pair["entity_name"]] if endpoint in hits else None
+            for endpoint in nameres_endpoints
+        }
+
+        seen_outcomes = {(o["preferred_1"], o["preferred_2"]) for o in outcomes.values() if o is not None}
+        seen_hits = {name_hits[endpoint] for endpoint in hits}
+        rows.append({
+            **pair,
+            "outcomes": outcomes,
+            "name_hits": name_hits,
+            "differs": len(seen_outcomes) > 1 or len(seen_hits) > 1,
+        })
+
+    rows.sort(key=lambda row: (not row["differs"], row["entity_name"]))
+
+    return {
+        "nodenorm": list(nodenorm_endpoints),
+        "nameres": list(nameres_endpoints),
+        "nodenorm_errors": nodenorm_errors,
+        "nameres_errors": nameres_errors,
+        "same_clique_counts": {
+            endpoint: sum(1 for row in rows if row["outcomes"][endpoint]["same_clique"])
+            for endpoint in normalized
+        },
+        "rows": rows,
+    }
@@ -0,0 +1,73 @@
+"""Environment-based configuration for NN Investigator."""
+
+import os
+from typing import Optional
+
+
+ENV_PREFIX = "NN_INVESTIGATOR_"
+
+DEV_SECRET_KEY = "dev-secret-key-change-in-production"
+
+DEFAULTS = {
+    "SECRET_KEY": DEV_SECRET_KEY,
+    "DATABASE": "nn_investigator.db",
+    "CACHE_DATABASE": "nn_investigator_cache.db",
+    "CACHE_TTL": 86400,
+    # Where normalization results come from; see backends.build_backend
+    "NORMALIZATION_BACKENDS": "cache,remote",
+    "NODENORM_URL": "",
+    "LOCAL_INDEX": "",
+    "REPLAY_FIXTURE": "",
+    # Instances to compare side by side, as "name=url,name=url"; see compare.py
+    "NODENORM_ENDPOINTS": "",
+    "NAMERES_ENDPOINTS": "",
+    "COMPARE_WORKERS": 4,
+    # Background job threads per web worker process (0 to leave jobs to "cli worker")
+    "JOB_WORKERS": 1,
+    # Where uploaded import files wait for their job (default: the system temp directory)
+    "JOB_FILES_DIR": "",
+    # Record or replay NodeNorm/NameRes responses; see transport.py
+    "HTTP_MODE": "",
+    "HTTP_CASSETTE": "",
+    "HTTP_REPLAY_LATENCY": 1.0,
+    # Request profiling, off by default; see profiling.py and /debug/profiles
+    "PROFILE_SAMPLE_RATE": 0.0,
+    "PROFILE_MODE": "cprofile",
+    "PROFILE_SLOW_MS": 0,
+    "PROFILE_INTERVAL": 0.005,
+    "PROFILE_TOP": 25,
+    "PROFILE_KEEP": 500,
+    "PROFILE_TOKEN": "",
+}
+
+
+def load_config(environ: Optional[dict] = None) -> dict:
+    """
+    Build the application config from environment variables.
+
+    Each key in DEFAULTS can be overridden by an environment variable with the
+    NN_INVESTIGATOR_ prefix, e.g. NN_INVESTIGATOR_DATABASE=/data/nn.db.
+    Values are converted to the type of the default.
+
+    Args:
+        environ: Mapping to read from (default: os.environ)
+
+    Returns:
+        Dictionary of config values suitable for app.config.update()
+    """
+    if environ is None:
+        environ = os.environ
+
+    config = {}
+    for key, default in DEFAULTS.items():
+        value = environ.get(ENV_PREFIX + key)
+        if value is None:
+            config[key] = default
+        elif isinstance(default, int):
+            config[key] = int(value)
+        elif isinstance(default, float):
+            config[key] = float(value)
+        else:
+            config[key] = value
+
+    return config
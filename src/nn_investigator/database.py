@@ -4,6 +4,19 @@ import sqlite3
 from typing import Optional
 
 
+class EvaluationConflictError(Exception):
+    """Raised when an evaluation is saved against an outdated version."""
+
+    def __init__(self, pair_id: int, expected_version: int, current: Optional[dict]):
+        self.pair_id = pair_id
+        self.expected_version = expected_version
+        self.current = current
+        current_version = current["version"] if current else 0
+        super().__init__(
+            f"Pair {pair_id} evaluation is at version {current_version}, expected {expected_version}"
+        )
+
+
 def get_connection(db_path: str = "nn_investigator.db") -> sqlite3.Connection:
     """Get a database connection."""
     conn = sqlite3.connect(db_path)
@@ -11,11 +24,20 @@ def get_connection(db_path: str = "nn_investigator.db") -> sqlite3.Connection:
     return conn
 
 
-def init_db(db_path: str = "nn_investigator.db") -> None:
-    """Initialize the database schema."""
+def get_schema_version(db_path: str = "nn_investigator.db") -> int:
+    """Get the version of the latest migration applied to the database (0 if none)."""
     conn = get_connection(db_path)
-    cursor = conn.cursor()
+    try:
+        row = conn.execute("SELECT MAX(version) AS version FROM schema_version").fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    conn.close()
+
+    return (row["version"] or 0) if row else 0
 
+
+def _migration_initial_schema(cursor: sqlite3.Cursor) -> None:
+    """Entity pairs, evaluation history and the data version counter."""
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS entity_pairs (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -25,16 +47,221 @@ def init_db(db_path: str = "nn_investigator.db") -> None:
             curie_2 TEXT NOT NULL,
             curie_2_label TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            notes TEXT,
-            evaluation TEXT,
-            evaluation_notes TEXT
+            notes TEXT
+        )
+    """)
+
+    # Append-only evaluation history; the UNIQUE constraint doubles as the
+    # (pair_id, version) index used by the latest_evaluations view.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS evaluations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            pair_id INTEGER NOT NULL,
+            version INTEGER NOT NULL,
+            evaluation TEXT NOT NULL,
+            evaluation_notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (pair_id, version)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE VIEW IF NOT EXISTS latest_evaluations AS
+        SELECT e.pair_id, e.version, e.evaluation, e.evaluation_notes, e.created_at
+        FROM evaluations e
+        WHERE e.version = (SELECT MAX(version) FROM evaluations WHERE pair_id = e.pair_id)
+    """)
+
+    # Single-row counter bumped by every write, used to validate cached pages
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS data_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)")
+
+    _migrate_legacy_evaluations(cursor)
+
+
+def _migration_query_indexes(cursor: sqlite3.Cursor) -> None:
+    """Indexes for listing pairs by name and looking them up by CURIE or evaluation."""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_entity_pairs_entity_name ON entity_pairs (entity_name)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_entity_pairs_curie_1 ON entity_pairs (curie_1)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_entity_pairs_curie_2 ON entity_pairs (curie_2)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_evaluations_evaluation ON evaluations (evaluation)")
+
+
+def _migration_clique_snapshots(cursor: sqlite3.Cursor) -> None:
+    """Last seen normalization of each pair, for listing many pairs without NodeNorm calls."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS clique_snapshots (
+            pair_id INTEGER PRIMARY KEY,
+            preferred_1 TEXT,
+            label_1 TEXT,
+            type_1 TEXT,
+            preferred_2 TEXT,
+            label_2 TEXT,
+            type_2 TEXT,
+            same_clique INTEGER NOT NULL,
+            suggestion TEXT,
+            captured_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def _migration_jobs(cursor: sqlite3.Cursor) -> None:
+    """Background job queue (see jobs.py)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            params TEXT NOT NULL DEFAULT '{}',
+            status TEXT NOT NULL DEFAULT 'queued',
+            progress INTEGER NOT NULL DEFAULT 0,
+            total INTEGER,
+            message TEXT,
+            result TEXT,
+            error TEXT,
+            cancel_requested INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            updated_at TIMESTAMP,
+            finished_at TIMESTAMP
         )
     """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id)")
+
+
+def _migration_request_profiles(cursor: sqlite3.Cursor) -> None:
+    """Profiles of sampled and slow requests (see profiling.py)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS request_profiles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            method TEXT NOT NULL,
+            path TEXT NOT NULL,
+            endpoint TEXT,
+            pair_id INTEGER,
+            status INTEGER,
+            duration_ms REAL NOT NULL,
+            mode TEXT NOT NULL,
+            reason TEXT NOT NULL,
+            functions TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_request_profiles_endpoint ON request_profiles (endpoint, id)")
+
+
+def _migration_clique_members(cursor: sqlite3.Cursor) -> None:
+    """Index from preferred ID to the pairs whose CURIEs normalize to it, kept in step with the snapshots."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS clique_members (
+            pair_id INTEGER NOT NULL,
+            side INTEGER NOT NULL,
+            preferred_id TEXT NOT NULL,
+            PRIMARY KEY (pair_id, side)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_clique_members_preferred ON clique_members (preferred_id, pair_id)")
+    cursor.execute("""
+        INSERT OR IGNORE INTO clique_members (pair_id, side, preferred_id)
+        SELECT pair_id, 1, preferred_1 FROM clique_snapshots WHERE preferred_1 IS NOT NULL
+        UNION ALL
+        SELECT pair_id, 2, preferred_2 FROM clique_snapshots WHERE preferred_2 IS NOT NULL
+    """)
+
+
+# Ordered schema migrations as (version, description, function). Append new
+# migrations to the end; never edit or reorder ones that have been released.
+# Each must be idempotent, since a database created before versioning was
+# tracked may already contain some of its objects.
+MIGRATIONS = [
+    (1, "Initial schema", _migration_initial_schema),
+    (2, "Indexes for hot queries", _migration_query_indexes),
+    (3, "Clique snapshots", _migration_clique_snapshots),
+    (4, "Job queue", _migration_jobs),
+    (5, "Request profiles", _migration_request_profiles),
+    (6, "Clique membership index", _migration_clique_members),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def init_db(db_path: str = "nn_investigator.db") -> None:
+    """Apply any pending schema migrations, doing nothing if the database is current."""
+    if get_schema_version(db_path) == SCHEMA_VERSION:
+        return
+
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+
+    # WAL lets the index page keep reading while another worker saves
+    cursor.execute("PRAGMA journal_mode=WAL")
+
+    # Serialize with other processes starting at the same time
+    cursor.execute("BEGIN IMMEDIATE")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER NOT NULL
+        )
+    """)
+    row = cursor.execute("SELECT MAX(version) AS version FROM schema_version").fetchone()
+    current_version = row["version"] or 0
+
+    for version, description, migrate in MIGRATIONS:
+        if version > current_version:
+            migrate(cursor)
+            cursor.execute("INSERT INTO schema_version (version) VALUES (?)", (version,))
 
     conn.commit()
     conn.close()
 
 
+def _migrate_legacy_evaluations(cursor: sqlite3.Cursor) -> None:
+    """Move evaluations stored directly on entity_pairs into the history table."""
+    columns = {row["name"] for row in cursor.execute("PRAGMA table_info(entity_pairs)")}
+    if "evaluation" not in columns:
+        return
+
+    cursor.execute("""
+        INSERT INTO evaluations (pair_id, version, evaluation, evaluation_notes)
+        SELECT id, 1, evaluation, evaluation_notes
+        FROM entity_pairs
+        WHERE evaluation IS NOT NULL
+          AND id NOT IN (SELECT pair_id FROM evaluations)
+    """)
+    cursor.execute("ALTER TABLE entity_pairs DROP COLUMN evaluation")
+    cursor.execute("ALTER TABLE entity_pairs DROP COLUMN evaluation_notes")
+
+
+def _bump_data_version(cursor: sqlite3.Cursor) -> None:
+    """Increment the data version within the caller's transaction."""
+    cursor.execute("UPDATE data_version SET version = version + 1 WHERE id = 1")
+
+
+def get_data_version(db_path: str = "nn_investigator.db") -> int:
+    """Get the counter that changes whenever pairs, evaluations or clique memberships change."""
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT version FROM data_version WHERE id = 1")
+    row = cursor.fetchone()
+    conn.close()
+
+    return row["version"] if row else 0
+
+
+# Pairs joined with their latest evaluation; append WHERE/ORDER BY clauses
+_PAIR_SELECT = """
+    SELECT p.id, p.entity_name, p.curie_1, p.curie_1_label, p.curie_2, p.curie_2_label, p.notes, p.created_at,
+           le.evaluation, le.evaluation_notes, COALESCE(le.version, 0) AS evaluation_version
+    FROM entity_pairs p
+    LEFT JOIN latest_evaluations le ON le.pair_id = p.id
+"""
+
+
 def add_pair(
     entity_name: str,
     curie_1: str,
@@ -54,21 +281,52 @@ def add_pair(
     """, (entity_name, curie_1, curie_1_label, curie_2, curie_2_label, notes))
 
     pair_id = cursor.lastrowid
+    _bump_data_version(cursor)
     conn.commit()
     conn.close()
 
     return pair_id
 
 
+def add_pairs(pairs: list[dict], db_path: str = "nn_investigator.db") -> int:
+    """
+    Add many entity pairs in one transaction.
+
+    Args:
+        pairs: Dictionaries with entity_name, curie_1 and curie_2, and optionally
+            curie_1_label, curie_2_label and notes
+
+    Returns:
+        The number of pairs added
+    """
+    if not pairs:
+        return 0
+
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+
+    cursor.executemany("""
+        INSERT INTO entity_pairs (entity_name, curie_1, curie_1_label, curie_2, curie_2_label, notes)
+        VALUES (:entity_name, :curie_1, :curie_1_label, :curie_2, :curie_2_label, :notes)
+    """, [
+        {"curie_1_label": None, "curie_2_label": None, "notes": None, **pair}
+        for pair in pairs
+    ])
+
+    _bump_data_version(cursor)
+    conn.commit()
+    conn.close()
+
+    return len(pairs)
+
+
 def get_all_pairs(db_path: str = "nn_investigator.db") -> list[dict]:
     """Get all entity pairs from the database."""
     conn = get_connection(db_path)
     cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT id, entity_name, curie_1, curie_1_label, curie_2, curie_2_label, notes, created_at, evaluation, evaluation_notes
-        FROM entity_pairs
-        ORDER BY entity_name
+    cursor.execute(_PAIR_SELECT + """
+        ORDER BY p.entity_name
     """)
 
     pairs = [dict(row) for row in cursor.fetchall()]
@@ -77,15 +335,22 @@ def get_all_pairs(db_path: str = "nn_investigator.db") -> list[dict]:
     return pairs
 
 
+def count_pairs(db_path: str = "nn_investigator.db") -> int:
+    """Get the number of entity pairs."""
+    conn = get_connection(db_path)
+    row = conn.execute("SELECT COUNT(*) AS count FROM entity_pairs").fetchone()
+    conn.close()
+
+    return row["count"]
+
+
 def get_pair(pair_id: int, db_path: str = "nn_investigator.db") -> Optional[dict]:
     """Get a specific entity pair by ID."""
     conn = get_connection(db_path)
     cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT id, entity_name, curie_1, curie_1_label, curie_2, curie_2_label, notes, created_at, evaluation, evaluation_notes
-        FROM entity_pairs
-        WHERE id = ?
+    cursor.execute(_PAIR_SELECT + """
+        WHERE p.id = ?
     """, (pair_id,))
 
     row = cursor.fetchone()
@@ -94,27 +359,183 @@ def get_pair(pair_id: int, db_path: str = "nn_investigator.db") -> Optional[dict
     return dict(row) if row else None
 
 
+def get_pairs_by_curies(curies: list[str], db_path: str = "nn_investigator.db") -> list[dict]:
+    """Get the pairs in which any of the given CURIEs appears, on either side."""
+    if not curies:
+        return []
+
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+
+    placeholders = ",".join("?" for _ in curies)
+    cursor.execute(_PAIR_SELECT + f"""
+        WHERE p.curie_1 IN ({placeholders}) OR p.curie_2 IN ({placeholders})
+        ORDER BY p.entity_name
+    """, (*curies, *curies))
+
+    pairs = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+
+    return pairs
+
+
+def get_pairs_by_evaluation(evaluation: Optional[str], db_path: str = "nn_investigator.db") -> list[dict]:
+    """Get the pairs whose latest evaluation is the given one (None for unevaluated pairs)."""
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+
+    if evaluation is None:
+        cursor.execute(_PAIR_SELECT + """
+            WHERE le.pair_id IS NULL
+            ORDER BY p.entity_name
+        """)
+    else:
+        cursor.execute(_PAIR_SELECT + """
+            WHERE le.evaluation = ?
+            ORDER BY p.entity_name
+        """, (evaluation,))
+
+    pairs = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+
+    return pairs
+
+
 def update_evaluation(
     pair_id: int,
     evaluation: str,
     evaluation_notes: Optional[str] = None,
+    expected_version: Optional[int] = None,
     db_path: str = "nn_investigator.db"
 ) -> bool:
-    """Update the evaluation for an entity pair."""
+    """
+    Record a new evaluation for an entity pair.
+
+    Evaluations are appended to the history table rather than overwritten.
+    When expected_version is given, the save only succeeds if it matches the
+    pair's latest evaluation version (0 if the pair was never evaluated).
+
+    Returns:
+        True if the evaluation was recorded, False if the pair does not exist
+
+    Raises:
+        EvaluationConflictError: If expected_version is stale
+    """
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+
+    try:
+        # Take the write lock up front so the version check and insert are atomic
+        cursor.execute("BEGIN IMMEDIATE")
+
+        cursor.execute("SELECT 1 FROM entity_pairs WHERE id = ?", (pair_id,))
+        if cursor.fetchone() is None:
+            conn.rollback()
+            return False
+
+        cursor.execute("""
+            SELECT pair_id, version, evaluation, evaluation_notes, created_at
+            FROM latest_evaluations
+            WHERE pair_id = ?
+        """, (pair_id,))
+        row = cursor.fetchone()
+        current_version = row["version"] if row else 0
+
+        if expected_version is not None and expected_version != current_version:
+            conn.rollback()
+            raise EvaluationConflictError(pair_id, expected_version, dict(row) if row else None)
+
+        cursor.execute("""
+            INSERT INTO evaluations (pair_id, version, evaluation, evaluation_notes)
+            VALUES (?, ?, ?, ?)
+        """, (pair_id, current_version + 1, evaluation, evaluation_notes))
+        _bump_data_version(cursor)
+
+        conn.commit()
+    finally:
+        conn.close()
+
+    return True
+
+
+def bulk_update_evaluation(
+    pair_ids: list[int],
+    evaluation: str,
+    evaluation_notes: Optional[str] = None,
+    expected_versions: Optional[dict[int, int]] = None,
+    db_path: str = "nn_investigator.db"
+) -> list[int]:
+    """
+    Record the same evaluation for many entity pairs in one transaction.
+
+    Like update_evaluation, but either every pair is updated or none is.
+    expected_versions maps pair IDs to the evaluation version the caller saw;
+    pairs missing from it are updated whatever their current version.
+
+    Returns:
+        IDs of the pairs that were updated (pairs that do not exist are skipped)
+
+    Raises:
+        EvaluationConflictError: If any expected version is stale
+    """
+    pair_ids = list(dict.fromkeys(pair_ids))
+    if not pair_ids:
+        return []
+
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+
+        placeholders = ",".join("?" for _ in pair_ids)
+        cursor.execute(f"""
+            SELECT p.id, le.pair_id, COALESCE(le.version, 0) AS version, le.evaluation, le.evaluation_notes, le.created_at
+            FROM entity_pairs p
+            LEFT JOIN latest_evaluations le ON le.pair_id = p.id
+            WHERE p.id IN ({placeholders})
+        """, pair_ids)
+        current = {row["id"]: row for row in cursor.fetchall()}
+
+        for pair_id, expected_version in (expected_versions or {}).items():
+            row = current.get(pair_id)
+            if row is not None and expected_version != row["version"]:
+                conn.rollback()
+                latest = {key: row[key] for key in row.keys() if key != "id"} if row["pair_id"] else None
+                raise EvaluationConflictError(pair_id, expected_version, latest)
+
+        updated = [pair_id for pair_id in pair_ids if pair_id in current]
+        cursor.executemany("""
+            INSERT INTO evaluations (pair_id, version, evaluation, evaluation_notes)
+            VALUES (?, ?, ?, ?)
+        """, [(pair_id, current[pair_id]["version"] + 1, evaluation, evaluation_notes) for pair_id in updated])
+
+        if updated:
+            _bump_data_version(cursor)
+
+        conn.commit()
+    finally:
+        conn.close()
+
+    return updated
+
+
+def get_evaluation_history(pair_id: int, db_path: str = "nn_investigator.db") -> list[dict]:
+    """Get all recorded evaluations for a pair, newest first."""
     conn = get_connection(db_path)
     cursor = conn.cursor()
 
     cursor.execute("""
-        UPDATE entity_pairs
-        SET evaluation = ?, evaluation_notes = ?
-        WHERE id = ?
-    """, (evaluation, evaluation_notes, pair_id))
+        SELECT version, evaluation, evaluation_notes, created_at
+        FROM evaluations
+        WHERE pair_id = ?
+        ORDER BY version DESC
+    """, (pair_id,))
 
-    updated = cursor.rowcount > 0
-    conn.commit()
+    history = [dict(row) for row in cursor.fetchall()]
     conn.close()
 
-    return updated
+    return history
 
 
 def delete_pair(pair_id: int, db_path: str = "nn_investigator.db") -> bool:
@@ -123,9 +544,157 @@ def delete_pair(pair_id: int, db_path: str = "nn_investigator.db") -> bool:
     cursor = conn.cursor()
 
     cursor.execute("DELETE FROM entity_pairs WHERE id = ?", (pair_id,))
-
     deleted = cursor.rowcount > 0
+
+    cursor.execute("DELETE FROM evaluations WHERE pair_id = ?", (pair_id,))
+    cursor.execute("DELETE FROM clique_snapshots WHERE pair_id = ?", (pair_id,))
+    cursor.execute("DELETE FROM clique_members WHERE pair_id = ?", (pair_id,))
+
+    if deleted:
+        _bump_data_version(cursor)
+
     conn.commit()
     conn.close()
 
     return deleted
+
+
+def _clique_members(cursor: sqlite3.Cursor, pair_ids: list[int]) -> set[tuple]:
+    """The (pair_id, side, preferred_id) index rows of some pairs."""
+    members = set()
+    # Stay well under SQLite's limit on query parameters
+    for start in range(0, len(pair_ids), 500):
+        chunk = pair_ids[start:start + 500]
+        placeholders = ",".join("?" for _ in chunk)
+        cursor.execute(f"""
+            SELECT pair_id, side, preferred_id FROM clique_members WHERE pair_id IN ({placeholders})
+        """, chunk)
+        members.update(tuple(row) for row in cursor.fetchall())
+    return members
+
+
+def save_snapshots(snapshots: list[dict], db_path: str = "nn_investigator.db") -> None:
+    """
+    Store clique snapshots (see triage.build_snapshot), replacing older ones, in one transaction.
+
+    The clique membership index is updated to match; the data version only
+    changes when a pair moved to a different clique, so re-normalizing pairs
+    with unchanged cliques keeps cached pages valid.
+    """
+    if not snapshots:
+        return
+
+    pair_ids = list(dict.fromkeys(snapshot["pair_id"] for snapshot in snapshots))
+
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        before = _clique_members(cursor, pair_ids)
+
+        # Skip pairs deleted since they were normalized
+        cursor.executemany("""
+            INSERT OR REPLACE INTO clique_snapshots
+                (pair_id, preferred_1, label_1, type_1, preferred_2, label_2, type_2, same_clique, suggestion)
+            SELECT :pair_id, :preferred_1, :label_1, :type_1, :preferred_2, :label_2, :type_2, :same_clique, :suggestion
+            WHERE EXISTS (SELECT 1 FROM entity_pairs WHERE id = :pair_id)
+        """, snapshots)
+
+        cursor.executemany("DELETE FROM clique_members WHERE pair_id = ?", [(pair_id,) for pair_id in pair_ids])
+        cursor.executemany("""
+            INSERT OR REPLACE INTO clique_members (pair_id, side, preferred_id)
+            SELECT ?, ?, ?
+            WHERE EXISTS (SELECT 1 FROM entity_pairs WHERE id = ?)
+        """, [
+            (snapshot["pair_id"], side, snapshot[f"preferred_{side}"], snapshot["pair_id"])
+            for snapshot in snapshots
+            for side in (1, 2)
+            if snapshot[f"preferred_{side}"]
+        ])
+
+        if _clique_members(cursor, pair_ids) != before:
+            _bump_data_version(cursor)
+
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def get_snapshots(db_path: str = "nn_investigator.db") -> dict[int, dict]:
+    """Get the stored clique snapshot of every pair that has one, keyed by pair ID."""
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT * FROM clique_snapshots")
+    snapshots = {}
+    for row in cursor.fetchall():
+        snapshot = dict(row)
+        snapshot["same_clique"] = bool(snapshot["same_clique"])
+        snapshots[snapshot["pair_id"]] = snapshot
+    conn.close()
+
+    return snapshots
+
+
+def get_clique_members(db_path: str = "nn_investigator.db") -> list[tuple[str, int]]:
+    """Get every (preferred_id, pair_id) entry of the clique membership index."""
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT DISTINCT preferred_id, pair_id FROM clique_members ORDER BY preferred_id, pair_id")
+    members = [(row["preferred_id"], row["pair_id"]) for row in cursor.fetchall()]
+    conn.close()
+
+    return members
+
+
+def get_related_pairs(pair_id: int, db_path: str = "nn_investigator.db") -> list[dict]:
+    """
+    Get the other pairs in this pair's group (see triage.group_pairs).
+
+    Pairs are in one group when they share a preferred ID directly or
+    through a chain of other pairs, as on the landing page.
+
+    Returns:
+        Pairs (with their latest evaluation) plus "shared_ids", the preferred
+        IDs they have in common with this pair itself (empty when they are
+        only linked through other pairs)
+    """
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        WITH RECURSIVE grouped(pair_id) AS (
+            SELECT ?
+            UNION
+            SELECT other.pair_id
+            FROM grouped
+            JOIN clique_members mine ON mine.pair_id = grouped.pair_id
+            JOIN clique_members other ON other.preferred_id = mine.preferred_id
+        )
+        SELECT pair_id FROM grouped WHERE pair_id != ?
+    """, (pair_id, pair_id))
+    shared_ids: dict[int, list[str]] = {row["pair_id"]: [] for row in cursor.fetchall()}
+
+    cursor.execute("""
+        SELECT DISTINCT other.pair_id, other.preferred_id
+        FROM clique_members mine
+        JOIN clique_members other ON other.preferred_id = mine.preferred_id AND other.pair_id != mine.pair_id
+        WHERE mine.pair_id = ?
+        ORDER BY other.preferred_id
+    """, (pair_id,))
+    for row in cursor.fetchall():
+        shared_ids[row["pair_id"]].append(row["preferred_id"])
+
+    pairs = []
+    if shared_ids:
+        placeholders = ",".join("?" for _ in shared_ids)
+        cursor.execute(_PAIR_SELECT + f"""
+            WHERE p.id IN ({placeholders})
+            ORDER BY p.entity_name
+        """, list(shared_ids))
+        pairs = [{**dict(row), "shared_ids": shared_ids[row["id"]]} for row in cursor.fetchall()]
+    conn.close()
+
+    return pairs
@@ -0,0 +1,65 @@
+"""Summaries and paging of a clique's equivalent identifiers."""
+
+from typing import Optional
+
+
+def get_prefix(curie: str) -> str:
+    """Get the prefix of a CURIE (e.g. "CHEBI" for "CHEBI:15377")."""
+    return curie.split(":", 1)[0] if ":" in curie else curie
+
+
+def _equivalent_identifiers(clique: Optional[dict]) -> list[dict]:
+    if not clique:
+        return []
+    return clique.get("equivalent_identifiers") or []
+
+
+def compare_prefixes(clique_1: Optional[dict], clique_2: Optional[dict]) -> list[dict]:
+    """
+    Count identifiers per prefix in two cliques.
+
+    Returns:
+        List of dicts with 'prefix', 'count_1' and 'count_2' keys, most common prefixes first
+    """
+    counts: dict[str, list[int]] = {}
+    for side, clique in enumerate((clique_1, clique_2)):
+        for equiv in _equivalent_identifiers(clique):
+            counts.setdefault(get_prefix(equiv["identifier"]), [0, 0])[side] += 1
+
+    rows = [
+        {"prefix": prefix, "count_1": count_1, "count_2": count_2}
+        for prefix, (count_1, count_2) in counts.items()
+    ]
+    rows.sort(key=lambda row: (-(row["count_1"] + row["count_2"]), row["prefix"]))
+    return rows
+
+
+def page_identifiers(
+    clique: Optional[dict],
+    offset: int = 0,
+    limit: int = 100,
+    prefix: Optional[str] = None
+) -> dict:
+    """
+    Get one page of a clique's equivalent identifiers.
+
+    Args:
+        clique: Normalization result for a CURIE (or None)
+        offset: Number of identifiers to skip
+        limit: Maximum number of identifiers to return
+        prefix: Only include identifiers with this prefix (case-insensitive)
+
+    Returns:
+        Dict with 'total' (after filtering), 'offset', 'limit' and 'identifiers'
+    """
+    equivs = _equivalent_identifiers(clique)
+    if prefix:
+        prefix = prefix.upper()
+        equivs = [equiv for equiv in equivs if get_prefix(equiv["identifier"]).upper() == prefix]
+
+    return {
+        "total": len(equivs),
+        "offset": offset,
+        "limit": limit,
+        "identifiers": equivs[offset:offset + limit],
+    }
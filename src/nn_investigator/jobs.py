@@ -0,0 +1,463 @@
+"""A small persistent job queue for batch work that is too slow for a request.
+
+Jobs are rows in the jobs table of the app database, so they survive
+restarts and any process can queue one. Worker threads (started by the web
+app, or by "cli worker") claim queued jobs one at a time under a write lock,
+so several gunicorn workers can share the queue without running a job twice.
+Handlers report progress through a JobContext, which is also where a
+requested cancellation takes effect.
+"""
+
+import csv
+import json
+import logging
+import os
+import threading
+from typing import Callable, Optional
+
+from . import database
+
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+# A running job that has not reported progress for this long is assumed to
+# have lost its worker (e.g. the process was killed) and is marked failed
+STALE_AFTER = 3600
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job has been cancelled."""
+
+
+class JobContext:
+    """Passed to a job handler to report progress and notice cancellation."""
+
+    def __init__(self, job_id: int, config: dict):
+        self.job_id = job_id
+        self.config = config
+        self.db_path = config["DATABASE"]
+
+    def progress(self, done: int, total: Optional[int] = None, message: Optional[str] = None) -> None:
+        """
+        Record how far the job has got.
+
+        Raises:
+            JobCancelled: If cancellation was requested; the handler should let it propagate
+        """
+        conn = database.get_connection(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            UPDATE jobs
+            SET progress = ?, total = COALESCE(?, total), message = COALESCE(?, message),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, (done, total, message, self.job_id))
+        cursor.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (self.job_id,))
+        row = cursor.fetchone()
+
+        conn.commit()
+        conn.close()
+
+        if row and row["cancel_requested"]:
+            raise JobCancelled()
+
+
+# Job kind -> (label, handler); handlers take a JobContext and the job params
+# and return a JSON-serializable result
+HANDLERS: dict[str, tuple[str, Callable[[JobContext, dict], Optional[dict]]]] = {}
+
+
+def handler(kind: str, label: str):
+    """Register a function as the handler for a job kind."""
+    def register(func):
+        HANDLERS[kind] = (label, func)
+        return func
+    return register
+
+
+def _job_from_row(row) -> dict:
+    job = dict(row)
+    job["params"] = json.loads(job["params"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    job["cancel_requested"] = bool(job["cancel_requested"])
+    job["label"] = HANDLERS[job["kind"]][0] if job["kind"] in HANDLERS else job["kind"]
+    return job
+
+
+def enqueue(kind: str, params: Optional[dict] = None, db_path: str = "nn_investigator.db") -> int:
+    """
+    Queue a job.
+
+    Raises:
+        ValueError: If no handler is registered for kind
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+
+    conn = database.get_connection(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute("INSERT INTO jobs (kind, params) VALUES (?, ?)", (kind, json.dumps(params or {})))
+    job_id = cursor.lastrowid
+
+    conn.commit()
+    conn.close()
+
+    return job_id
+
+
+def get_job(job_id: int, db_path: str = "nn_investigator.db") -> Optional[dict]:
+    """Get a job by ID, with its params and result decoded."""
+    conn = database.get_connection(db_path)
+    row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    conn.close()
+
+    return _job_from_row(row) if row else None
+
+
+def list_jobs(limit: int = 50, results: bool = True, db_path: str = "nn_investigator.db") -> list[dict]:
+    """
+    Get the most recent jobs, newest first.
+
+    Args:
+        results: Whether to load and decode each job's result; report jobs
+            store whole reports, so status polling leaves them out
+    """
+    conn = database.get_connection(db_path)
+    rows = conn.execute(
+        f"SELECT *{'' if results else ', NULL AS result'} FROM jobs ORDER BY id DESC LIMIT ?", (limit,)
+    ).fetchall()
+    conn.close()
+
+    return [_job_from_row(row) for row in rows]
+
+
+def latest_job(kind: str, status: Optional[str] = None, db_path: str = "nn_investigator.db") -> Optional[dict]:
+    """Get the most recently queued job of a kind, optionally only among jobs with a status."""
+    conn = database.get_connection(db_path)
+    if status:
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE kind = ? AND status = ? ORDER BY id DESC LIMIT 1", (kind, status)
+        ).fetchone()
+    else:
+        row = conn.execute("SELECT * FROM jobs WHERE kind = ? ORDER BY id DESC LIMIT 1", (kind,)).fetchone()
+    conn.close()
+
+    return _job_from_row(row) if row else None
+
+
+def cancel(job_id: int, db_path: str = "nn_investigator.db") -> bool:
+    """
+    Cancel a job: queued jobs are cancelled at once, running ones at their next progress report.
+
+    Returns:
+        True if the job exists and had not finished
+    """
+    conn = database.get_connection(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        UPDATE jobs SET status = ?, finished_at = CURRENT_TIMESTAMP
+        WHERE id = ? AND status = ?
+    """, (CANCELLED, job_id, QUEUED))
+    if cursor.rowcount == 0:
+        cursor.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?", (job_id, RUNNING))
+    cancelled = cursor.rowcount > 0
+
+    conn.commit()
+    conn.close()
+
+    return cancelled
+
+
+def claim_next(db_path: str = "nn_investigator.db") -> Optional[dict]:
+    """Mark the oldest queued job as running and return it, or None if the queue is empty."""
+    conn = database.get_connection(db_path)
+    cursor = conn.cursor()
+
+    try:
+        # Idle workers poll often; look without the write lock first
+        cursor.execute("""
+            SELECT 1 FROM jobs
+            WHERE status = ? OR (status = ? AND updated_at < datetime('now', ?))
+            LIMIT 1
+        """, (QUEUED, RUNNING, f"-{STALE_AFTER} seconds"))
+        if cursor.fetchone() is None:
+            return None
+
+        # Only one worker can claim at a time
+        cursor.execute("BEGIN IMMEDIATE")
+
+        cursor.execute("""
+            UPDATE jobs
+            SET status = ?, error = 'The worker stopped before the job finished', finished_at = CURRENT_TIMESTAMP
+            WHERE status = ? AND updated_at < datetime('now', ?)
+        """, (FAILED, RUNNING, f"-{STALE_AFTER} seconds"))
+
+        cursor.execute("SELECT * FROM jobs WHERE status = ? ORDER BY id LIMIT 1", (QUEUED,))
+        row = cursor.fetchone()
+        if row is not None:
+            cursor.execute("""
+                UPDATE jobs SET status = ?, started_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (RUNNING, row["id"]))
+
+        conn.commit()
+    finally:
+        conn.close()
+
+    if row is None:
+        return None
+    return {**_job_from_row(row), "status": RUNNING}
+
+
+def _finish(job_id: int, status: str, db_path: str, result: Optional[dict] = None, error: Optional[str] = None) -> None:
+    conn = database.get_connection(db_path)
+    cursor = conn.execute("""
+        UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ? AND status = ?
+    """, (status, json.dumps(result) if result is not None else None, error, job_id, RUNNING))
+    conn.commit()
+    conn.close()
+
+    if cursor.rowcount == 0:
+        logger.warning("Job %d was no longer running (marked stale?); dropped its %s outcome", job_id, status)
+
+
+def run_job(job: dict, config: dict) -> None:
+    """Run a claimed job to completion, recording its outcome."""
+    context = JobContext(job["id"], config)
+
+    try:
+        if job["kind"] not in HANDLERS:
+            raise ValueError(f"Unknown job kind: {job['kind']}")
+        result = HANDLERS[job["kind"]][1](context, job["params"])
+    except JobCancelled:
+        _finish(job["id"], CANCELLED, context.db_path)
+    except Exception as e:
+        logger.exception("Job %d (%s) failed", job["id"], job["kind"])
+        _finish(job["id"], FAILED, context.db_path, error=str(e))
+    else:
+        _finish(job["id"], SUCCEEDED, context.db_path, result=result)
+
+
+def run_pending(config: dict) -> int:
+    """Run queued jobs in the calling thread until the queue is empty; returns how many ran."""
+    count = 0
+    while (job := claim_next(config["DATABASE"])) is not None:
+        run_job(job, config)
+        count += 1
+    return count
+
+
+class JobWorker:
+    """Background threads that run queued jobs until stopped."""
+
+    def __init__(self, config: dict, threads: int = 1, poll_interval: float = 1.0):
+        self.config = config
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self._stopping = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        for i in range(self.threads):
+            thread = threading.Thread(target=self._loop, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def join(self) -> None:
+        """Block until the worker is stopped."""
+        for thread in self._threads:
+            thread.join()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop polling; jobs already running are finished first."""
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                job = claim_next(self.config["DATABASE"])
+            except Exception:
+                logger.exception("Could not claim a job")
+                job = None
+
+            if job is None:
+                self._stopping.wait(self.poll_interval)
+            else:
+                run_job(job, self.config)
+
+
+def _build_backend(config: dict):
+    from .backends import backend_names, build_backend
+    from .cache import SQLiteCache
+
+    cache = None
+    if "cache" in backend_names(config):
+        cache = SQLiteCache(config["CACHE_DATABASE"], ttl=config["CACHE_TTL"])
+    return build_backend(config, cache)
+
+
+SNAPSHOT_BATCH_SIZE = 200
+
+# Pair fields kept in the rows of stored reports
+REPORT_PAIR_FIELDS = ("id", "entity_name", "curie_1", "curie_2")
+
+
+def _resolved_pairs(pairs: list[dict], norm_results) -> list[dict]:
+    """
+    The pairs whose normalization can be stored.
+
+    During a partial outage (norm_results.error) a CURIE that came back None
+    may just not have been fetched, so pairs with one are left out rather
+    than snapshotted (and ungrouped in the clique membership index) as unresolved.
+    """
+    if not norm_results.error:
+        return pairs
+    return [pair for pair in pairs if norm_results.get(pair["curie_1"]) and norm_results.get(pair["curie_2"])]
+
+
+@handler("snapshots", "Refresh clique snapshots")
+def refresh_snapshots(context: JobContext, params: dict) -> dict:
+    """
+    Normalize pairs in batches and store their clique snapshots (params: scope "missing" or "all").
+
+    Pairs that could not be normalized because of an upstream outage are
+    counted as skipped and keep their previous snapshot, if any.
+    """
+    from . import triage
+    from .backends import normalize_bulk
+
+    pairs = database.get_all_pairs(db_path=context.db_path)
+    if params.get("scope") != "all":
+        existing = database.get_snapshots(db_path=context.db_path)
+        pairs = [pair for pair in pairs if pair["id"] not in existing]
+
+    backend = _build_backend(context.config)
+    saved, error = 0, None
+    for start in range(0, len(pairs), SNAPSHOT_BATCH_SIZE):
+        context.progress(start, len(pairs))
+        batch = pairs[start:start + SNAPSHOT_BATCH_SIZE]
+        norm_results = normalize_bulk(backend, [curie for pair in batch for curie in (pair["curie_1"], pair["curie_2"])])
+        resolved = _resolved_pairs(batch, norm_results)
+        database.save_snapshots([triage.build_snapshot(pair, norm_results) for pair in resolved], db_path=context.db_path)
+        saved += len(resolved)
+        error = error or norm_results.error
+
+    context.progress(len(pairs), len(pairs))
+    return {"pairs": saved, "skipped": len(pairs) - saved, "error": error}
+
+
+@handler("compare", "Compare endpoints")
+def compare_instances(context: JobContext, params: dict) -> dict:
+    """Compare every pair across the configured NodeNorm/NameRes instances (see compare.py); the result is the report."""
+    from . import compare
+
+    nodenorm_endpoints, nameres_endpoints = compare.configured_endpoints(context.config)
+    pairs = database.get_all_pairs(db_path=context.db_path)
+
+    message = f"Querying {len(nodenorm_endpoints) + len(nameres_endpoints)} instance(s)"
+    context.progress(0, None, message)
+    report = compare.compare_endpoints(
+        pairs,
+        nodenorm_endpoints,
+        nameres_endpoints,
+        max_workers=context.config["COMPARE_WORKERS"],
+        progress=lambda done, total: context.progress(done, total, message)
+    )
+
+    return {
+        **report,
+        "rows": [{key: row[key] for key in REPORT_PAIR_FIELDS + ("outcomes", "name_hits", "differs")} for row in report["rows"]],
+        "difference_count": sum(1 for row in report["rows"] if row["differs"]),
+    }
+
+
+@handler("overlap", "Clique overlap report")
+def overlap_report(context: JobContext, params: dict) -> dict:
+    """
+    Normalize pairs in batches and compare the two cliques of each (see overlap.py); the result is the report.
+
+    The clique snapshots are refreshed along the way, as by the snapshots job.
+    """
+    from . import overlap
+    from . import triage
+    from .backends import normalize_bulk
+
+    pairs = database.get_all_pairs(db_path=context.db_path)
+    backend = _build_backend(context.config)
+
+    rows, stale, error = [], False, None
+    for start in range(0, len(pairs), SNAPSHOT_BATCH_SIZE):
+        context.progress(start, len(pairs))
+        batch = [{key: pair[key] for key in REPORT_PAIR_FIELDS + ("evaluation",)} for pair in pairs[start:start + SNAPSHOT_BATCH_SIZE]]
+        norm_results = normalize_bulk(backend, [curie for pair in batch for curie in (pair["curie_1"], pair["curie_2"])])
+        rows.extend(overlap.analyze_pairs(batch, norm_results))
+        database.save_snapshots(
+            [triage.build_snapshot(pair, norm_results) for pair in _resolved_pairs(batch, norm_results)],
+            db_path=context.db_path
+        )
+        stale = stale or norm_results.stale
+        error = error or norm_results.error
+
+    context.progress(len(pairs), len(pairs))
+    return {"rows": rows, "stale": stale, "error": error}
+
+
+IMPORT_COLUMNS = ("entity_name", "curie_1", "curie_1_label", "curie_2", "curie_2_label", "notes")
+IMPORT_BATCH_SIZE = 1000
+
+
+@handler("import_pairs", "Import pairs")
+def import_pairs(context: JobContext, params: dict) -> dict:
+    """
+    Add the pairs in a TSV file (params: path, and delete_after to remove the file when done).
+
+    The file needs a header row naming at least entity_name, curie_1 and
+    curie_2; curie_1_label, curie_2_label and notes are optional. Rows missing
+    a required value are skipped. Cancelling keeps the batches already added.
+    """
+    path = params["path"]
+    added = skipped = 0
+
+    try:
+        with open(path, newline="") as f:
+            total = max(sum(1 for _ in f) - 1, 0)
+
+        with open(path, newline="") as f:
+            reader = csv.DictReader(f, delimiter="\t")
+            missing = {"entity_name", "curie_1", "curie_2"} - set(reader.fieldnames or [])
+            if missing:
+                raise ValueError(f"Missing column(s): {', '.join(sorted(missing))}")
+
+            context.progress(0, total)
+            batch = []
+            for row in reader:
+                if not all((row.get(column) or "").strip() for column in ("entity_name", "curie_1", "curie_2")):
+                    skipped += 1
+                    continue
+                batch.append({column: (row.get(column) or "").strip() or None for column in IMPORT_COLUMNS})
+                if len(batch) == IMPORT_BATCH_SIZE:
+                    added += database.add_pairs(batch, db_path=context.db_path)
+                    batch = []
+                    context.progress(added + skipped, total)
+
+            added += database.add_pairs(batch, db_path=context.db_path)
+            context.progress(added + skipped, total)
+    finally:
+        if params.get("delete_after") and os.path.exists(path):
+            os.unlink(path)
+
+    return {"added": added, "skipped": skipped}
@@ -0,0 +1,251 @@
+"""Normalize CURIEs from local clique dump files instead of the NodeNorm API.
+
+A clique dump is a JSONL file with one clique per line, either in Babel
+compendium format::
+
+    {"type": "biolink:SmallMolecule", "preferred_name": "Water",
+     "identifiers": [{"i": "CHEBI:15377", "l": "water"}, ...]}
+
+or in the format returned by Node Normalization::
+
+    {"id": {"identifier": "CHEBI:15377", "label": "Water"},
+     "equivalent_identifiers": [{"identifier": "CHEBI:15377", "label": "water"}, ...],
+     "type": ["biolink:SmallMolecule", ...]}
+
+build_index() writes a sorted text index with one "CURIE<TAB>file<TAB>offset"
+line per identifier. LocalCliqueIndex memory-maps the index and the dump
+files and finds a CURIE by binary search, so lookups only touch the pages
+they need and nothing is loaded into RAM up front. Dump files must be
+uncompressed so they can be memory-mapped.
+"""
+
+import heapq
+import json
+import mmap
+import os
+import tempfile
+import threading
+from typing import Iterator, Optional
+
+
+INDEX_FORMAT = 1
+
+
+def _record_identifiers(record: dict) -> list[str]:
+    """Get all identifiers of a clique record in either supported format."""
+    if "equivalent_identifiers" in record:
+        return [equiv["identifier"] for equiv in record["equivalent_identifiers"]]
+    return [identifier["i"] for identifier in record.get("identifiers", [])]
+
+
+def to_normalized(record: dict) -> dict:
+    """Convert a clique record to the shape returned by nodenorm.normalize_curies."""
+    if "equivalent_identifiers" in record:
+        return record
+
+    identifiers = record.get("identifiers", [])
+    equivalent_identifiers = [
+        {"identifier": identifier["i"], **({"label": identifier["l"]} if identifier.get("l") else {})}
+        for identifier in identifiers
+    ]
+
+    preferred = dict(equivalent_identifiers[0]) if equivalent_identifiers else {}
+    if record.get("preferred_name"):
+        preferred["label"] = record["preferred_name"]
+
+    clique_type = record.get("type")
+    return {
+        "id": preferred,
+        "equivalent_identifiers": equivalent_identifiers,
+        "type": [clique_type] if isinstance(clique_type, str) else (clique_type or []),
+    }
+
+
+def _scan_dump(path: str) -> Iterator[tuple[str, int]]:
+    """Yield (curie, byte offset of its record) for every identifier in a dump file."""
+    offset = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                for curie in _record_identifiers(json.loads(line)):
+                    yield curie, offset
+            offset += len(line)
+
+
+def _write_sorted_run(lines: list[str], directory: str) -> str:
+    """Sort index lines and write them to a temporary file for merging."""
+    lines.sort()
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+    return path
+
+
+def _read_run(path: str) -> Iterator[str]:
+    with open(path, encoding="utf-8") as f:
+        yield from f
+
+
+def build_index(dump_paths: list[str], index_path: str, chunk_size: int = 1_000_000) -> int:
+    """
+    Build a CURIE index over clique dump files.
+
+    Entries are sorted in chunks of chunk_size and merged, so memory use does
+    not grow with the size of the dumps.
+
+    Args:
+        dump_paths: JSONL clique dump files
+        index_path: Where to write the index
+        chunk_size: Number of entries sorted in memory at a time
+
+    Returns:
+        Number of CURIEs indexed
+    """
+    dump_paths = [os.path.abspath(path) for path in dump_paths]
+    directory = os.path.dirname(os.path.abspath(index_path))
+    runs = []
+    count = 0
+
+    try:
+        chunk = []
+        for file_number, path in enumerate(dump_paths):
+            for curie, offset in _scan_dump(path):
+                # Tab sorts before any character allowed in a CURIE, so sorting
+                # whole lines orders them by CURIE
+                chunk.append(f"{curie}\t{file_number}\t{offset}\n")
+                count += 1
+                if len(chunk) >= chunk_size:
+                    runs.append(_write_sorted_run(chunk, directory))
+                    chunk = []
+        if chunk or not runs:
+            runs.append(_write_sorted_run(chunk, directory))
+
+        header = json.dumps({"format": INDEX_FORMAT, "files": dump_paths})
+        with open(index_path, "w", encoding="utf-8") as out:
+            out.write(header + "\n")
+            out.writelines(heapq.merge(*(_read_run(run) for run in runs)))
+    finally:
+        for run in runs:
+            os.unlink(run)
+
+    return count
+
+
+class LocalCliqueIndex:
+    """
+    Read-only CURIE lookup over memory-mapped clique dumps, safe to share between threads.
+
+    Provides normalize_curies() with the same interface and result shape as
+    nodenorm.normalize_curies. Conflation is whatever the dump files contain;
+    the conflation arguments are accepted for compatibility only.
+    """
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self._index_file = open(index_path, "rb")
+        self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header_end = self._index.find(b"\n")
+        header = json.loads(self._index[:header_end])
+        if header.get("format") != INDEX_FORMAT:
+            raise ValueError(f"Unsupported index format in {index_path}: {header.get('format')}")
+
+        self.dump_paths = header["files"]
+        self._start = header_end + 1
+        self._dumps: dict[int, tuple] = {}
+        self._dumps_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Release the memory maps and file handles."""
+        with self._dumps_lock:
+            for dump, f in self._dumps.values():
+                dump.close()
+                f.close()
+            self._dumps.clear()
+        self._index.close()
+        self._index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _find(self, curie: str) -> Optional[tuple[int, int]]:
+        """Binary search the index for a CURIE; returns (file number, offset)."""
+        index = self._index
+        key = curie.encode("utf-8")
+        lo, hi = self._start, len(index)
+
+        # Invariant: lo and hi are line starts; lines before lo have keys < key,
+        # lines from hi on have keys >= key.
+        while lo < hi:
+            mid = (lo + hi) // 2
+            newline = index.rfind(b"\n", lo, mid)
+            line_start = newline + 1 if newline >= 0 else lo
+            line_end = index.find(b"\n", line_start)
+            line_key = index[line_start:index.find(b"\t", line_start, line_end)]
+
+            if line_key < key:
+                lo = line_end + 1
+            else:
+                hi = line_start
+
+        if lo >= len(index):
+            return None
+
+        line = index[lo:index.find(b"\n", lo)]
+        line_key, file_number, offset = line.split(b"\t")
+        if line_key != key:
+            return None
+        return int(file_number), int(offset)
+
+    def _dump(self, file_number: int) -> mmap.mmap:
+        """The memory map of a dump file, opened on first use."""
+        if file_number not in self._dumps:
+            # Map each file once, however many threads look CURIEs up at the same time
+            with self._dumps_lock:
+                if file_number not in self._dumps:
+                    f = open(self.dump_paths[file_number], "rb")
+                    self._dumps[file_number] = (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), f)
+        return self._dumps[file_number][0]
+
+    def _read_record(self, file_number: int, offset: int) -> dict:
+        dump = self._dump(file_number)
+
+        end = dump.find(b"\n", offset)
+        return json.loads(dump[offset:end if end >= 0 else len(dump)])
+
+    def lookup(self, curie: str) -> Optional[dict]:
+        """Get the normalized clique containing a CURIE, or None if it is not in the dumps."""
+        location = self._find(curie)
+        if location is None:
+            return None
+        return to_normalized(self._read_record(*location))
+
+    def normalize_curies(
+        self,
+        curies: list[str],
+        conflate: bool = True,
+        drug_chemical_conflate: bool = True,
+        description: bool = False
+    ) -> dict:
+        """
+        Normalize CURIEs from the local dumps.
+
+        Returns:
+            Dictionary mapping input CURIEs to their normalized results (None if not found)
+        """
+        records: dict[tuple[int, int], dict] = {}
+        result = {}
+
+        for curie in curies:
+            location = self._find(curie)
+            if location is None:
+                result[curie] = None
+                continue
+            if location not in records:
+                records[location] = to_normalized(self._read_record(*location))
+            result[curie] = records[location]
+
+        return result
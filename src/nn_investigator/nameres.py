@@ -1,29 +1,60 @@
 """Client for Name Resolution API."""
 
-import requests
+import threading
 from typing import Optional
 
+from . import transport
+from .resilience import CircuitBreaker, call_with_deadline
+
 
 NAMERES_URL = "https://name-resolution-sri.renci.org"
 
+# (connect, read) timeouts in seconds, so a hung upstream cannot hold a worker thread
+REQUEST_TIMEOUT = (3.05, 20)
+
+# Seconds a whole call may take, however slowly the response arrives
+REQUEST_DEADLINE = 30
+
+breaker = CircuitBreaker("Name Resolution")
+
+_breakers: dict[str, CircuitBreaker] = {NAMERES_URL: breaker}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(base_url: str) -> CircuitBreaker:
+    """Get the circuit breaker for a Name Resolution instance (one per base URL)."""
+    with _breakers_lock:
+        if base_url not in _breakers:
+            _breakers[base_url] = CircuitBreaker(f"Name Resolution ({base_url})")
+        return _breakers[base_url]
+
+
+def _post(base_url: Optional[str], path: str, **kwargs):
+    """POST to Name Resolution through the circuit breaker and return the decoded JSON."""
+    base_url = (base_url or NAMERES_URL).rstrip("/")
+
+    def post():
+        response = transport.get_transport().post(base_url + path, timeout=REQUEST_TIMEOUT, **kwargs)
+        response.raise_for_status()
+        return response.json()
 
-def get_synonyms(preferred_curies: list[str]) -> dict:
+    return get_breaker(base_url).call(call_with_deadline, post, REQUEST_DEADLINE)
+
+
+def get_synonyms(preferred_curies: list[str], base_url: Optional[str] = None) -> dict:
     """
     Get synonyms for preferred CURIEs.
 
     Args:
         preferred_curies: List of preferred CURIEs to get synonyms for
+        base_url: Name Resolution instance to use (default: NAMERES_URL)
 
     Returns:
         Dictionary mapping CURIEs to their synonym data
     """
-    url = f"{NAMERES_URL}/synonyms"
     payload = {"preferred_curies": preferred_curies}
 
-    response = requests.post(url, json=payload)
-    response.raise_for_status()
-
-    return response.json()
+    return _post(base_url, "/synonyms", json=payload)
 
 
 def lookup(
@@ -34,7 +65,8 @@ def lookup(
     limit: int = 10,
     biolink_type: Optional[str] = None,
     only_prefixes: Optional[list[str]] = None,
-    only_taxa: Optional[list[str]] = None
+    only_taxa: Optional[list[str]] = None,
+    base_url: Optional[str] = None
 ) -> list[dict]:
     """
     Look up CURIEs by name.
@@ -48,12 +80,11 @@ def lookup(
         biolink_type: Filter by Biolink entity type (e.g., 'Disease', 'SmallMolecule')
         only_prefixes: Only include results from these namespaces
         only_taxa: Only include results from these taxa (e.g., ['NCBITaxon:9606'] for humans)
+        base_url: Name Resolution instance to use (default: NAMERES_URL)
 
     Returns:
         List of matching entities with their CURIEs and metadata
     """
-    url = f"{NAMERES_URL}/lookup"
-
     params = {
         "string": query,
         "autocomplete": str(autocomplete).lower(),
@@ -72,29 +103,20 @@ def lookup(
         payload["only_taxa"] = only_taxa
 
     if payload:
-        response = requests.post(url, params=params, json=payload)
-    else:
-        response = requests.post(url, params=params)
+        return _post(base_url, "/lookup", params=params, json=payload)
+    return _post(base_url, "/lookup", params=params)
 
-    response.raise_for_status()
 
-    return response.json()
-
-
-def bulk_lookup(queries: dict[str, dict]) -> dict:
+def bulk_lookup(queries: dict[str, dict], base_url: Optional[str] = None) -> dict:
     """
     Look up multiple names at once.
 
     Args:
         queries: Dictionary mapping query IDs to their search parameters.
                  Each value should be a dict with keys like 'string', 'biolink_type', etc.
+        base_url: Name Resolution instance to use (default: NAMERES_URL)
 
     Returns:
         Dictionary mapping query IDs to their results
     """
-    url = f"{NAMERES_URL}/bulk_lookup"
-
-    response = requests.post(url, json=queries)
-    response.raise_for_status()
-
-    return response.json()
+    return _post(base_url, "/bulk_lookup", json=queries)
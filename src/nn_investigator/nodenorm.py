@@ -1,17 +1,68 @@
 """Client for Node Normalization API."""
 
+import logging
+import threading
 import requests
-from typing import Optional
+from typing import Callable, Optional
+
+from . import transport
+from .resilience import CircuitBreaker, CircuitOpenError, call_with_deadline
 
 
 NODENORM_URL = "https://nodenormalization-sri.renci.org/get_normalized_nodes"
 
+# (connect, read) timeouts in seconds, so a hung upstream cannot hold a worker thread
+REQUEST_TIMEOUT = (3.05, 20)
+
+# Seconds a whole call may take, however slowly the response arrives
+REQUEST_DEADLINE = 30
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+class NormalizationResult(dict):
+    """
+    Normalization results that may have been served from a stale cache.
+
+    Behaves exactly like the dict returned by normalize_curies; stale is True
+    when some entries are older than the cache TTL (or the upstream service
+    could not be reached), and fetched_at is when the oldest entry was stored.
+    error is set when the upstream could not be reached for some CURIEs,
+    which then map to None although they may well normalize.
+    """
+
+    def __init__(
+        self,
+        *args,
+        stale: bool = False,
+        fetched_at: Optional[float] = None,
+        error: Optional[str] = None,
+        **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.stale = stale
+        self.fetched_at = fetched_at
+        self.error = error
+
+
+def get_breaker(url: str) -> CircuitBreaker:
+    """Get the circuit breaker for a Node Normalization endpoint (one per URL)."""
+    with _breakers_lock:
+        if url not in _breakers:
+            name = "Node Normalization" if url == NODENORM_URL else f"Node Normalization ({url})"
+            _breakers[url] = CircuitBreaker(name)
+        return _breakers[url]
+
 
 def normalize_curies(
     curies: list[str],
     conflate: bool = True,
     drug_chemical_conflate: bool = True,
-    description: bool = False
+    description: bool = False,
+    url: Optional[str] = None
 ) -> dict:
     """
     Normalize CURIEs using the Node Normalization API.
@@ -21,9 +72,14 @@ def normalize_curies(
         conflate: Enable gene/protein conflation (default: True)
         drug_chemical_conflate: Enable drug/chemical conflation (default: True)
         description: Return descriptions (default: False)
+        url: get_normalized_nodes endpoint to use (default: NODENORM_URL)
 
     Returns:
         Dictionary mapping input CURIEs to their normalized results
+
+    Raises:
+        requests.RequestException: If the request fails or times out
+        CircuitOpenError: If recent requests failed and the service is being skipped
     """
     payload = {
         "curies": curies,
@@ -32,10 +88,122 @@ def normalize_curies(
         "description": description
     }
 
-    response = requests.post(NODENORM_URL, json=payload)
-    response.raise_for_status()
+    url = url or NODENORM_URL
+
+    def post():
+        response = transport.get_transport().post(url, json=payload, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+    return get_breaker(url).call(call_with_deadline, post, REQUEST_DEADLINE)
+
+
+def normalize_curies_cached(
+    curies: list[str],
+    cache,
+    conflate: bool = True,
+    drug_chemical_conflate: bool = True,
+    fetch: Optional[Callable[..., dict]] = None,
+    namespace: str = "nodenorm"
+) -> NormalizationResult:
+    """
+    Normalize CURIEs, reusing results stored in a shared cache.
+
+    Each CURIE is cached separately so that pairs sharing a CURIE reuse the
+    same entry; CURIEs missing from the cache are sent upstream in a single
+    request. Entries past the cache TTL are served immediately, marked stale,
+    while they are refreshed in the background, so an upstream outage only
+    affects CURIEs that were never cached: if fetching those fails, the cached
+    entries are still returned (marked stale, with the error) and the
+    uncached CURIEs map to None.
+
+    Args:
+        curies: List of CURIEs to normalize
+        cache: A cache with get_entries/is_fresh/set_many (e.g. cache.SQLiteCache)
+        conflate: Enable gene/protein conflation (default: True)
+        drug_chemical_conflate: Enable drug/chemical conflation (default: True)
+        fetch: Function with the signature of normalize_curies used for cache
+            misses (default: normalize_curies)
+        namespace: Cache key prefix; use a different one for each distinct fetch source
+
+    Returns:
+        NormalizationResult mapping input CURIEs to their normalized results
+
+    Raises:
+        requests.RequestException, CircuitOpenError: If none of the CURIEs
+            were cached and they could not be fetched
+    """
+    fetch = fetch or normalize_curies
+    prefix = f"{namespace}:{int(conflate)}{int(drug_chemical_conflate)}:"
+    entries = cache.get_entries([prefix + curie for curie in curies])
+
+    result = {}
+    stale = []
+    missing = []
+    for curie in curies:
+        entry = entries.get(prefix + curie)
+        if entry is None:
+            missing.append(curie)
+            continue
+        result[curie] = entry[0]
+        if not cache.is_fresh(entry[1]):
+            stale.append(curie)
+
+    if missing:
+        # Refresh stale entries in the same upstream request
+        to_fetch = missing + stale
+        try:
+            fetched = fetch(to_fetch, conflate=conflate, drug_chemical_conflate=drug_chemical_conflate)
+        except (requests.RequestException, CircuitOpenError) as e:
+            if not result:
+                raise
+            logger.warning("Fetching %d uncached CURIEs failed: %s", len(missing), e)
+            result.update({curie: None for curie in missing})
+            fetched_at = min(entries[prefix + curie][1] for curie in curies if curie not in missing)
+            return NormalizationResult(result, stale=True, fetched_at=fetched_at, error=str(e))
+        cache.set_many({prefix + curie: fetched.get(curie) for curie in to_fetch})
+        result.update({curie: fetched.get(curie) for curie in to_fetch})
+        return NormalizationResult(result)
+
+    if stale:
+        _start_refresh(stale, cache, conflate, drug_chemical_conflate, fetch, prefix)
+        fetched_at = min(entries[prefix + curie][1] for curie in stale)
+        return NormalizationResult(result, stale=True, fetched_at=fetched_at)
+
+    return NormalizationResult(result)
+
+
+_refreshing: set[str] = set()
+_refreshing_lock = threading.Lock()
+
+
+def _start_refresh(
+    curies: list[str],
+    cache,
+    conflate: bool,
+    drug_chemical_conflate: bool,
+    fetch: Callable[..., dict],
+    prefix: str
+) -> None:
+    """Refetch stale cache entries on a background thread, skipping ones already being refreshed."""
+    with _refreshing_lock:
+        curies = [curie for curie in curies if prefix + curie not in _refreshing]
+        _refreshing.update(prefix + curie for curie in curies)
+
+    if not curies:
+        return
+
+    def refresh():
+        try:
+            fetched = fetch(curies, conflate=conflate, drug_chemical_conflate=drug_chemical_conflate)
+            cache.set_many({prefix + curie: fetched.get(curie) for curie in curies})
+        except (requests.RequestException, CircuitOpenError) as e:
+            logger.warning("Background refresh of %d CURIEs failed: %s", len(curies), e)
+        finally:
+            with _refreshing_lock:
+                _refreshing.difference_update(prefix + curie for curie in curies)
 
-    return response.json()
+    threading.Thread(target=refresh, daemon=True).start()
 
 
 def get_preferred_id(curie: str, conflate: bool = True, drug_chemical_conflate: bool = True) -> Optional[str]:
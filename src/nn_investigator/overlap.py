@@ -0,0 +1,179 @@
+"""Compare the membership and labels of two normalization cliques."""
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from .identifiers import get_prefix
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class Interner:
+    """Map strings to small integers so cliques can be compared as sets of ints."""
+
+    def __init__(self):
+        self._ids: dict[str, int] = {}
+        self._strings: list[str] = []
+
+    def intern(self, value: str) -> int:
+        """Get the integer ID for a string, assigning a new one if needed."""
+        interned = self._ids.get(value)
+        if interned is None:
+            interned = self._ids[value] = len(self._strings)
+            self._strings.append(value)
+        return interned
+
+    def intern_all(self, values: Iterable[str]) -> frozenset[int]:
+        """Intern several strings and return their IDs as a set."""
+        return frozenset(self.intern(value) for value in values)
+
+    def lookup(self, interned: int) -> str:
+        """Get the string for an integer ID."""
+        return self._strings[interned]
+
+
+@dataclass(frozen=True)
+class CliqueProfile:
+    """Interned sets describing one clique."""
+
+    preferred_id: Optional[str]
+    identifiers: frozenset[int]
+    prefixes: frozenset[int]
+    label_tokens: frozenset[int]
+    label_keys: frozenset[int]
+
+
+def _label_key(label: str) -> str:
+    """Order- and punctuation-insensitive form of a label, for near-duplicate matching."""
+    return " ".join(sorted(TOKEN_PATTERN.findall(label.lower())))
+
+
+def _labels(clique: dict) -> list[str]:
+    labels = [equiv.get("label") for equiv in clique.get("equivalent_identifiers") or []]
+    labels.append((clique.get("id") or {}).get("label"))
+    return [label for label in labels if label]
+
+
+def build_profile(clique: Optional[dict], interner: Interner) -> CliqueProfile:
+    """Build the interned profile of a normalization result (None gives an empty profile)."""
+    if not clique:
+        return CliqueProfile(None, frozenset(), frozenset(), frozenset(), frozenset())
+
+    identifiers = [equiv["identifier"] for equiv in clique.get("equivalent_identifiers") or []]
+    labels = _labels(clique)
+
+    return CliqueProfile(
+        preferred_id=(clique.get("id") or {}).get("identifier"),
+        identifiers=interner.intern_all(identifiers),
+        prefixes=interner.intern_all(get_prefix(identifier) for identifier in identifiers),
+        label_tokens=interner.intern_all(
+            token for label in labels for token in TOKEN_PATTERN.findall(label.lower()) if len(token) > 1
+        ),
+        label_keys=interner.intern_all(key for key in map(_label_key, labels) if key),
+    )
+
+
+def _jaccard(a: frozenset, b: frozenset, intersection_size: int) -> float:
+    union_size = len(a) + len(b) - intersection_size
+    return intersection_size / union_size if union_size else 0.0
+
+
+def compare_profiles(profile_1: CliqueProfile, profile_2: CliqueProfile, interner: Interner, limit: int = 50) -> dict:
+    """
+    Compare two clique profiles.
+
+    Returns:
+        Dict with shared identifiers and prefixes, identifier/prefix/label-token
+        Jaccard similarities, near-duplicate labels and a split_score. The
+        split_score (0-1) is high when two different cliques look like the
+        same entity, and 0 when they are already the same clique or either
+        side did not normalize.
+    """
+    shared_ids = profile_1.identifiers & profile_2.identifiers
+    shared_prefixes = profile_1.prefixes & profile_2.prefixes
+    shared_tokens = profile_1.label_tokens & profile_2.label_tokens
+    shared_label_keys = profile_1.label_keys & profile_2.label_keys
+
+    identifier_jaccard = _jaccard(profile_1.identifiers, profile_2.identifiers, len(shared_ids))
+    label_token_jaccard = _jaccard(profile_1.label_tokens, profile_2.label_tokens, len(shared_tokens))
+
+    same_clique = profile_1.preferred_id is not None and profile_1.preferred_id == profile_2.preferred_id
+    both_normalized = profile_1.preferred_id is not None and profile_2.preferred_id is not None
+
+    split_score = 0.0
+    if both_normalized and not same_clique:
+        split_score = (
+            0.5 * label_token_jaccard
+            + 0.3 * (1.0 if shared_label_keys else 0.0)
+            + 0.2 * identifier_jaccard
+        )
+
+    return {
+        "same_clique": same_clique,
+        "shared": sorted(interner.lookup(i) for i in shared_ids)[:limit],
+        "shared_count": len(shared_ids),
+        "only_1_count": len(profile_1.identifiers) - len(shared_ids),
+        "only_2_count": len(profile_2.identifiers) - len(shared_ids),
+        "identifier_jaccard": identifier_jaccard,
+        "shared_prefixes": sorted(interner.lookup(i) for i in shared_prefixes),
+        "prefix_jaccard": _jaccard(profile_1.prefixes, profile_2.prefixes, len(shared_prefixes)),
+        "label_token_jaccard": label_token_jaccard,
+        "near_duplicate_labels": sorted(interner.lookup(i) for i in shared_label_keys)[:limit],
+        "near_duplicate_count": len(shared_label_keys),
+        "split_score": split_score,
+    }
+
+
+def analyze_overlap(clique_1: Optional[dict], clique_2: Optional[dict]) -> dict:
+    """
+    Compare two normalization results (as returned by nodenorm.normalize_curies).
+
+    See compare_profiles for the returned keys.
+    """
+    interner = Interner()
+    return compare_profiles(build_profile(clique_1, interner), build_profile(clique_2, interner), interner)
+
+
+def analyze_pairs(pairs: list[dict], norm_results: dict) -> list[dict]:
+    """
+    Compare the cliques of many pairs at once.
+
+    All identifiers, prefixes and label tokens are interned once across the
+    whole batch, and each distinct clique is profiled only once however many
+    pairs it appears in, so each comparison is a handful of set operations
+    over integers.
+
+    Args:
+        pairs: Entity pairs (with 'curie_1' and 'curie_2')
+        norm_results: Normalization results for all CURIEs in the pairs
+
+    Returns:
+        One dict per pair: the pair's fields plus 'preferred_1', 'preferred_2'
+        and the compare_profiles results
+    """
+    interner = Interner()
+    profiles: dict[str, CliqueProfile] = {}
+
+    def profile_for(curie: str) -> CliqueProfile:
+        clique = norm_results.get(curie)
+        key = (clique.get("id") or {}).get("identifier") if clique else None
+        if key is None:
+            return build_profile(None, interner)
+        if key not in profiles:
+            profiles[key] = build_profile(clique, interner)
+        return profiles[key]
+
+    rows = []
+    for pair in pairs:
+        profile_1 = profile_for(pair["curie_1"])
+        profile_2 = profile_for(pair["curie_2"])
+        rows.append({
+            **pair,
+            "preferred_1": profile_1.preferred_id,
+            "preferred_2": profile_2.preferred_id,
+            **compare_profiles(profile_1, profile_2, interner, limit=5),
+        })
+
+    return rows
@@ -0,0 +1,310 @@
+"""Opt-in request profiling for finding hot paths in real traffic.
+
+Two kinds of capture are available:
+
+- "cprofile" runs cProfile on the request thread. It counts every call, so
+  it is exact but slows the request down noticeably. From Python 3.12
+  cProfile is built on sys.monitoring, which sees every thread of the
+  process, so the profile would include other requests' work; there
+  "cprofile" falls back to "sample".
+- "sample" registers the request thread with a stack sampler: one
+  background thread per process that looks at the stacks of all watched
+  threads every few milliseconds. Its results are statistical but cheap
+  enough to leave on for every request.
+
+The app (see app.py) profiles a configured fraction of requests in full and,
+when a slow threshold is set, watches every other request with the sampler
+and keeps its profile only if it was slow. Either way a profile records the
+route, the pair ID and the top functions by time spent in them, as rows of
+the request_profiles table in the app database.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Optional
+
+from . import database
+
+
+PROFILE_MODES = ("cprofile", "sample")
+
+# Whether cProfile sees only the threads it is enabled on (not so from 3.12)
+CPROFILE_PER_THREAD = sys.version_info < (3, 12)
+
+
+def _function_name(filename: str, line: int, name: str) -> str:
+    """Name a function the way pstats prints it."""
+    if filename == "~":
+        return name
+    return f"{filename}:{line}({name})"
+
+
+class CProfileCapture:
+    """Deterministic profile of one request."""
+
+    mode = "cprofile"
+
+    def __init__(self):
+        self._profiles = [cProfile.Profile()]
+        self._profiles[0].enable()
+
+    def follow(self, fn: Callable) -> Callable:
+        """Wrap fn so that its run on another thread is included in the profile."""
+        def run(*args, **kwargs):
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profile.disable()
+                self._profiles.append(profile)
+        return run
+
+    def stop(self) -> None:
+        self._profiles[0].disable()
+
+    def top_functions(self, limit: int) -> list[dict]:
+        """The functions with the most time spent in them (excluding callees)."""
+        stats = pstats.Stats(self._profiles[0])
+        for profile in self._profiles[1:]:
+            stats.add(profile)
+
+        rows = [
+            {
+                "function": _function_name(*key),
+                "calls": calls,
+                "self_seconds": self_time,
+                "total_seconds": total_time,
+            }
+            for key, (_, calls, self_time, total_time, _) in stats.stats.items()
+        ]
+        rows.sort(key=lambda row: row["self_seconds"], reverse=True)
+        return rows[:limit]
+
+
+class SampleCapture:
+    """Statistical profile of one request, filled in by the process's StackSampler."""
+
+    mode = "sample"
+
+    def __init__(self, sampler: "StackSampler"):
+        self.sampler = sampler
+        self.samples = 0
+        self.self_counts: Counter = Counter()
+        self.total_counts: Counter = Counter()
+        self._lock = threading.Lock()
+        sampler.watch(threading.get_ident(), self)
+
+    def add(self, stack: list[str]) -> None:
+        """Record one sampled stack, innermost function first."""
+        with self._lock:
+            self.samples += 1
+            self.self_counts[stack[0]] += 1
+            # Count recursive functions once per sample
+            self.total_counts.update(set(stack))
+
+    def follow(self, fn: Callable) -> Callable:
+        """Wrap fn so that its run on another thread is included in the profile."""
+        def run(*args, **kwargs):
+            thread_id = threading.get_ident()
+            self.sampler.watch(thread_id, self)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.sampler.unwatch(thread_id, self)
+        return run
+
+    def stop(self) -> None:
+        self.sampler.unwatch(threading.get_ident(), self)
+
+    def top_functions(self, limit: int) -> list[dict]:
+        """The functions seen most often at the top of the stack, with estimated times."""
+        with self._lock:
+            return [
+                {
+                    "function": function,
+                    "calls": None,
+                    "self_seconds": count * self.sampler.interval,
+                    "total_seconds": self.total_counts[function] * self.sampler.interval,
+                }
+                for function, count in self.self_counts.most_common(limit)
+            ]
+
+
+class StackSampler:
+    """Samples the stacks of watched threads from a single background thread."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._watches: dict[int, list[SampleCapture]] = {}
+        self._lock = threading.Lock()
+        self._active = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, thread_id: int, capture: SampleCapture) -> None:
+        """Start adding the stacks of a thread to capture."""
+        with self._lock:
+            self._watches.setdefault(thread_id, []).append(capture)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="nn-investigator-sampler", daemon=True)
+                self._thread.start()
+            self._active.set()
+
+    def unwatch(self, thread_id: int, capture: SampleCapture) -> None:
+        """Stop adding the stacks of a thread to capture."""
+        with self._lock:
+            captures = self._watches.get(thread_id, [])
+            if capture in captures:
+                captures.remove(capture)
+            if not captures:
+                self._watches.pop(thread_id, None)
+            if not self._watches:
+                self._active.clear()
+
+    def _run(self) -> None:
+        while True:
+            self._active.wait()
+            time.sleep(self.interval)
+
+            with self._lock:
+                watches = [(thread_id, list(captures)) for thread_id, captures in self._watches.items()]
+            if not watches:
+                continue
+
+            frames = sys._current_frames()
+            for thread_id, captures in watches:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(_function_name(code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                for capture in captures:
+                    capture.add(stack)
+
+
+_samplers: dict[tuple[int, float], StackSampler] = {}
+_samplers_lock = threading.Lock()
+
+
+def get_sampler(interval: float) -> StackSampler:
+    """The stack sampler of this process for an interval."""
+    # Per process, since threads do not survive gunicorn forking workers
+    key = (os.getpid(), interval)
+    with _samplers_lock:
+        if key not in _samplers:
+            _samplers[key] = StackSampler(interval)
+        return _samplers[key]
+
+
+def start(mode: str, interval: float = 0.005):
+    """
+    Start profiling the current thread.
+
+    Args:
+        mode: "cprofile" or "sample"
+        interval: Seconds between stack samples in "sample" mode
+
+    Returns:
+        A capture with follow(fn), stop() and top_functions(limit); its mode
+        is "sample" when "cprofile" is not available per thread (Python 3.12+)
+
+    Raises:
+        ValueError: If mode is unknown
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode: {mode}")
+
+    if mode == "cprofile" and CPROFILE_PER_THREAD:
+        return CProfileCapture()
+    return SampleCapture(get_sampler(interval))
+
+
+def save_profile(profile: dict, keep: int = 500, db_path: str = "nn_investigator.db") -> int:
+    """
+    Store a request profile, dropping the oldest ones beyond keep.
+
+    Args:
+        profile: Dictionary with method, path, endpoint, pair_id, status,
+            duration_ms, mode, reason and functions (from top_functions)
+
+    Returns:
+        The ID of the stored profile
+    """
+    conn = database.get_connection(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        INSERT INTO request_profiles
+            (method, path, endpoint, pair_id, status, duration_ms, mode, reason, functions)
+        VALUES (:method, :path, :endpoint, :pair_id, :status, :duration_ms, :mode, :reason, :functions)
+    """, {**profile, "functions": json.dumps(profile["functions"])})
+    profile_id = cursor.lastrowid
+    cursor.execute("DELETE FROM request_profiles WHERE id <= ?", (profile_id - keep,))
+
+    conn.commit()
+    conn.close()
+
+    return profile_id
+
+
+def _profile_from_row(row) -> dict:
+    profile = dict(row)
+    profile["functions"] = json.loads(profile["functions"])
+    return profile
+
+
+def list_profiles(
+    endpoint: Optional[str] = None,
+    limit: int = 100,
+    db_path: str = "nn_investigator.db"
+) -> list[dict]:
+    """Get the most recent profiles, newest first, optionally only for one endpoint."""
+    conn = database.get_connection(db_path)
+    if endpoint:
+        rows = conn.execute(
+            "SELECT * FROM request_profiles WHERE endpoint = ? ORDER BY id DESC LIMIT ?", (endpoint, limit)
+        ).fetchall()
+    else:
+        rows = conn.execute("SELECT * FROM request_profiles ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+    conn.close()
+
+    return [_profile_from_row(row) for row in rows]
+
+
+def get_profile(profile_id: int, db_path: str = "nn_investigator.db") -> Optional[dict]:
+    """Get a profile by ID, with its functions decoded."""
+    conn = database.get_connection(db_path)
+    row = conn.execute("SELECT * FROM request_profiles WHERE id = ?", (profile_id,)).fetchone()
+    conn.close()
+
+    return _profile_from_row(row) if row else None
+
+
+def hot_functions(profiles: list[dict], limit: int = 25) -> list[dict]:
+    """
+    Add up the functions of several profiles to find the overall hot paths.
+
+    Returns:
+        One row per function with self_seconds, total_seconds and the number
+        of profiles it appears in, sorted by self_seconds
+    """
+    totals: dict[str, dict] = {}
+    for profile in profiles:
+        for row in profile["functions"]:
+            total = totals.setdefault(
+                row["function"], {"function": row["function"], "self_seconds": 0.0, "total_seconds": 0.0, "profiles": 0}
+            )
+            total["self_seconds"] += row["self_seconds"]
+            total["total_seconds"] += row["total_seconds"]
+            total["profiles"] += 1
+
+    return sorted(totals.values(), key=lambda row: row["self_seconds"], reverse=True)[:limit]
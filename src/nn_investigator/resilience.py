@@ -0,0 +1,138 @@
+"""Circuit breaker and deadlines for calls to upstream services."""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable
+
+import requests
+
+
+# Threads per process that upstream calls run on while the caller waits with a deadline
+UPSTREAM_THREADS = 32
+
+_executors: dict[int, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the circuit is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        self.name = name
+        self.retry_in = retry_in
+        super().__init__(f"{name} is unavailable; retrying in {retry_in:.0f}s")
+
+
+def _upstream_executor() -> ThreadPoolExecutor:
+    # Per process, since threads do not survive gunicorn forking workers
+    with _executors_lock:
+        if os.getpid() not in _executors:
+            _executors[os.getpid()] = ThreadPoolExecutor(
+                max_workers=UPSTREAM_THREADS, thread_name_prefix="nn-investigator-upstream"
+            )
+        return _executors[os.getpid()]
+
+
+def call_with_deadline(func: Callable[..., Any], deadline: float, *args, **kwargs) -> Any:
+    """
+    Call func, giving up after deadline seconds in total.
+
+    Socket timeouts only bound the wait for each read, so an upstream that
+    trickles its response can take far longer. func runs on a bounded thread
+    pool instead, and the caller stops waiting at the deadline (including any
+    time spent queued behind other calls); an abandoned call finishes on its
+    pool thread when its own socket timeout fires.
+
+    Raises:
+        requests.Timeout: If func has not returned within deadline seconds
+    """
+    future = _upstream_executor().submit(func, *args, **kwargs)
+    try:
+        return future.result(timeout=deadline)
+    except FutureTimeoutError:
+        future.cancel()
+        raise requests.Timeout(f"No complete response within {deadline:g}s") from None
+
+
+def is_upstream_failure(error: Exception) -> bool:
+    """Whether an exception means the upstream service is unhealthy (not that our request was bad)."""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code >= 500
+    return isinstance(error, requests.RequestException)
+
+
+class CircuitBreaker:
+    """
+    Stop calling an upstream service after repeated failures.
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail immediately with CircuitOpenError instead of tying up a worker
+    thread. Once reset_timeout seconds have passed, a single trial call is let
+    through: success closes the circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state: closed, open or half_open."""
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._failures < self.failure_threshold:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call func through the breaker.
+
+        Raises:
+            CircuitOpenError: If the circuit is open (or a trial call is already running)
+        """
+        with self._lock:
+            state = self._state()
+            if state == self.OPEN or (state == self.HALF_OPEN and self._trial_in_progress):
+                retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+                raise CircuitOpenError(self.name, retry_in)
+            if state == self.HALF_OPEN:
+                self._trial_in_progress = True
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            with self._lock:
+                self._trial_in_progress = False
+                if is_upstream_failure(e):
+                    self._failures += 1
+                    if self._failures >= self.failure_threshold:
+                        self._opened_at = time.monotonic()
+            raise
+
+        with self._lock:
+            self._trial_in_progress = False
+            self._failures = 0
+
+        return result
+
+    def reset(self) -> None:
+        """Close the circuit and forget past failures."""
+        with self._lock:
+            self._failures = 0
+            self._trial_in_progress = False
@@ -0,0 +1,229 @@
+"""HTTP transport for the NodeNorm and NameRes clients, with record/replay.
+
+By default requests go straight to the services. A RecordingTransport also
+saves every response to a cassette (a JSON file), and a ReplayTransport
+answers from a cassette without touching the network, at the recorded
+latency or any multiple of it (0 for instant replies). Tests and benchmarks
+can then run offline against fixed data.
+
+A cassette looks like:
+
+    {"version": 1, "interactions": [
+        {"request": {"method": "POST", "url": ..., "params": {...}, "json": {...}},
+         "response": {"status": 200, "body": {...}, "elapsed": 0.42}}
+    ]}
+
+Requests are matched on method, URL, query parameters and JSON body. When
+the same request was recorded several times, replays return the recordings
+in order and then keep repeating the last one.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Optional
+
+import requests
+
+
+CASSETTE_FORMAT = 1
+
+
+class CassetteMissError(Exception):
+    """Raised when replaying a request that is not in the cassette."""
+
+
+def _request_key(request: dict) -> str:
+    return json.dumps(
+        [request["method"], request["url"], request.get("params") or {}, request.get("json")],
+        sort_keys=True
+    )
+
+
+class Cassette:
+    """A set of recorded HTTP interactions, stored as a JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.interactions: list[dict] = []
+        self._by_key: dict[str, list[dict]] = {}
+        self._replayed: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != CASSETTE_FORMAT:
+                raise ValueError(f"Unsupported cassette format in {path}")
+            for interaction in data["interactions"]:
+                self._index(interaction)
+
+    def _index(self, interaction: dict) -> None:
+        self.interactions.append(interaction)
+        self._by_key.setdefault(_request_key(interaction["request"]), []).append(interaction)
+
+    def add(self, request: dict, response: dict) -> None:
+        """Record an interaction."""
+        with self._lock:
+            self._index({"request": request, "response": response})
+
+    def find(self, request: dict) -> Optional[dict]:
+        """The next recorded response to a request, or None if it was never recorded."""
+        key = _request_key(request)
+        with self._lock:
+            recorded = self._by_key.get(key)
+            if not recorded:
+                return None
+            count = self._replayed.get(key, 0)
+            self._replayed[key] = count + 1
+            return recorded[min(count, len(recorded) - 1)]["response"]
+
+    def save(self) -> None:
+        """Write the cassette, replacing the file atomically."""
+        with self._lock:
+            data = {"version": CASSETTE_FORMAT, "interactions": list(self.interactions)}
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def __len__(self) -> int:
+        return len(self.interactions)
+
+
+class RecordedResponse:
+    """The parts of requests.Response that the clients use, for a replayed interaction."""
+
+    def __init__(self, url: str, status_code: int, body: Any):
+        self.url = url
+        self.status_code = status_code
+        # Kept serialized so that json() costs what parsing a real response does
+        self.text = json.dumps(body)
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+def _describe(method: str, url: str, kwargs: dict) -> dict:
+    return {"method": method, "url": url, "params": kwargs.get("params") or {}, "json": kwargs.get("json")}
+
+
+class HttpTransport:
+    """Send requests to the live services."""
+
+    def post(self, url: str, **kwargs):
+        return requests.post(url, **kwargs)
+
+
+class RecordingTransport:
+    """Send requests through another transport and record the responses in a cassette."""
+
+    def __init__(self, cassette: Cassette, inner=None, autosave: bool = False):
+        self.cassette = cassette
+        self.inner = inner or HttpTransport()
+        self.autosave = autosave
+
+    def post(self, url: str, **kwargs):
+        start = time.perf_counter()
+        response = self.inner.post(url, **kwargs)
+        elapsed = time.perf_counter() - start
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = response.text
+
+        self.cassette.add(
+            _describe("POST", url, kwargs),
+            {"status": response.status_code, "body": body, "elapsed": round(elapsed, 4)}
+        )
+        if self.autosave:
+            self.cassette.save()
+
+        return response
+
+
+class ReplayTransport:
+    """Answer requests from a cassette, never touching the network."""
+
+    def __init__(self, cassette: Cassette, latency: float = 1.0):
+        """
+        Args:
+            cassette: Recorded interactions
+            latency: Multiple of the recorded response time to wait before answering (0 for instant)
+        """
+        self.cassette = cassette
+        self.latency = latency
+
+    def post(self, url: str, **kwargs):
+        recorded = self.cassette.find(_describe("POST", url, kwargs))
+        if recorded is None:
+            raise CassetteMissError(f"No recorded response for POST {url} in {self.cassette.path}")
+
+        if self.latency:
+            time.sleep(recorded.get("elapsed", 0) * self.latency)
+        return RecordedResponse(url, recorded["status"], recorded["body"])
+
+
+_transport = HttpTransport()
+
+
+def get_transport():
+    """The transport the clients currently send requests through."""
+    return _transport
+
+
+def set_transport(transport) -> Any:
+    """Send client requests through transport (None for the live services); returns the previous one."""
+    global _transport
+    previous = _transport
+    _transport = transport or HttpTransport()
+    return previous
+
+
+@contextmanager
+def use_transport(transport):
+    """Send client requests through transport inside a with block."""
+    previous = set_transport(transport)
+    try:
+        yield transport
+    finally:
+        set_transport(previous)
+
+
+HTTP_MODES = ("", "live", "record", "replay")
+
+
+def from_config(config: dict):
+    """
+    Build the transport described by HTTP_MODE, HTTP_CASSETTE and HTTP_REPLAY_LATENCY.
+
+    Returns:
+        The transport, or None for the live services
+
+    Raises:
+        ValueError: If the mode is unknown or needs a cassette that is not set
+    """
+    mode = config.get("HTTP_MODE", "")
+    if mode not in HTTP_MODES:
+        raise ValueError(f"Unknown HTTP_MODE: {mode}")
+    if mode in ("", "live"):
+        return None
+
+    if not config.get("HTTP_CASSETTE"):
+        raise ValueError(f"HTTP_CASSETTE must be set to {mode} HTTP responses")
+
+    cassette = Cassette(config["HTTP_CASSETTE"])
+    if mode == "record":
+        return RecordingTransport(cassette, autosave=True)
+    return ReplayTransport(cassette, latency=config.get("HTTP_REPLAY_LATENCY", 1.0))
@@ -0,0 +1,124 @@
+"""Clique snapshots and evaluation suggestions for bulk triage.
+
+A snapshot records what the two CURIEs of a pair normalized to when the pair
+was last looked at, so the triage view can list many pairs at once without
+calling Node Normalization again. Saving a snapshot also updates the clique
+membership index (preferred ID -> pairs), which groups pairs that involve
+the same clique so one investigation can settle all of them.
+"""
+
+from typing import Optional
+
+
+# Assessments a pair can be given, in the order they are offered
+EVALUATIONS = [
+    "Should merge",
+    "Should not merge",
+    "Should not merge, different salt",
+    "Different types (cell/chemical)",
+    "Different types (chemical/protein)",
+    "Different species",
+    "Dangling CHEMBL",
+    "Requires further investigation",
+]
+
+
+def is_cell_chemical_mismatch(curie_1_data: Optional[dict], curie_2_data: Optional[dict]) -> bool:
+    """Whether one CURIE normalized to a cell and the other to a chemical."""
+    if not curie_1_data or not curie_2_data:
+        return False
+
+    types_1 = set(curie_1_data.get("type", []))
+    types_2 = set(curie_2_data.get("type", []))
+
+    has_cell_1 = any("Cell" in t for t in types_1)
+    has_cell_2 = any("Cell" in t for t in types_2)
+    has_chemical_1 = any("Chemical" in t for t in types_1)
+    has_chemical_2 = any("Chemical" in t for t in types_2)
+
+    return (has_cell_1 and has_chemical_2) or (has_chemical_1 and has_cell_2)
+
+
+def suggest_evaluation(curie_1_data: Optional[dict], curie_2_data: Optional[dict]) -> Optional[str]:
+    """An evaluation that the normalization results alone point to, if any."""
+    if is_cell_chemical_mismatch(curie_1_data, curie_2_data):
+        return "Different types (cell/chemical)"
+    return None
+
+
+def build_snapshot(pair: dict, norm_results: dict) -> dict:
+    """
+    Summarize the normalization of a pair for database.save_snapshots.
+
+    Args:
+        pair: Entity pair with id, curie_1 and curie_2
+        norm_results: Normalization results containing both CURIEs
+
+    Returns:
+        Dictionary with pair_id, the preferred ID, label and most specific type
+        of each side, same_clique and suggestion
+    """
+    snapshot = {"pair_id": pair["id"]}
+    data = []
+    for side in (1, 2):
+        result = norm_results.get(pair[f"curie_{side}"])
+        data.append(result)
+        preferred = (result or {}).get("id", {})
+        types = (result or {}).get("type") or [None]
+        snapshot[f"preferred_{side}"] = preferred.get("identifier")
+        snapshot[f"label_{side}"] = preferred.get("label")
+        snapshot[f"type_{side}"] = types[0]
+
+    snapshot["same_clique"] = bool(data[0] and data[1]) and snapshot["preferred_1"] == snapshot["preferred_2"]
+    snapshot["suggestion"] = suggest_evaluation(*data)
+    return snapshot
+
+
+def group_pairs(members: list[tuple[str, int]]) -> list[dict]:
+    """
+    Group pairs that are linked through shared cliques.
+
+    Two pairs are in the same group when a CURIE of each normalizes to the
+    same preferred ID, directly or through other pairs in the group.
+
+    Args:
+        members: (preferred_id, pair_id) entries of the clique membership index
+
+    Returns:
+        Groups of two or more pairs, largest first, each with "pair_ids" and
+        "preferred_ids" (those shared by more than one pair of the group)
+    """
+    parent: dict[int, int] = {}
+
+    def find(pair_id: int) -> int:
+        root = parent.setdefault(pair_id, pair_id)
+        while parent[root] != root:
+            root = parent[root]
+        # Point everything on the path straight at the root
+        while parent[pair_id] != root:
+            parent[pair_id], pair_id = root, parent[pair_id]
+        return root
+
+    pairs_by_id: dict[str, set[int]] = {}
+    for preferred_id, pair_id in members:
+        pairs_by_id.setdefault(preferred_id, set()).add(pair_id)
+
+    for pair_ids in pairs_by_id.values():
+        first, *rest = sorted(pair_ids)
+        for pair_id in rest:
+            parent[find(pair_id)] = find(first)
+
+    groups: dict[int, dict] = {}
+    for preferred_id, pair_ids in sorted(pairs_by_id.items()):
+        group = groups.setdefault(find(min(pair_ids)), {"pair_ids": set(), "preferred_ids": []})
+        group["pair_ids"].update(pair_ids)
+        if len(pair_ids) > 1:
+            group["preferred_ids"].append(preferred_id)
+
+    result = [
+        {"pair_ids": sorted(group["pair_ids"]), "preferred_ids": group["preferred_ids"]}
+        for group in groups.values()
+        if len(group["pair_ids"]) > 1
+    ]
+    result.sort(key=lambda group: (-len(group["pair_ids"]), group["pair_ids"][0]))
+    return result
@@ -0,0 +1,14 @@
+"""WSGI entry point for running NN Investigator under a production server.
+
+Example:
+    gunicorn -c gunicorn.conf.py src.nn_investigator.wsgi:app
+"""
+
+from .app import create_app
+from .config import DEV_SECRET_KEY
+
+
+app = create_app()
+
+if app.config["SECRET_KEY"] == DEV_SECRET_KEY:
+    raise RuntimeError("Set NN_INVESTIGATOR_SECRET_KEY before serving the app in production")
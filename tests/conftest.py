@@ -0,0 +1,56 @@
+"""Shared pytest options and fixtures."""
+
+import os
+import pytest
+from src.nn_investigator import transport
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("nn_investigator")
+    group.addoption(
+        "--http-mode",
+        choices=["auto", "live", "record", "replay"],
+        default="auto",
+        help="How http_cassette treats NodeNorm/NameRes requests: replay recorded responses "
+             "when a cassette exists (auto), always call the services (live), re-record "
+             "the cassettes (record) or fail on anything not recorded (replay)",
+    )
+    group.addoption(
+        "--http-latency",
+        type=float,
+        default=0.0,
+        help="Replay latency as a multiple of the recorded response time (default: 0, instant)",
+    )
+
+
+@pytest.fixture(scope="module")
+def http_cassette(request):
+    """
+    Send NodeNorm/NameRes requests made by the tests of a module through a cassette.
+
+    The cassette is cassettes/<module>.json next to the test module. Yields
+    the transport in use (None when calling the live services).
+    """
+    mode = request.config.getoption("--http-mode")
+    directory = os.path.join(os.path.dirname(request.module.__file__), "cassettes")
+    path = os.path.join(directory, request.module.__name__.rsplit(".", 1)[-1] + ".json")
+
+    if mode == "auto":
+        mode = "replay" if os.path.exists(path) else "live"
+
+    if mode == "live":
+        yield None
+        return
+
+    if mode == "record":
+        if os.path.exists(path):
+            os.unlink(path)
+        cassette = transport.Cassette(path)
+        with transport.use_transport(transport.RecordingTransport(cassette)) as recorder:
+            yield recorder
+        cassette.save()
+        return
+
+    cassette = transport.Cassette(path)
+    with transport.use_transport(transport.ReplayTransport(cassette, latency=request.config.getoption("--http-latency"))) as replayer:
+        yield replayer
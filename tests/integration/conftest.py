@@ -0,0 +1,8 @@
+"""Integration tests replay recorded responses when a cassette exists (see tests/conftest.py)."""
+
+import pytest
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _recorded_http(http_cassette):
+    yield http_cassette
@@ -3,8 +3,12 @@
 import pytest
 import tempfile
 import os
-from src.nn_investigator.app import app as flask_app
+import time
+import requests
+from src.nn_investigator.app import app as flask_app, create_app
 from src.nn_investigator import database
+from src.nn_investigator import jobs
+from src.nn_investigator import nodenorm
 
 
 @pytest.fixture
@@ -13,9 +17,14 @@ def app():
     # Use a temporary database
     fd, db_path = tempfile.mkstemp(suffix=".db")
     os.close(fd)
+    fd, cache_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
 
     flask_app.config["TESTING"] = True
     flask_app.config["DATABASE"] = db_path
+    flask_app.config["CACHE_DATABASE"] = cache_path
+    # Jobs are run explicitly with jobs.run_pending
+    flask_app.config["JOB_WORKERS"] = 0
 
     # Initialize the database
     database.init_db(db_path)
@@ -35,11 +44,15 @@ def app():
     original_get_pair = database.get_pair
     original_add_pair = database.add_pair
     original_delete_pair = database.delete_pair
+    original_update_evaluation = database.update_evaluation
+    original_get_history = database.get_evaluation_history
 
     database.get_all_pairs = lambda db_path="nn_investigator.db": original_get_all(flask_app.config["DATABASE"])
     database.get_pair = lambda pair_id, db_path="nn_investigator.db": original_get_pair(pair_id, flask_app.config["DATABASE"])
     database.add_pair = lambda *args, **kwargs: original_add_pair(*args, **{**kwargs, "db_path": flask_app.config["DATABASE"]})
     database.delete_pair = lambda pair_id, db_path="nn_investigator.db": original_delete_pair(pair_id, flask_app.config["DATABASE"])
+    database.update_evaluation = lambda *args, **kwargs: original_update_evaluation(*args, **{**kwargs, "db_path": flask_app.config["DATABASE"]})
+    database.get_evaluation_history = lambda pair_id, db_path="nn_investigator.db": original_get_history(pair_id, flask_app.config["DATABASE"])
 
     yield flask_app
 
@@ -48,9 +61,28 @@ def app():
     database.get_pair = original_get_pair
     database.add_pair = original_add_pair
     database.delete_pair = original_delete_pair
+    database.update_evaluation = original_update_evaluation
+    database.get_evaluation_history = original_get_history
 
     # Clean up
     os.unlink(db_path)
+    os.unlink(cache_path)
+
+
+@pytest.fixture
+def fake_nodenorm(monkeypatch):
+    """Replace the Node Normalization client with a canned response."""
+    def normalize_curies(curies, **kwargs):
+        return {
+            curie: {
+                "id": {"identifier": curie, "label": curie},
+                "equivalent_identifiers": [{"identifier": curie}],
+                "type": ["biolink:ChemicalEntity"]
+            }
+            for curie in curies
+        }
+
+    monkeypatch.setattr(nodenorm, "normalize_curies", normalize_curies)
 
 
 @pytest.fixture
@@ -105,6 +137,21 @@ def test_add_pair_missing_required_fields(client):
     assert b"are required" in response.data
 
 
+def test_add_pair_rejects_duplicate(client, app):
+    """Test that adding the same two CURIEs again leads to the existing pair."""
+    existing = database.get_all_pairs()[0]["id"]
+
+    response = client.post("/add", data={
+        "entity_name": "same thing, other name",
+        "curie_1": "TEST:002",
+        "curie_2": "TEST:001"
+    })
+
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith(f"/pair/{existing}")
+    assert len(database.get_all_pairs()) == 1
+
+
 def test_delete_pair(client, app):
     """Test deleting a pair."""
     # Add a pair to delete
@@ -128,3 +175,511 @@ def test_delete_nonexistent_pair(client):
     """Test deleting a non-existent pair."""
     response = client.post("/pair/999/delete", follow_redirects=True)
     assert b"not found" in response.data or response.status_code in [302, 200]
+
+
+def test_save_evaluation(client, app, fake_nodenorm):
+    """Test saving an evaluation records a new version."""
+    pair_id = database.get_all_pairs()[0]["id"]
+
+    response = client.post(f"/pair/{pair_id}", data={
+        "evaluation": "Should merge",
+        "evaluation_notes": "Same product",
+        "evaluation_version": "0"
+    }, follow_redirects=False)
+    assert response.status_code == 302
+
+    pair = database.get_pair(pair_id)
+    assert pair["evaluation"] == "Should merge"
+    assert pair["evaluation_version"] == 1
+
+
+def test_save_evaluation_conflict(client, app, fake_nodenorm):
+    """Test that saving against a stale version returns a conflict."""
+    pair_id = database.get_all_pairs()[0]["id"]
+    database.update_evaluation(pair_id, "Should not merge", "First reviewer")
+
+    response = client.post(f"/pair/{pair_id}", data={
+        "evaluation": "Should merge",
+        "evaluation_notes": "Second reviewer",
+        "evaluation_version": "0"
+    })
+
+    assert response.status_code == 409
+    assert b"re-evaluated" in response.data
+    assert b"Second reviewer" in response.data
+
+    # The first reviewer's evaluation is kept
+    pair = database.get_pair(pair_id)
+    assert pair["evaluation"] == "Should not merge"
+    assert pair["evaluation_version"] == 1
+
+
+def test_investigate_uses_shared_cache(client, app, monkeypatch):
+    """Test that normalization results are reused from the shared cache."""
+    calls = []
+
+    def normalize_curies(curies, **kwargs):
+        calls.append(list(curies))
+        return {curie: None for curie in curies}
+
+    monkeypatch.setattr(nodenorm, "normalize_curies", normalize_curies)
+    pair_id = database.get_all_pairs()[0]["id"]
+
+    for _ in range(2):
+        response = client.get(f"/pair/{pair_id}")
+        assert response.status_code == 200
+        assert b"Save Evaluation" in response.data
+
+    assert calls == [["TEST:001", "TEST:002"]]
+
+
+def test_create_app_reads_config(app):
+    """Test that create_app applies config and initializes the database."""
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    original = dict(app.config)
+
+    try:
+        created = create_app({"DATABASE": db_path, "SECRET_KEY": "from-test"})
+        assert created.config["SECRET_KEY"] == "from-test"
+        assert database.get_all_pairs(db_path) == []
+    finally:
+        app.config.update(original)
+        os.unlink(db_path)
+
+
+def test_index_etag_not_modified(client):
+    """Test that an unchanged index page is answered with 304."""
+    response = client.get("/")
+    etag = response.headers["ETag"]
+
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_index_etag_changes_on_write(client, app):
+    """Test that adding a pair invalidates the cached index page."""
+    etag = client.get("/").headers["ETag"]
+
+    database.add_pair("late entity", "LATE:001", "LATE:002", db_path=app.config["DATABASE"])
+
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert b"late entity" in response.data
+
+
+def test_export_cached_between_writes(client, app, monkeypatch):
+    """Test that the export is rendered once per data version."""
+    first = client.get("/export")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("export should be served from the page cache")
+
+    monkeypatch.setattr(database, "get_all_pairs", fail)
+    second = client.get("/export")
+
+    assert second.status_code == 200
+    assert second.data == first.data
+    assert second.headers["Content-Disposition"] == first.headers["Content-Disposition"]
+
+
+def test_investigate_upstream_outage(client, app, monkeypatch):
+    """Test that the page still renders when Node Normalization is down."""
+    def normalize_curies(curies, **kwargs):
+        raise requests.ConnectionError("connection refused")
+
+    monkeypatch.setattr(nodenorm, "normalize_curies", normalize_curies)
+    pair_id = database.get_all_pairs()[0]["id"]
+
+    # The streamed page has already been sent with a 200 when the outage shows up
+    response = client.get(f"/pair/{pair_id}")
+    assert response.status_code == 200
+    assert b"Node Normalization Unavailable" in response.data
+    assert b"Save Evaluation" in response.data
+
+    response = client.get(f"/pair/{pair_id}?stream=0")
+    assert response.status_code == 503
+    assert b"Node Normalization Unavailable" in response.data
+    assert b"Save Evaluation" in response.data
+
+
+def test_investigate_survives_analysis_errors(client, app, monkeypatch, fake_nodenorm):
+    """Test that errors other than outages show in the banner instead of cutting the streamed page off."""
+    import sqlite3
+
+    pair_id = database.get_all_pairs()[0]["id"]
+
+    def save_snapshots(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(database, "save_snapshots", save_snapshots)
+    response = client.get(f"/pair/{pair_id}")
+    assert b"Normalization Results" in response.data
+    assert b"Unavailable" not in response.data
+
+    monkeypatch.setitem(app.config, "NORMALIZATION_BACKENDS", "nonexistent")
+    response = client.get(f"/pair/{pair_id}")
+    assert response.status_code == 200
+    assert b"Could not analyze this pair (ValueError" in response.data
+    assert b"Save Evaluation" in response.data
+
+
+def test_investigate_streams_pair_before_normalization(client, app, monkeypatch):
+    """Test that the database fields are sent before Node Normalization answers."""
+    import threading
+
+    answered = threading.Event()
+
+    def normalize_curies(curies, **kwargs):
+        assert answered.wait(5)
+        return {curie: None for curie in curies}
+
+    monkeypatch.setattr(nodenorm, "normalize_curies", normalize_curies)
+    pair_id = database.get_all_pairs()[0]["id"]
+
+    response = client.get(f"/pair/{pair_id}")
+    assert response.is_streamed
+    chunks = response.response
+    sent = b""
+    while b"Label 2" not in sent:
+        sent += next(chunks)
+    assert b"Normalization Results" not in sent
+
+    answered.set()
+    rest = b"".join(chunks)
+    assert b"Normalization Results" in rest
+    assert b"Save Evaluation" in rest
+    response.close()
+
+
+def test_investigate_renders_identifier_summary(client, app, fake_nodenorm):
+    """Test that the page shows prefix counts instead of full identifier tables."""
+    pair_id = database.get_all_pairs()[0]["id"]
+
+    response = client.get(f"/pair/{pair_id}")
+    assert response.status_code == 200
+    assert b"Identifier Overlap" in response.data
+    assert b"TEST (1)" in response.data
+
+
+def test_pair_identifiers_json(client, app, fake_nodenorm):
+    """Test the paged equivalent identifier endpoint."""
+    pair_id = database.get_all_pairs()[0]["id"]
+
+    response = client.get(f"/pair/{pair_id}/identifiers?side=2&prefix=TEST")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["curie"] == "TEST:002"
+    assert data["total"] == 1
+    assert data["identifiers"][0]["identifier"] == "TEST:002"
+    assert data["identifiers"][0]["url"]
+
+
+def test_pair_identifiers_leaves_backend_data_alone(client, app, monkeypatch):
+    """Test that adding linkout URLs does not modify the dicts the backend returned."""
+    shared = {
+        curie: {"id": {"identifier": curie}, "equivalent_identifiers": [{"identifier": curie}], "type": []}
+        for curie in ("TEST:001", "TEST:002")
+    }
+    monkeypatch.setattr(nodenorm, "normalize_curies", lambda curies, **kwargs: shared)
+    monkeypatch.setitem(app.config, "NORMALIZATION_BACKENDS", "remote")
+    pair_id = database.get_all_pairs()[0]["id"]
+
+    response = client.get(f"/pair/{pair_id}/identifiers?side=1")
+    assert response.get_json()["identifiers"][0]["url"]
+    assert shared["TEST:001"]["equivalent_identifiers"] == [{"identifier": "TEST:001"}]
+
+
+def test_pair_identifiers_bad_side(client, app, fake_nodenorm):
+    """Test that an invalid side is rejected."""
+    pair_id = database.get_all_pairs()[0]["id"]
+    assert client.get(f"/pair/{pair_id}/identifiers?side=3").status_code == 400
+    assert client.get("/pair/999/identifiers?side=1").status_code == 404
+
+
+def test_overlap_report(client, app, fake_nodenorm):
+    """Test building the overlap report in a job and sorting it."""
+    database.add_pair("another entity", "TEST:003", "TEST:004", db_path=app.config["DATABASE"])
+
+    response = client.get("/report/overlap")
+    assert response.status_code == 200
+    assert b"No report has been built yet" in response.data
+
+    assert client.post("/report/overlap").status_code == 302
+    assert b"is queued" in client.get("/report/overlap").data
+    client.post("/report/overlap")
+    assert jobs.run_pending(app.config) == 1
+
+    response = client.get("/report/overlap")
+    assert b"Clique Overlap Report" in response.data
+    assert response.data.index(b"another entity") < response.data.index(b"test entity 1")
+
+    response = client.get("/report/overlap?sort=entity_name&order=desc")
+    assert response.data.index(b"test entity 1") < response.data.index(b"another entity")
+
+
+def test_compare_report(client, app, monkeypatch):
+    """Test building the side-by-side endpoint comparison in a job."""
+    def normalize_curies(curies, url=None, **kwargs):
+        merged = "dev" in url
+        return {curie: {"id": {"identifier": "TEST:001" if merged else curie}} for curie in curies}
+
+    monkeypatch.setattr(nodenorm, "normalize_curies", normalize_curies)
+    monkeypatch.setitem(app.config, "NODENORM_ENDPOINTS", "prod=https://prod.example.org,dev=https://dev.example.org")
+
+    client.post("/report/compare")
+    assert jobs.run_pending(app.config) == 1
+
+    response = client.get("/report/compare?only=differences")
+    assert response.status_code == 200
+    assert b"NodeNorm: dev" in response.data
+    assert b"test entity 1" in response.data
+    assert b"1 pair(s) resolve differently" in response.data
+    assert b"1 pair(s) differ" in client.get("/jobs").data
+
+    monkeypatch.setitem(app.config, "NODENORM_ENDPOINTS", "not-a-name-url-pair")
+    response = client.get("/report/compare")
+    assert response.status_code == 302
+
+
+@pytest.fixture
+def typed_nodenorm(monkeypatch):
+    """Normalize CL: CURIEs to cells and everything else to chemicals."""
+    def normalize_curies(curies, **kwargs):
+        return {
+            curie: {"id": {"identifier": curie}, "type": ["biolink:Cell" if curie.startswith("CL:") else "biolink:ChemicalEntity"]}
+            for curie in curies
+        }
+
+    monkeypatch.setattr(nodenorm, "normalize_curies", normalize_curies)
+
+
+def test_triage_snapshots_and_bulk_suggestion(client, app, typed_nodenorm):
+    """Test snapshotting pairs in bulk and applying a suggested evaluation to all of them."""
+    db_path = app.config["DATABASE"]
+    cell_pair = database.add_pair("cell entity", "CL:001", "CHEBI:001", db_path=db_path)
+
+    response = client.get("/triage")
+    assert b"Snapshot 2 pair(s) without one" in response.data
+
+    response = client.post("/triage/snapshots")
+    assert response.headers["Location"].endswith("/jobs")
+    assert jobs.run_pending(app.config) == 1
+
+    response = client.get("/triage?show=suggested")
+    assert b"1 unevaluated pair(s) look like" in response.data
+    assert b"cell entity" in response.data
+    assert b"test entity 1" not in response.data
+
+    response = client.post("/evaluations/bulk", data={
+        "evaluation": "Different types (cell/chemical)",
+        "pair_id": [str(cell_pair)],
+        f"version_{cell_pair}": "0",
+    })
+    assert response.status_code == 302
+    assert database.get_pair(cell_pair)["evaluation"] == "Different types (cell/chemical)"
+
+    # Stale version: nothing saved
+    client.post("/evaluations/bulk", data={
+        "evaluation": "Should merge",
+        "pair_id": [str(cell_pair)],
+        f"version_{cell_pair}": "0",
+    })
+    assert database.get_pair(cell_pair)["evaluation_version"] == 1
+
+
+def test_bulk_evaluate_json(client, app):
+    """Test the JSON form of the bulk evaluation endpoint."""
+    pair_ids = [pair["id"] for pair in database.get_all_pairs()]
+
+    response = client.post("/evaluations/bulk", json={"pair_ids": pair_ids + [999], "evaluation": "Should merge"})
+    assert response.status_code == 200
+    assert response.get_json() == {"updated": pair_ids, "missing": [999]}
+
+    response = client.post("/evaluations/bulk", json={
+        "pair_ids": pair_ids, "evaluation": "Should not merge", "expected_versions": {str(pair_ids[0]): 0}
+    })
+    assert response.status_code == 409
+
+    assert client.post("/evaluations/bulk", json={"pair_ids": pair_ids, "evaluation": "Nonsense"}).status_code == 400
+    assert client.post("/evaluations/bulk", json={"pair_ids": ["1"], "evaluation": "Should merge"}).status_code == 400
+
+
+def test_investigate_stores_snapshot(client, app, fake_nodenorm):
+    """Test that investigating a pair refreshes its triage snapshot."""
+    pair_id = database.get_all_pairs()[0]["id"]
+    client.get(f"/pair/{pair_id}").get_data()
+
+    snapshot = database.get_snapshots(app.config["DATABASE"])[pair_id]
+    assert snapshot["preferred_1"] == "TEST:001"
+
+
+def test_jobs_page_queues_and_cancels(client, app):
+    """Test queuing a job from the jobs page, polling it and cancelling it."""
+    response = client.post("/jobs", data={"kind": "compare"})
+    assert response.status_code == 302
+    job_id = jobs.list_jobs(db_path=app.config["DATABASE"])[0]["id"]
+
+    response = client.get("/jobs")
+    assert b"Compare endpoints" in response.data
+    assert client.get("/jobs/status").get_json()[0]["status"] == "queued"
+
+    client.post(f"/jobs/{job_id}/cancel")
+    assert client.get(f"/jobs/{job_id}").get_json()["status"] == "cancelled"
+    assert client.get("/jobs/999").status_code == 404
+
+
+def test_jobs_page_imports_upload(client, app):
+    """Test importing an uploaded TSV of pairs through a job."""
+    import io
+
+    tsv = "entity_name\tcurie_1\tcurie_2\nimported\tIMP:001\tIMP:002\n"
+    client.post("/jobs", data={"kind": "import_pairs", "file": (io.BytesIO(tsv.encode()), "pairs.tsv")})
+
+    assert jobs.run_pending(app.config) == 1
+    job = jobs.list_jobs(db_path=app.config["DATABASE"])[0]
+    assert job["result"] == {"added": 1, "skipped": 0}
+    assert not os.path.exists(job["params"]["path"])
+    assert b"imported" in client.get("/").data
+
+
+def test_profiling_disabled_by_default(client, app):
+    """Test that requests are not profiled and the profiles view is hidden unless configured."""
+    from src.nn_investigator import profiling
+
+    client.get("/").close()
+    assert profiling.list_profiles(db_path=app.config["DATABASE"]) == []
+    assert client.get("/debug/profiles").status_code == 404
+
+
+def test_profiling_sampled_request(client, app, monkeypatch, fake_nodenorm):
+    """Test that sampled requests are profiled with their route and pair and shown on the protected view."""
+    from src.nn_investigator import profiling
+
+    monkeypatch.setitem(app.config, "PROFILE_SAMPLE_RATE", 1.0)
+    monkeypatch.setitem(app.config, "PROFILE_TOKEN", "s3cret")
+    pair_id = database.get_all_pairs()[0]["id"]
+
+    response = client.get(f"/pair/{pair_id}")
+    assert b"Save Evaluation" in response.data
+    response.close()
+
+    profile = profiling.list_profiles(db_path=app.config["DATABASE"])[0]
+    assert profile["endpoint"] == "investigate_pair"
+    assert profile["pair_id"] == pair_id
+    assert profile["reason"] == "sampled"
+    assert profile["functions"]
+
+    assert client.get("/debug/profiles").status_code == 403
+    assert client.get("/debug/profiles?token=s3cret").status_code == 403
+    assert client.get("/debug/profiles", headers={"X-Profile-Token": "wrong"}).status_code == 403
+    assert client.post("/debug/profiles", data={"token": "é"}).status_code == 403
+    response = client.get("/debug/profiles?format=json", headers={"X-Profile-Token": "s3cret"})
+    assert response.status_code == 200
+    assert response.json["profiles"][0]["endpoint"] == "investigate_pair"
+
+    # Signing in marks the session without storing the token in it
+    assert client.post("/debug/profiles", data={"token": "s3cret"}).status_code == 302
+    with client.session_transaction() as session:
+        assert "s3cret" not in str(dict(session))
+    assert b"investigate_pair" in client.get("/debug/profiles").data
+    response = client.get(f"/debug/profiles/{profile['id']}?format=json")
+    assert response.json["pair_id"] == pair_id
+
+    # Changing the token signs the session out
+    monkeypatch.setitem(app.config, "PROFILE_TOKEN", "n3w")
+    assert client.get("/debug/profiles").status_code == 403
+
+    # Viewing profiles is not itself profiled
+    assert len(profiling.list_profiles(db_path=app.config["DATABASE"])) == 1
+
+
+def test_profiling_keeps_only_slow_requests(client, app, monkeypatch):
+    """Test that with only a slow threshold, fast requests are not stored."""
+    from src.nn_investigator import profiling
+
+    monkeypatch.setitem(app.config, "PROFILE_SLOW_MS", 60000)
+    client.get("/").close()
+    assert profiling.list_profiles(db_path=app.config["DATABASE"]) == []
+
+    monkeypatch.setitem(app.config, "PROFILE_SLOW_MS", 1)
+    monkeypatch.setattr(database, "get_data_version", lambda db_path: time.sleep(0.02) or 0)
+    client.get("/").close()
+
+    profile = profiling.list_profiles(db_path=app.config["DATABASE"])[0]
+    assert profile["reason"] == "slow"
+    assert profile["mode"] == "sample"
+    assert profile["duration_ms"] >= 20
+
+
+def test_index_groups_pairs_sharing_a_clique(client, app, fake_nodenorm):
+    """Test that pairs whose CURIEs normalize to the same clique are grouped on the index page."""
+    first = database.get_all_pairs()[0]["id"]
+    second = database.add_pair(entity_name="test entity 2", curie_1="TEST:001", curie_2="TEST:003")
+    database.add_pair(entity_name="test entity 3", curie_1="TEST:004", curie_2="TEST:005")
+
+    assert b"share a clique" not in client.get("/").data
+
+    for pair_id in (first, second):
+        client.get(f"/pair/{pair_id}").get_data()
+
+    response = client.get("/")
+    assert b"2 pairs share a clique:" in response.data
+    assert b"<code>TEST:001</code>" in response.data
+    assert b"Other pairs" in response.data
+
+    response = client.get(f"/pair/{first}")
+    assert b"Related Pairs (1)" in response.data
+    assert b"test entity 2" in response.data
+
+
+def test_carry_over_evaluation(client, app, fake_nodenorm):
+    """Test applying a pair's evaluation to related pairs."""
+    first = database.get_all_pairs()[0]["id"]
+    second = database.add_pair(entity_name="test entity 2", curie_1="TEST:001", curie_2="TEST:003")
+    unrelated = database.add_pair(entity_name="test entity 3", curie_1="TEST:004", curie_2="TEST:005")
+    # Shares a clique only with the second pair
+    chained = database.add_pair(entity_name="test entity 4", curie_1="TEST:003", curie_2="TEST:006")
+    for pair_id in (first, second, unrelated, chained):
+        client.get(f"/pair/{pair_id}").get_data()
+
+    # Nothing to carry over before the pair is evaluated
+    response = client.post(f"/pair/{first}/carry-over", data={"pair_id": [second], "evaluation_version": 0})
+    assert response.status_code == 302
+    assert database.get_pair(second)["evaluation"] is None
+
+    database.update_evaluation(first, "Dangling CHEMBL", "no structure")
+
+    # A stale view of the source evaluation is rejected
+    client.post(f"/pair/{first}/carry-over", data={"pair_id": [second], "evaluation_version": 0})
+    assert database.get_pair(second)["evaluation"] is None
+
+    response = client.post(f"/pair/{first}/carry-over", data={
+        "pair_id": [second, unrelated, chained],
+        "version_" + str(second): 0,
+        "evaluation_version": 1,
+    }, follow_redirects=True)
+    assert b"to 2 related pair(s)" in response.data
+    assert database.get_pair(chained)["evaluation"] == "Dangling CHEMBL"
+
+    carried = database.get_pair(second)
+    assert carried["evaluation"] == "Dangling CHEMBL"
+    assert carried["evaluation_notes"] == "Carried over from pair #%d (test entity 1): no structure" % first
+    assert database.get_pair(unrelated)["evaluation"] is None
+
+
+def test_triage_revisits_an_evaluation(client, app):
+    """Test listing the pairs that currently have a given evaluation on the triage page."""
+    evaluated = database.get_all_pairs()[0]["id"]
+    database.add_pair(entity_name="still open", curie_1="TEST:003", curie_2="TEST:004")
+    database.update_evaluation(evaluated, "Requires further investigation")
+
+    response = client.get("/triage?show=Requires further investigation")
+    assert b"test entity 1" in response.data
+    assert b"still open" not in response.data
+
+    response = client.get("/triage")
+    assert b"still open" in response.data
+    assert b"test entity 1" not in response.data
+    assert b"Snapshot 2 pair(s) without one" in response.data
@@ -0,0 +1,178 @@
+"""Tests for the pluggable normalization backends."""
+
+import json
+import os
+import tempfile
+import pytest
+from src.nn_investigator import backends
+from src.nn_investigator import nodenorm
+from src.nn_investigator.cache import SQLiteCache
+from src.nn_investigator.config import load_config
+
+
+class FakeBackend:
+    """Backend that resolves a fixed set of CURIEs and records its calls."""
+
+    def __init__(self, name, results):
+        self.name = name
+        self.results = results
+        self.calls = []
+
+    def normalize_curies(self, curies, conflate=True, drug_chemical_conflate=True):
+        self.calls.append(list(curies))
+        return {curie: self.results.get(curie) for curie in curies}
+
+
+def clique(curie):
+    return {"id": {"identifier": curie}, "equivalent_identifiers": [{"identifier": curie}], "type": []}
+
+
+@pytest.fixture
+def cache():
+    """Create a cache backed by a temporary file."""
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    yield SQLiteCache(path, ttl=60)
+    os.unlink(path)
+
+
+@pytest.fixture
+def fixture_path():
+    """Write a replay fixture with one recorded CURIE."""
+    fd, path = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(fd, "w") as f:
+        json.dump({"REPLAY:1": clique("REPLAY:1")}, f)
+    yield path
+    os.unlink(path)
+
+
+def test_chain_passes_unresolved_curies_on():
+    """Test that later backends only see CURIEs earlier ones could not resolve."""
+    local = FakeBackend("local", {"A:1": clique("A:1")})
+    remote = FakeBackend("remote", {"B:1": clique("B:1")})
+
+    result = backends.ChainBackend([local, remote]).normalize_curies(["A:1", "B:1", "C:1"])
+
+    assert remote.calls == [["B:1", "C:1"]]
+    assert result["A:1"]["id"]["identifier"] == "A:1"
+    assert result["B:1"]["id"]["identifier"] == "B:1"
+    assert result["C:1"] is None
+
+
+def test_chain_stops_when_everything_resolved():
+    """Test that remote backends are skipped when earlier ones resolve everything."""
+    local = FakeBackend("local", {"A:1": clique("A:1")})
+    remote = FakeBackend("remote", {})
+
+    backends.ChainBackend([local, remote]).normalize_curies(["A:1"])
+
+    assert remote.calls == []
+
+
+def test_cached_backend_fetches_misses_once(cache):
+    """Test that the cache only asks the inner backend for uncached CURIEs."""
+    inner = FakeBackend("local", {"A:1": clique("A:1")})
+    cached = backends.CachedBackend(inner, cache)
+
+    cached.normalize_curies(["A:1"])
+    result = cached.normalize_curies(["A:1", "B:1"])
+
+    assert inner.calls == [["A:1"], ["B:1"]]
+    assert result["A:1"]["id"]["identifier"] == "A:1"
+
+
+def test_replay_backend(fixture_path):
+    """Test replaying recorded results."""
+    replay = backends.ReplayBackend(fixture_path)
+    result = replay.normalize_curies(["REPLAY:1", "OTHER:1"])
+
+    assert result["REPLAY:1"]["id"]["identifier"] == "REPLAY:1"
+    assert result["OTHER:1"] is None
+
+
+def test_http_backend_uses_configured_url(monkeypatch):
+    """Test that the HTTP backend sends requests to its own endpoint."""
+    calls = []
+
+    def normalize_curies(curies, **kwargs):
+        calls.append(kwargs["url"])
+        return {}
+
+    monkeypatch.setattr(nodenorm, "normalize_curies", normalize_curies)
+    backends.HttpBackend("https://example.org/get_normalized_nodes").normalize_curies(["A:1"])
+
+    assert calls == ["https://example.org/get_normalized_nodes"]
+
+
+def test_build_default_backend(cache):
+    """Test that the default config caches the live API."""
+    backend = backends.build_backend(load_config({}), cache)
+
+    assert isinstance(backend, backends.CachedBackend)
+    assert isinstance(backend.inner, backends.HttpBackend)
+
+
+def test_build_chained_backend(cache, fixture_path):
+    """Test that cache wraps every backend listed after it."""
+    config = {**load_config({}), "NORMALIZATION_BACKENDS": "cache, replay, remote", "REPLAY_FIXTURE": fixture_path}
+    backend = backends.build_backend(config, cache)
+
+    assert backend.name == "cache(replay>remote)"
+    assert [type(b) for b in backend.inner.backends] == [backends.ReplayBackend, backends.HttpBackend]
+
+
+def test_local_backend_opens_index_once(monkeypatch):
+    """Test that threads sharing the local backend open its index only once."""
+    import threading
+    import time
+    from src.nn_investigator import local_index
+
+    opened = []
+
+    class FakeIndex:
+        def __init__(self, index_path):
+            time.sleep(0.01)
+            opened.append(index_path)
+
+        def normalize_curies(self, curies):
+            return {curie: None for curie in curies}
+
+    monkeypatch.setattr(local_index, "LocalCliqueIndex", FakeIndex)
+    backend = backends.LocalIndexBackend("cliques.idx")
+    barrier = threading.Barrier(8)
+
+    def normalize():
+        barrier.wait()
+        backend.normalize_curies(["A:1"])
+
+    threads = [threading.Thread(target=normalize) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert opened == ["cliques.idx"]
+
+
+def test_backend_names():
+    """Test parsing the NORMALIZATION_BACKENDS list."""
+    assert backends.backend_names({"NORMALIZATION_BACKENDS": " cache , local,"}) == ["cache", "local"]
+    assert "cache" not in backends.backend_names({"NORMALIZATION_BACKENDS": "replay_cache"})
+
+
+@pytest.mark.parametrize("setting", ["", "cache", "remote,bogus", "local"])
+def test_build_backend_rejects_invalid_settings(cache, setting):
+    """Test that misconfiguration is reported clearly."""
+    config = {**load_config({}), "NORMALIZATION_BACKENDS": setting}
+    with pytest.raises(ValueError):
+        backends.build_backend(config, cache)
+
+
+def test_normalize_bulk_batches():
+    """Test that bulk normalization splits CURIEs into batches and drops duplicates."""
+    backend = FakeBackend("local", {"A:1": clique("A:1")})
+
+    result = backends.normalize_bulk(backend, ["A:1", "B:1", "A:1", "C:1"], batch_size=2)
+
+    assert backend.calls == [["A:1", "B:1"], ["C:1"]]
+    assert set(result) == {"A:1", "B:1", "C:1"}
@@ -0,0 +1,83 @@
+"""Tests for the shared SQLite cache and configuration loading."""
+
+import pytest
+import tempfile
+import os
+from src.nn_investigator import nodenorm
+from src.nn_investigator.cache import SQLiteCache
+from src.nn_investigator.config import load_config, DEFAULTS
+
+
+@pytest.fixture
+def cache():
+    """Create a cache backed by a temporary file."""
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    yield SQLiteCache(path, ttl=60)
+    os.unlink(path)
+
+
+def test_set_and_get(cache):
+    """Test storing and reading values."""
+    cache.set("a", {"x": 1})
+    cache.set_many({"b": [1, 2], "c": None})
+
+    assert cache.get("a") == {"x": 1}
+    assert cache.get_many(["a", "b", "c", "missing"]) == {"a": {"x": 1}, "b": [1, 2], "c": None}
+
+
+def test_entries_shared_between_instances(cache):
+    """Test that separate cache objects (e.g. in other workers) see the same entries."""
+    cache.set("shared", "value")
+
+    other = SQLiteCache(cache.db_path, ttl=60)
+    assert other.get("shared") == "value"
+
+
+def test_expired_entries_are_skipped(cache):
+    """Test that entries older than the TTL are not returned."""
+    cache.set("old", "value")
+    cache.ttl = -1
+
+    assert cache.get("old") is None
+
+
+def test_clear(cache):
+    """Test removing all entries."""
+    cache.set("a", 1)
+    cache.clear()
+    assert cache.get("a") is None
+
+
+def test_normalize_curies_cached_fetches_only_missing(cache, monkeypatch):
+    """Test that only uncached CURIEs are sent upstream."""
+    calls = []
+
+    def normalize_curies(curies, **kwargs):
+        calls.append(list(curies))
+        return {curie: {"id": {"identifier": curie}} for curie in curies}
+
+    monkeypatch.setattr(nodenorm, "normalize_curies", normalize_curies)
+
+    nodenorm.normalize_curies_cached(["A:1", "B:1"], cache)
+    result = nodenorm.normalize_curies_cached(["A:1", "C:1"], cache)
+
+    assert calls == [["A:1", "B:1"], ["C:1"]]
+    assert result["A:1"]["id"]["identifier"] == "A:1"
+    assert result["C:1"]["id"]["identifier"] == "C:1"
+
+
+def test_load_config_defaults():
+    """Test that defaults are used when no environment variables are set."""
+    assert load_config({}) == DEFAULTS
+
+
+def test_load_config_from_environment():
+    """Test that environment variables override defaults with the right types."""
+    config = load_config({
+        "NN_INVESTIGATOR_DATABASE": "/data/nn.db",
+        "NN_INVESTIGATOR_CACHE_TTL": "120",
+    })
+
+    assert config["DATABASE"] == "/data/nn.db"
+    assert config["CACHE_TTL"] == 120
@@ -0,0 +1,102 @@
+"""Tests for the command-line tools and startup cost."""
+
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import pytest
+from src.nn_investigator import cli
+from src.nn_investigator import database
+from src.nn_investigator import nodenorm
+from src.nn_investigator.config import load_config
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def loaded_modules(module: str) -> set[str]:
+    """Import a module in a fresh interpreter and return the names of all loaded modules."""
+    output = subprocess.run(
+        [sys.executable, "-c", f"import sys, {module}; print(' '.join(sys.modules))"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return set(output.split())
+
+
+@pytest.mark.parametrize("module", [
+    "src.nn_investigator.cli",
+    "src.nn_investigator.database",
+    "load_initial_data",
+])
+def test_batch_tools_do_not_import_flask(module):
+    """Test that batch tools start without loading Flask."""
+    assert "flask" not in loaded_modules(module)
+
+
+def test_app_does_not_import_http_clients():
+    """Test that importing the app defers loading requests until it is needed."""
+    modules = loaded_modules("src.nn_investigator.app")
+    assert "requests" not in modules
+    assert "src.nn_investigator.nodenorm" not in modules
+
+
+def test_overlap_report(monkeypatch):
+    """Test writing the overlap report as TSV."""
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    fd, cache_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+
+    def normalize_curies(curies, **kwargs):
+        return {curie: {"id": {"identifier": curie, "label": "same"}, "equivalent_identifiers": []} for curie in curies}
+
+    monkeypatch.setattr(nodenorm, "normalize_curies", normalize_curies)
+
+    try:
+        database.init_db(db_path)
+        database.add_pair("entity", "TEST:001", "TEST:002", db_path=db_path)
+
+        out = io.StringIO()
+        config = {**load_config({}), "DATABASE": db_path, "CACHE_DATABASE": cache_path, "CACHE_TTL": 60}
+        assert cli.overlap_report(config, out=out) == 0
+
+        header, row = out.getvalue().splitlines()
+        assert header.split("\t") == cli.OVERLAP_COLUMNS
+        values = dict(zip(cli.OVERLAP_COLUMNS, row.split("\t")))
+        assert values["entity_name"] == "entity"
+        assert values["preferred_2"] == "TEST:002"
+        assert values["split_score"] == "0.800"
+    finally:
+        os.unlink(db_path)
+        os.unlink(cache_path)
+
+
+def test_compare_report(monkeypatch):
+    """Test writing the endpoint comparison as TSV."""
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+
+    def normalize_curies(curies, url=None, **kwargs):
+        return {curie: {"id": {"identifier": "TEST:001" if "dev" in url else curie}} for curie in curies}
+
+    monkeypatch.setattr(nodenorm, "normalize_curies", normalize_curies)
+
+    try:
+        database.init_db(db_path)
+        database.add_pair("entity", "TEST:001", "TEST:002", db_path=db_path)
+
+        out = io.StringIO()
+        config = {**load_config({}), "DATABASE": db_path, "NODENORM_ENDPOINTS": "prod=https://prod,dev=https://dev"}
+        assert cli.compare_report(config, out=out, only_differences=True) == 0
+
+        header, row = out.getvalue().splitlines()
+        values = dict(zip(header.split("\t"), row.split("\t")))
+        assert values["differs"] == "True"
+        assert values["prod:same_clique"] == "False"
+        assert values["dev:preferred_2"] == "TEST:001"
+    finally:
+        os.unlink(db_path)
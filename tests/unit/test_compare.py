@@ -0,0 +1,129 @@
+"""Tests for comparing pair outcomes across NodeNorm and NameRes instances."""
+
+import threading
+import pytest
+import requests
+from src.nn_investigator import compare
+from src.nn_investigator import nameres
+from src.nn_investigator import nodenorm
+
+
+PROD = "https://prod.example.org/get_normalized_nodes"
+DEV = "https://dev.example.org/get_normalized_nodes"
+
+PAIRS = [
+    {"id": 1, "entity_name": "split", "curie_1": "TEST:001", "curie_2": "TEST:002"},
+    {"id": 2, "entity_name": "stable", "curie_1": "TEST:003", "curie_2": "TEST:004"},
+]
+
+
+@pytest.fixture
+def fake_instances(monkeypatch):
+    """Fake a prod NodeNorm that splits TEST:001/TEST:002 and a dev one that merges them."""
+    calls = []
+    lock = threading.Lock()
+
+    def normalize_curies(curies, conflate=True, drug_chemical_conflate=True, description=False, url=None):
+        with lock:
+            calls.append((url, list(curies)))
+        merged = {"TEST:002": "TEST:001", "TEST:004": "TEST:003"} if url == DEV else {"TEST:004": "TEST:003"}
+        return {curie: {"id": {"identifier": merged.get(curie, curie)}} for curie in curies}
+
+    monkeypatch.setattr(nodenorm, "normalize_curies", normalize_curies)
+    return calls
+
+
+def test_parse_endpoints():
+    """Test parsing name=url lists."""
+    assert compare.parse_endpoints("") == {}
+    assert compare.parse_endpoints(" prod=https://a , dev=https://b ") == {"prod": "https://a", "dev": "https://b"}
+
+    with pytest.raises(ValueError):
+        compare.parse_endpoints("https://a")
+    with pytest.raises(ValueError):
+        compare.parse_endpoints("prod=https://a,prod=https://b")
+
+
+def test_configured_endpoints():
+    """Test that base URLs get the NodeNorm path and the single instance is the default."""
+    nodenorm_endpoints, nameres_endpoints = compare.configured_endpoints({
+        "NODENORM_ENDPOINTS": "prod=https://prod.example.org/,dev=" + DEV,
+        "NAMERES_ENDPOINTS": "",
+    })
+    assert nodenorm_endpoints == {"prod": PROD, "dev": DEV}
+    assert nameres_endpoints == {}
+
+    nodenorm_endpoints, _ = compare.configured_endpoints({"NODENORM_ENDPOINTS": "", "NODENORM_URL": ""})
+    assert nodenorm_endpoints == {"default": nodenorm.NODENORM_URL}
+
+
+def test_compare_endpoints_diffs_outcomes(fake_instances):
+    """Test that pairs resolving differently are flagged and listed first."""
+    report = compare.compare_endpoints(list(reversed(PAIRS)), {"prod": PROD, "dev": DEV}, batch_size=3)
+
+    assert [row["entity_name"] for row in report["rows"]] == ["split", "stable"]
+    split, stable = report["rows"]
+    assert split["differs"] and not stable["differs"]
+    assert split["outcomes"]["prod"] == {"preferred_1": "TEST:001", "preferred_2": "TEST:002", "same_clique": False}
+    assert split["outcomes"]["dev"]["same_clique"]
+    assert report["same_clique_counts"] == {"prod": 1, "dev": 2}
+
+    # Each instance got every CURIE, in batches
+    assert sorted(len(curies) for _, curies in fake_instances) == [1, 1, 3, 3]
+
+
+def test_compare_endpoints_reports_progress(fake_instances):
+    """Test that progress is reported per completed request and that raising from it stops the comparison."""
+    reports = []
+    compare.compare_endpoints(PAIRS, {"prod": PROD, "dev": DEV}, batch_size=3, progress=lambda *args: reports.append(args))
+    assert reports == [(1, 4), (2, 4), (3, 4), (4, 4)]
+
+    def stop(done, total):
+        raise KeyboardInterrupt()
+
+    with pytest.raises(KeyboardInterrupt):
+        compare.compare_endpoints(PAIRS, {"prod": PROD}, progress=stop)
+
+
+def test_compare_endpoints_reports_failed_instance(fake_instances, monkeypatch):
+    """Test that one unreachable instance does not hide the others."""
+    working = nodenorm.normalize_curies
+
+    def normalize_curies(curies, url=None, **kwargs):
+        if url == DEV:
+            raise requests.ConnectionError("dev is down")
+        return working(curies, url=url, **kwargs)
+
+    monkeypatch.setattr(nodenorm, "normalize_curies", normalize_curies)
+
+    report = compare.compare_endpoints(PAIRS, {"prod": PROD, "dev": DEV})
+
+    assert report["nodenorm_errors"] == {"dev": "dev is down"}
+    assert report["same_clique_counts"] == {"prod": 1}
+    assert all(row["outcomes"]["dev"] is None and not row["differs"] for row in report["rows"])
+
+
+def test_compare_endpoints_name_lookups(fake_instances, monkeypatch):
+    """Test that differing top NameRes hits are flagged."""
+    requests_sent = []
+
+    def bulk_lookup(queries, base_url=None):
+        requests_sent.append((base_url, len(queries)))
+        return {
+            query_id: [{"curie": "TEST:999" if base_url == "https://dev" and query["string"] == "stable" else "TEST:001"}]
+            for query_id, query in queries.items()
+        }
+
+    monkeypatch.setattr(nameres, "bulk_lookup", bulk_lookup)
+
+    report = compare.compare_endpoints(
+        PAIRS, {"prod": PROD}, {"prod": "https://prod", "dev": "https://dev"}, max_workers=2, name_batch_size=1
+    )
+
+    rows = {row["entity_name"]: row for row in report["rows"]}
+    assert rows["stable"]["name_hits"] == {"prod": "TEST:001", "dev": "TEST:999"}
+    assert rows["stable"]["differs"]
+    assert not rows["split"]["differs"]
+
+    # Names go out in bulk requests of at most name_batch_size
+    assert sorted(requests_sent) == [("https://dev", 1), ("https://dev", 1), ("https://prod", 1), ("https://prod", 1)]
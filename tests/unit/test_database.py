@@ -123,3 +123,395 @@ def test_get_connection(temp_db):
     assert isinstance(conn, sqlite3.Connection)
     assert conn.row_factory == sqlite3.Row
     conn.close()
+
+
+def test_update_evaluation_appends_history(temp_db):
+    """Test that evaluations are versioned rather than overwritten."""
+    pair_id = database.add_pair("entity", "TEST:001", "TEST:002", db_path=temp_db)
+
+    assert database.update_evaluation(pair_id, "Should merge", db_path=temp_db) is True
+    assert database.update_evaluation(pair_id, "Should not merge", "Changed my mind", db_path=temp_db) is True
+
+    pair = database.get_pair(pair_id, temp_db)
+    assert pair["evaluation"] == "Should not merge"
+    assert pair["evaluation_notes"] == "Changed my mind"
+    assert pair["evaluation_version"] == 2
+
+    history = database.get_evaluation_history(pair_id, temp_db)
+    assert [h["version"] for h in history] == [2, 1]
+    assert history[1]["evaluation"] == "Should merge"
+
+
+def test_update_evaluation_conflict(temp_db):
+    """Test that a stale expected version raises a conflict."""
+    pair_id = database.add_pair("entity", "TEST:001", "TEST:002", db_path=temp_db)
+    database.update_evaluation(pair_id, "Should merge", expected_version=0, db_path=temp_db)
+
+    with pytest.raises(database.EvaluationConflictError) as excinfo:
+        database.update_evaluation(pair_id, "Should not merge", expected_version=0, db_path=temp_db)
+
+    assert excinfo.value.current["evaluation"] == "Should merge"
+    assert database.get_pair(pair_id, temp_db)["evaluation_version"] == 1
+
+
+def test_update_evaluation_missing_pair(temp_db):
+    """Test evaluating a non-existent pair."""
+    assert database.update_evaluation(999, "Should merge", db_path=temp_db) is False
+
+
+def test_unevaluated_pair_has_version_zero(temp_db):
+    """Test that a pair without evaluations reports version 0."""
+    pair_id = database.add_pair("entity", "TEST:001", "TEST:002", db_path=temp_db)
+
+    pair = database.get_pair(pair_id, temp_db)
+    assert pair["evaluation"] is None
+    assert pair["evaluation_version"] == 0
+
+
+def test_delete_pair_removes_history(temp_db):
+    """Test that deleting a pair also deletes its evaluations."""
+    pair_id = database.add_pair("entity", "TEST:001", "TEST:002", db_path=temp_db)
+    database.update_evaluation(pair_id, "Should merge", db_path=temp_db)
+
+    database.delete_pair(pair_id, temp_db)
+
+    assert database.get_evaluation_history(pair_id, temp_db) == []
+
+
+def test_bulk_update_evaluation(temp_db):
+    """Test saving one evaluation for many pairs."""
+    first = database.add_pair("first", "TEST:001", "TEST:002", db_path=temp_db)
+    second = database.add_pair("second", "TEST:003", "TEST:004", db_path=temp_db)
+    database.update_evaluation(second, "Should merge", db_path=temp_db)
+    version = database.get_data_version(temp_db)
+
+    updated = database.bulk_update_evaluation([first, second, 999], "Dangling CHEMBL", "bulk", db_path=temp_db)
+
+    assert updated == [first, second]
+    assert database.get_pair(first, temp_db)["evaluation_version"] == 1
+    assert database.get_pair(second, temp_db)["evaluation_version"] == 2
+    assert database.get_pair(second, temp_db)["evaluation_notes"] == "bulk"
+    assert database.get_data_version(temp_db) == version + 1
+
+
+def test_bulk_update_evaluation_conflict_saves_nothing(temp_db):
+    """Test that one stale version aborts the whole batch."""
+    first = database.add_pair("first", "TEST:001", "TEST:002", db_path=temp_db)
+    second = database.add_pair("second", "TEST:003", "TEST:004", db_path=temp_db)
+    database.update_evaluation(second, "Should merge", db_path=temp_db)
+
+    with pytest.raises(database.EvaluationConflictError) as excinfo:
+        database.bulk_update_evaluation(
+            [first, second], "Should not merge", expected_versions={first: 0, second: 0}, db_path=temp_db
+        )
+
+    assert excinfo.value.pair_id == second
+    assert excinfo.value.current["evaluation"] == "Should merge"
+    assert database.get_pair(first, temp_db)["evaluation"] is None
+
+
+def test_snapshots(temp_db):
+    """Test storing, replacing and deleting clique snapshots."""
+    pair_id = database.add_pair("entity", "TEST:001", "TEST:002", db_path=temp_db)
+    snapshot = {
+        "pair_id": pair_id, "preferred_1": "TEST:001", "label_1": "one", "type_1": "biolink:Cell",
+        "preferred_2": "TEST:002", "label_2": None, "type_2": None, "same_clique": False, "suggestion": None,
+    }
+
+    database.save_snapshots([snapshot, {**snapshot, "pair_id": 999}], temp_db)
+    database.save_snapshots([{**snapshot, "suggestion": "Different types (cell/chemical)"}], temp_db)
+
+    snapshots = database.get_snapshots(temp_db)
+    assert list(snapshots) == [pair_id]
+    assert snapshots[pair_id]["same_clique"] is False
+    assert snapshots[pair_id]["suggestion"] == "Different types (cell/chemical)"
+
+    database.delete_pair(pair_id, temp_db)
+    assert database.get_snapshots(temp_db) == {}
+
+
+def test_clique_members_follow_snapshots(temp_db):
+    """Test that saving snapshots keeps the clique membership index current."""
+    first = database.add_pair("first", "TEST:001", "TEST:002", db_path=temp_db)
+    second = database.add_pair("second", "TEST:003", "TEST:004", db_path=temp_db)
+
+    def snapshot(pair_id, preferred_1, preferred_2):
+        return {
+            "pair_id": pair_id, "preferred_1": preferred_1, "label_1": None, "type_1": None,
+            "preferred_2": preferred_2, "label_2": None, "type_2": None, "same_clique": False, "suggestion": None,
+        }
+
+    database.save_snapshots([snapshot(first, "CHEMBL:1", "UMLS:1"), snapshot(second, "CHEMBL:2", "UMLS:1")], temp_db)
+    assert database.get_clique_members(temp_db) == [
+        ("CHEMBL:1", first), ("CHEMBL:2", second), ("UMLS:1", first), ("UMLS:1", second)
+    ]
+
+    related = database.get_related_pairs(first, temp_db)
+    assert [(pair["id"], pair["shared_ids"]) for pair in related] == [(second, ["UMLS:1"])]
+
+    # Re-saving unchanged cliques keeps cached pages valid; a clique change does not
+    version = database.get_data_version(temp_db)
+    database.save_snapshots([snapshot(second, "CHEMBL:2", "UMLS:1")], temp_db)
+    assert database.get_data_version(temp_db) == version
+
+    database.save_snapshots([snapshot(second, "CHEMBL:2", None)], temp_db)
+    assert database.get_data_version(temp_db) > version
+    assert database.get_related_pairs(first, temp_db) == []
+
+    database.delete_pair(first, temp_db)
+    assert database.get_clique_members(temp_db) == [("CHEMBL:2", second)]
+
+
+def test_related_pairs_follow_chains(temp_db):
+    """Test that related pairs are the whole group, including pairs linked only through other pairs."""
+    chain = [
+        database.add_pair(name, curie_1, curie_2, db_path=temp_db)
+        for name, curie_1, curie_2 in [("a", "A:1", "A:2"), ("b", "A:2", "A:3"), ("c", "A:3", "A:4")]
+    ]
+    database.save_snapshots([
+        {
+            "pair_id": pair_id, "preferred_1": f"A:{i + 1}", "label_1": None, "type_1": None,
+            "preferred_2": f"A:{i + 2}", "label_2": None, "type_2": None, "same_clique": False, "suggestion": None,
+        }
+        for i, pair_id in enumerate(chain)
+    ], temp_db)
+
+    related = database.get_related_pairs(chain[0], temp_db)
+    assert [(pair["id"], pair["shared_ids"]) for pair in related] == [(chain[1], ["A:2"]), (chain[2], [])]
+    assert {pair["id"] for pair in database.get_related_pairs(chain[1], temp_db)} == {chain[0], chain[2]}
+
+
+def test_clique_members_backfilled_from_snapshots(temp_db):
+    """Test that the membership index migration indexes snapshots taken before it existed."""
+    pair_id = database.add_pair("entity", "TEST:001", "TEST:002", db_path=temp_db)
+    conn = database.get_connection(temp_db)
+    conn.execute("DROP TABLE clique_members")
+    conn.execute("""
+        INSERT INTO clique_snapshots (pair_id, preferred_1, preferred_2, same_clique)
+        VALUES (?, 'CHEMBL:1', NULL, 0)
+    """, (pair_id,))
+    conn.execute("DELETE FROM schema_version WHERE version >= 6")
+    conn.commit()
+    conn.close()
+
+    database.init_db(temp_db)
+    assert database.get_clique_members(temp_db) == [("CHEMBL:1", pair_id)]
+
+
+def test_init_db_migrates_legacy_evaluations():
+    """Test that evaluations stored on entity_pairs move into the history table."""
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE entity_pairs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entity_name TEXT NOT NULL,
+            curie_1 TEXT NOT NULL,
+            curie_1_label TEXT,
+            curie_2 TEXT NOT NULL,
+            curie_2_label TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            notes TEXT,
+            evaluation TEXT,
+            evaluation_notes TEXT
+        )
+    """)
+    conn.execute("""
+        INSERT INTO entity_pairs (entity_name, curie_1, curie_2, evaluation, evaluation_notes)
+        VALUES ('legacy', 'TEST:001', 'TEST:002', 'Should merge', 'Old note')
+    """)
+    conn.commit()
+    conn.close()
+
+    try:
+        database.init_db(path)
+        database.init_db(path)
+
+        pair = database.get_all_pairs(path)[0]
+        assert pair["evaluation"] == "Should merge"
+        assert pair["evaluation_notes"] == "Old note"
+        assert pair["evaluation_version"] == 1
+    finally:
+        os.unlink(path)
+
+
+def test_data_version_bumped_by_writes(temp_db):
+    """Test that every write changes the data version."""
+    versions = [database.get_data_version(temp_db)]
+
+    pair_id = database.add_pair("entity", "TEST:001", "TEST:002", db_path=temp_db)
+    versions.append(database.get_data_version(temp_db))
+
+    database.update_evaluation(pair_id, "Should merge", db_path=temp_db)
+    versions.append(database.get_data_version(temp_db))
+
+    database.delete_pair(pair_id, temp_db)
+    versions.append(database.get_data_version(temp_db))
+
+    assert versions == sorted(set(versions))
+
+
+def test_data_version_unchanged_by_failed_delete(temp_db):
+    """Test that deleting a missing pair does not invalidate caches."""
+    version = database.get_data_version(temp_db)
+    database.delete_pair(999, temp_db)
+    assert database.get_data_version(temp_db) == version
+
+
+def test_init_db_records_schema_version(temp_db):
+    """Test that init_db stores the schema version."""
+    assert database.get_schema_version(temp_db) == database.SCHEMA_VERSION
+
+
+def test_init_db_skips_current_schema(temp_db):
+    """Test that init_db does nothing when the schema version is current."""
+    conn = database.get_connection(temp_db)
+    conn.execute("DROP TABLE data_version")
+    conn.commit()
+    conn.close()
+
+    database.init_db(temp_db)
+
+    conn = database.get_connection(temp_db)
+    row = conn.execute("SELECT name FROM sqlite_master WHERE name = 'data_version'").fetchone()
+    conn.close()
+    assert row is None
+
+
+def test_init_db_upgrades_old_schema(temp_db):
+    """Test that init_db reruns schema creation when the stored version is outdated."""
+    conn = database.get_connection(temp_db)
+    conn.execute("DROP TABLE data_version")
+    conn.execute("DELETE FROM schema_version")
+    conn.commit()
+    conn.close()
+
+    database.init_db(temp_db)
+
+    assert database.get_schema_version(temp_db) == database.SCHEMA_VERSION
+    assert database.get_data_version(temp_db) == 0
+
+
+def test_init_db_applies_migrations_in_order(temp_db):
+    """Test that every migration is recorded once and re-running is a no-op."""
+    database.init_db(temp_db)
+
+    conn = database.get_connection(temp_db)
+    versions = [row["version"] for row in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+    indexes = {row["name"] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    conn.close()
+
+    assert versions == [version for version, _, _ in database.MIGRATIONS]
+    assert {
+        "idx_entity_pairs_entity_name",
+        "idx_entity_pairs_curie_1",
+        "idx_entity_pairs_curie_2",
+        "idx_evaluations_evaluation",
+    } <= indexes
+
+
+def test_init_db_applies_only_pending_migrations(temp_db):
+    """Test upgrading a database created before the index migration."""
+    conn = database.get_connection(temp_db)
+    conn.execute("DROP INDEX idx_entity_pairs_entity_name")
+    conn.execute("DELETE FROM schema_version WHERE version > 1")
+    conn.commit()
+    conn.close()
+
+    database.init_db(temp_db)
+
+    assert database.get_schema_version(temp_db) == database.SCHEMA_VERSION
+    conn = database.get_connection(temp_db)
+    row = conn.execute("SELECT name FROM sqlite_master WHERE name = 'idx_entity_pairs_entity_name'").fetchone()
+    conn.close()
+    assert row is not None
+
+
+def test_get_pairs_by_curies(temp_db):
+    """Test finding pairs by a CURIE on either side."""
+    database.add_pair("entity1", "TEST:001", "TEST:002", db_path=temp_db)
+    database.add_pair("entity2", "TEST:003", "TEST:001", db_path=temp_db)
+    database.add_pair("entity3", "TEST:004", "TEST:005", db_path=temp_db)
+
+    pairs = database.get_pairs_by_curies(["TEST:001"], temp_db)
+    assert [p["entity_name"] for p in pairs] == ["entity1", "entity2"]
+    assert database.get_pairs_by_curies([], temp_db) == []
+
+
+def test_get_pairs_by_evaluation(temp_db):
+    """Test finding pairs by their latest evaluation."""
+    pair_1 = database.add_pair("entity1", "TEST:001", "TEST:002", db_path=temp_db)
+    pair_2 = database.add_pair("entity2", "TEST:003", "TEST:004", db_path=temp_db)
+    database.add_pair("entity3", "TEST:005", "TEST:006", db_path=temp_db)
+
+    database.update_evaluation(pair_1, "Should merge", db_path=temp_db)
+    database.update_evaluation(pair_2, "Should merge", db_path=temp_db)
+    database.update_evaluation(pair_2, "Should not merge", db_path=temp_db)
+
+    assert [p["id"] for p in database.get_pairs_by_evaluation("Should merge", temp_db)] == [pair_1]
+    assert [p["entity_name"] for p in database.get_pairs_by_evaluation(None, temp_db)] == ["entity3"]
+    assert database.count_pairs(temp_db) == 3
+
+
+@pytest.fixture
+def traced_queries(temp_db, monkeypatch):
+    """Record every SELECT, UPDATE and DELETE issued by the database module."""
+    statements = []
+    original_get_connection = database.get_connection
+
+    def get_connection(db_path="nn_investigator.db"):
+        conn = original_get_connection(db_path)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(database, "get_connection", get_connection)
+    yield statements
+
+
+def query_plan(db_path, statement):
+    conn = database.get_connection(db_path)
+    plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + statement)]
+    conn.close()
+    return plan
+
+
+def test_hot_queries_use_indexes(temp_db, traced_queries):
+    """Test that no query in the database module needs a full table scan."""
+    for i in range(20):
+        pair_id = database.add_pair(f"entity{i}", f"TEST:{i}", f"OTHER:{i}", db_path=temp_db)
+        database.update_evaluation(pair_id, "Should merge", db_path=temp_db)
+
+    traced_queries.clear()
+    database.get_all_pairs(temp_db)
+    database.get_pair(1, temp_db)
+    database.get_pairs_by_curies(["TEST:1", "OTHER:2"], temp_db)
+    database.get_pairs_by_evaluation("Should merge", temp_db)
+    database.get_pairs_by_evaluation(None, temp_db)
+    database.count_pairs(temp_db)
+    database.get_evaluation_history(1, temp_db)
+    database.get_data_version(temp_db)
+    database.update_evaluation(1, "Should not merge", expected_version=1, db_path=temp_db)
+    database.delete_pair(2, temp_db)
+
+    statements = [
+        s.strip() for s in traced_queries
+        if s.strip().split()[0].upper() in ("SELECT", "UPDATE", "DELETE")
+    ]
+    assert len(statements) >= 8
+
+    for statement in statements:
+        for step in query_plan(temp_db, statement):
+            assert not (step.startswith("SCAN") and "INDEX" not in step), f"{step!r} in {statement}"
+
+
+def test_pair_list_is_ordered_by_index(temp_db, traced_queries):
+    """Test that listing pairs reads them in entity_name order without sorting."""
+    database.get_all_pairs(temp_db)
+
+    statement = next(s for s in traced_queries if "ORDER BY p.entity_name" in s)
+    plan = query_plan(temp_db, statement)
+
+    assert any("idx_entity_pairs_entity_name" in step for step in plan)
+    assert not any("TEMP B-TREE" in step for step in plan)
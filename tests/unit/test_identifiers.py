@@ -0,0 +1,41 @@
+"""Tests for equivalent identifier summaries and paging."""
+
+from src.nn_investigator import identifiers
+
+
+def clique(*curies):
+    return {
+        "id": {"identifier": curies[0]},
+        "equivalent_identifiers": [{"identifier": curie, "label": curie.lower()} for curie in curies],
+    }
+
+
+def test_get_prefix():
+    """Test extracting CURIE prefixes."""
+    assert identifiers.get_prefix("CHEBI:15377") == "CHEBI"
+    assert identifiers.get_prefix("PUBCHEM.COMPOUND:962") == "PUBCHEM.COMPOUND"
+    assert identifiers.get_prefix("noprefix") == "noprefix"
+
+
+def test_compare_prefixes():
+    """Test counting prefixes across two cliques."""
+    rows = identifiers.compare_prefixes(
+        clique("CHEBI:1", "MESH:D1", "MESH:D2"),
+        clique("DRUGBANK:DB1", "MESH:D3")
+    )
+
+    assert rows[0] == {"prefix": "MESH", "count_1": 2, "count_2": 1}
+    assert {"prefix": "DRUGBANK", "count_1": 0, "count_2": 1} in rows
+
+
+def test_page_identifiers():
+    """Test paging and prefix filtering."""
+    data = clique(*[f"MESH:D{i}" for i in range(5)], "CHEBI:1")
+
+    page = identifiers.page_identifiers(data, offset=2, limit=2)
+    assert page["total"] == 6
+    assert [e["identifier"] for e in page["identifiers"]] == ["MESH:D2", "MESH:D3"]
+
+    page = identifiers.page_identifiers(data, prefix="chebi")
+    assert page["total"] == 1
+    assert page["identifiers"][0]["identifier"] == "CHEBI:1"
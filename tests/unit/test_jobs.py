@@ -0,0 +1,250 @@
+"""Tests for the background job queue."""
+
+import os
+import tempfile
+import threading
+import time
+import pytest
+from src.nn_investigator import database
+from src.nn_investigator import jobs
+from src.nn_investigator.config import load_config
+from src.nn_investigator.nodenorm import NormalizationResult
+
+
+@pytest.fixture
+def config():
+    """App config using a temporary database."""
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    database.init_db(db_path)
+    yield {**load_config({}), "DATABASE": db_path}
+    os.unlink(db_path)
+
+
+@pytest.fixture
+def test_handler():
+    """Register a handler that reports progress and returns its params."""
+    @jobs.handler("test", "Test job")
+    def run(context, params):
+        for i in range(params.get("steps", 1)):
+            context.progress(i, params.get("steps", 1))
+            if params.get("fail"):
+                raise RuntimeError("boom")
+        return {"echo": params}
+
+    yield
+    del jobs.HANDLERS["test"]
+
+
+def test_job_lifecycle(config, test_handler):
+    """Test queuing, claiming and finishing a job."""
+    job_id = jobs.enqueue("test", {"steps": 3}, db_path=config["DATABASE"])
+    assert jobs.get_job(job_id, config["DATABASE"])["status"] == jobs.QUEUED
+
+    assert jobs.run_pending(config) == 1
+
+    job = jobs.get_job(job_id, config["DATABASE"])
+    assert job["status"] == jobs.SUCCEEDED
+    assert job["result"] == {"echo": {"steps": 3}}
+    assert (job["progress"], job["total"]) == (2, 3)
+    assert job["label"] == "Test job"
+
+
+def test_failed_job_records_error(config, test_handler):
+    """Test that an exception in a handler fails only that job."""
+    failing = jobs.enqueue("test", {"fail": True}, db_path=config["DATABASE"])
+    working = jobs.enqueue("test", db_path=config["DATABASE"])
+
+    assert jobs.run_pending(config) == 2
+
+    assert jobs.get_job(failing, config["DATABASE"])["error"] == "boom"
+    assert jobs.get_job(working, config["DATABASE"])["status"] == jobs.SUCCEEDED
+
+
+def test_enqueue_unknown_kind(config):
+    """Test that only registered job kinds can be queued."""
+    with pytest.raises(ValueError):
+        jobs.enqueue("nonexistent", db_path=config["DATABASE"])
+
+
+def test_cancel_queued_job(config, test_handler):
+    """Test that a queued job is cancelled without running."""
+    job_id = jobs.enqueue("test", db_path=config["DATABASE"])
+
+    assert jobs.cancel(job_id, config["DATABASE"]) is True
+    assert jobs.run_pending(config) == 0
+    assert jobs.get_job(job_id, config["DATABASE"])["status"] == jobs.CANCELLED
+    assert jobs.cancel(job_id, config["DATABASE"]) is False
+
+
+def test_cancel_running_job(config):
+    """Test that a running job stops at its next progress report."""
+    started = threading.Event()
+    proceed = threading.Event()
+
+    @jobs.handler("blocking", "Blocking job")
+    def run(context, params):
+        started.set()
+        proceed.wait(5)
+        context.progress(1, 2)
+        return {}
+
+    try:
+        job_id = jobs.enqueue("blocking", db_path=config["DATABASE"])
+        worker = jobs.JobWorker(config, poll_interval=0.01)
+        worker.start()
+
+        assert started.wait(5)
+        assert jobs.get_job(job_id, config["DATABASE"])["status"] == jobs.RUNNING
+        assert jobs.cancel(job_id, config["DATABASE"]) is True
+        proceed.set()
+
+        deadline = time.time() + 5
+        while jobs.get_job(job_id, config["DATABASE"])["status"] == jobs.RUNNING and time.time() < deadline:
+            time.sleep(0.01)
+        worker.stop()
+
+        assert jobs.get_job(job_id, config["DATABASE"])["status"] == jobs.CANCELLED
+    finally:
+        del jobs.HANDLERS["blocking"]
+
+
+def test_job_claimed_once(config, test_handler):
+    """Test that concurrent workers never claim the same job."""
+    for _ in range(20):
+        jobs.enqueue("test", db_path=config["DATABASE"])
+
+    claimed = []
+    lock = threading.Lock()
+
+    def claim_all():
+        while (job := jobs.claim_next(config["DATABASE"])) is not None:
+            with lock:
+                claimed.append(job["id"])
+
+    threads = [threading.Thread(target=claim_all) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == sorted(set(claimed))
+    assert len(claimed) == 20
+
+
+def test_stale_running_job_failed(config, test_handler):
+    """Test that a running job without progress for STALE_AFTER is failed when the next job is claimed."""
+    job_id = jobs.enqueue("test", db_path=config["DATABASE"])
+    assert jobs.claim_next(config["DATABASE"])["id"] == job_id
+    assert jobs.claim_next(config["DATABASE"]) is None
+
+    conn = database.get_connection(config["DATABASE"])
+    conn.execute("UPDATE jobs SET updated_at = datetime('now', ?) WHERE id = ?", (f"-{jobs.STALE_AFTER + 1} seconds", job_id))
+    conn.commit()
+    conn.close()
+
+    assert jobs.claim_next(config["DATABASE"]) is None
+    assert jobs.get_job(job_id, config["DATABASE"])["status"] == jobs.FAILED
+
+
+def test_import_pairs(config):
+    """Test importing pairs from a TSV file in batches."""
+    fd, path = tempfile.mkstemp(suffix=".tsv")
+    with os.fdopen(fd, "w") as f:
+        f.write("entity_name\tcurie_1\tcurie_1_label\tcurie_2\n")
+        f.write("first\tA:1\tAlpha\tB:1\n")
+        f.write("incomplete\tA:2\t\t\n")
+        f.write("second\tA:3\t\tB:3\n")
+
+    job_id = jobs.enqueue("import_pairs", {"path": path, "delete_after": True}, db_path=config["DATABASE"])
+    jobs.run_pending(config)
+
+    job = jobs.get_job(job_id, config["DATABASE"])
+    assert job["result"] == {"added": 2, "skipped": 1}
+    assert (job["progress"], job["total"]) == (3, 3)
+    assert not os.path.exists(path)
+
+    pairs = database.get_all_pairs(config["DATABASE"])
+    assert [pair["entity_name"] for pair in pairs] == ["first", "second"]
+    assert pairs[0]["curie_1_label"] == "Alpha"
+    assert pairs[1]["curie_1_label"] is None
+
+
+def test_import_pairs_missing_columns(config):
+    """Test that a file without the required columns fails the job."""
+    fd, path = tempfile.mkstemp(suffix=".tsv")
+    with os.fdopen(fd, "w") as f:
+        f.write("name\tcurie_1\n")
+
+    try:
+        job_id = jobs.enqueue("import_pairs", {"path": path}, db_path=config["DATABASE"])
+        jobs.run_pending(config)
+
+        job = jobs.get_job(job_id, config["DATABASE"])
+        assert job["status"] == jobs.FAILED
+        assert "curie_2" in job["error"]
+    finally:
+        os.unlink(path)
+
+
+@pytest.fixture
+def outage_backend(monkeypatch):
+    """A backend that resolves every CURIE until outage is set, then only the "cached" P:1 and P:2."""
+    class Backend:
+        name = "test"
+        outage = False
+
+        def normalize_curies(self, curies, conflate=True, drug_chemical_conflate=True):
+            if not self.outage:
+                return NormalizationResult({curie: {"id": {"identifier": curie}} for curie in curies})
+            return NormalizationResult(
+                {curie: {"id": {"identifier": curie}} if curie in ("P:1", "P:2") else None for curie in curies},
+                stale=True,
+                fetched_at=time.time(),
+                error="connection refused"
+            )
+
+    backend = Backend()
+    monkeypatch.setattr(jobs, "_build_backend", lambda config: backend)
+    return backend
+
+
+def test_snapshots_skip_pairs_lost_to_an_outage(config, outage_backend):
+    """Test that a partial outage keeps the stored snapshots and clique membership of the pairs it could not resolve."""
+    database.add_pair("cached", "P:1", "P:2", db_path=config["DATABASE"])
+    database.add_pair("uncached", "P:1", "P:3", db_path=config["DATABASE"])
+    jobs.enqueue("snapshots", {"scope": "all"}, db_path=config["DATABASE"])
+    jobs.run_pending(config)
+    members = database.get_clique_members(config["DATABASE"])
+
+    outage_backend.outage = True
+    job_id = jobs.enqueue("snapshots", {"scope": "all"}, db_path=config["DATABASE"])
+    jobs.run_pending(config)
+
+    assert jobs.get_job(job_id, config["DATABASE"])["result"] == {"pairs": 1, "skipped": 1, "error": "connection refused"}
+    assert database.get_clique_members(config["DATABASE"]) == members
+    assert all(snapshot["preferred_2"] for snapshot in database.get_snapshots(config["DATABASE"]).values())
+
+
+def test_overlap_report_records_outage(config, outage_backend):
+    """Test that the overlap report says when some pairs could not be normalized."""
+    database.add_pair("uncached", "P:1", "P:3", db_path=config["DATABASE"])
+    outage_backend.outage = True
+    job_id = jobs.enqueue("overlap", db_path=config["DATABASE"])
+    jobs.run_pending(config)
+
+    result = jobs.get_job(job_id, config["DATABASE"])["result"]
+    assert result["error"] == "connection refused"
+    assert result["rows"][0]["preferred_2"] is None
+    assert database.get_snapshots(config["DATABASE"]) == {}
+
+
+def test_overlap_report_refreshes_snapshots(config, outage_backend):
+    """Test that the pairs normalized for the overlap report update the clique membership index."""
+    first = database.add_pair("first", "P:1", "P:2", db_path=config["DATABASE"])
+    second = database.add_pair("second", "P:2", "P:3", db_path=config["DATABASE"])
+    jobs.enqueue("overlap", db_path=config["DATABASE"])
+    jobs.run_pending(config)
+
+    assert set(database.get_snapshots(config["DATABASE"])) == {first, second}
+    assert [pair["id"] for pair in database.get_related_pairs(first, config["DATABASE"])] == [second]
@@ -0,0 +1,119 @@
+"""Tests for the memory-mapped local clique index."""
+
+import json
+import threading
+import time
+import pytest
+from src.nn_investigator import local_index
+from src.nn_investigator.local_index import LocalCliqueIndex, build_index, to_normalized
+
+
+BABEL_CLIQUES = [
+    {"type": "biolink:SmallMolecule", "preferred_name": "Water",
+     "identifiers": [{"i": "CHEBI:15377", "l": "water"}, {"i": "MESH:D014867", "l": "Water"}]},
+    {"type": "biolink:Disease", "preferred_name": "amyotrophic lateral sclerosis",
+     "identifiers": [{"i": "MONDO:0004976", "l": "ALS"}, {"i": "NCIT:C34373"}]},
+]
+
+NODENORM_CLIQUE = {
+    "id": {"identifier": "UMLS:C5447474", "label": "lovotibeglogene autotemcel"},
+    "equivalent_identifiers": [{"identifier": "UMLS:C5447474", "label": "lovotibeglogene autotemcel"}],
+    "type": ["biolink:Drug"],
+}
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    """Build an index over two small dump files."""
+    babel = tmp_path / "babel.jsonl"
+    babel.write_text("".join(json.dumps(clique) + "\n" for clique in BABEL_CLIQUES))
+    nodenorm_dump = tmp_path / "nodenorm.jsonl"
+    nodenorm_dump.write_text(json.dumps(NODENORM_CLIQUE) + "\n")
+
+    path = tmp_path / "cliques.idx"
+    # A tiny chunk size exercises the external merge
+    count = build_index([str(babel), str(nodenorm_dump)], str(path), chunk_size=2)
+    assert count == 5
+    return str(path)
+
+
+def test_index_is_sorted(index_path):
+    """Test that index entries are sorted by CURIE."""
+    with open(index_path) as f:
+        lines = f.read().splitlines()[1:]
+
+    curies = [line.split("\t")[0] for line in lines]
+    assert curies == sorted(curies)
+
+
+def test_lookup_babel_record(index_path):
+    """Test finding a clique by any of its identifiers."""
+    with LocalCliqueIndex(index_path) as index:
+        water = index.lookup("MESH:D014867")
+
+    assert water["id"] == {"identifier": "CHEBI:15377", "label": "Water"}
+    assert water["type"] == ["biolink:SmallMolecule"]
+    assert [e["identifier"] for e in water["equivalent_identifiers"]] == ["CHEBI:15377", "MESH:D014867"]
+
+
+def test_normalize_curies_matches_nodenorm_shape(index_path):
+    """Test the normalize_curies interface across both dump formats."""
+    with LocalCliqueIndex(index_path) as index:
+        result = index.normalize_curies(["NCIT:C34373", "UMLS:C5447474", "FAKE:1", "CHEBI:15377"])
+
+    assert result["NCIT:C34373"]["id"]["identifier"] == "MONDO:0004976"
+    assert result["UMLS:C5447474"] == NODENORM_CLIQUE
+    assert result["FAKE:1"] is None
+    assert result["CHEBI:15377"]["id"]["identifier"] == "CHEBI:15377"
+
+
+def test_concurrent_lookups_map_each_dump_once(index_path, monkeypatch):
+    """Test that threads sharing an index do not each map (and leak) the same dump file."""
+    maps = []
+    real_mmap = local_index.mmap.mmap
+
+    def slow_mmap(*args, **kwargs):
+        time.sleep(0.01)
+        mapped = real_mmap(*args, **kwargs)
+        maps.append(mapped)
+        return mapped
+
+    with LocalCliqueIndex(index_path) as index:
+        monkeypatch.setattr(local_index.mmap, "mmap", slow_mmap)
+        barrier = threading.Barrier(8)
+
+        def lookup():
+            barrier.wait()
+            assert index.lookup("CHEBI:15377")["id"]["identifier"] == "CHEBI:15377"
+
+        threads = [threading.Thread(target=lookup) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert len(maps) == 1
+
+
+@pytest.mark.parametrize("curie", ["A:0", "CHEBI:1537", "CHEBI:153770", "ZZZ:9", "MONDO:0004976x"])
+def test_lookup_missing(index_path, curie):
+    """Test that CURIEs before, between and after indexed keys are not found."""
+    with LocalCliqueIndex(index_path) as index:
+        assert index.lookup(curie) is None
+
+
+def test_empty_index(tmp_path):
+    """Test an index over an empty dump."""
+    dump = tmp_path / "empty.jsonl"
+    dump.write_text("")
+    path = tmp_path / "empty.idx"
+
+    assert build_index([str(dump)], str(path)) == 0
+    with LocalCliqueIndex(str(path)) as index:
+        assert index.lookup("CHEBI:15377") is None
+
+
+def test_to_normalized_without_preferred_name():
+    """Test that the first identifier's label is used when there is no preferred name."""
+    clique = to_normalized({"type": "biolink:Gene", "identifiers": [{"i": "NCBIGene:1", "l": "A1BG"}]})
+    assert clique["id"] == {"identifier": "NCBIGene:1", "label": "A1BG"}
@@ -0,0 +1,89 @@
+"""Tests for clique overlap analysis."""
+
+import pytest
+from src.nn_investigator import overlap
+
+
+def clique(preferred, *members):
+    """Build a normalization result from (identifier, label) tuples."""
+    return {
+        "id": {"identifier": preferred, "label": members[0][1]},
+        "equivalent_identifiers": [{"identifier": i, "label": label} for i, label in members],
+    }
+
+
+SPLIT_1 = clique("UMLS:C1", ("UMLS:C1", "Lebrikizumab"), ("MESH:C2", "lebrikizumab"))
+SPLIT_2 = clique("DRUGBANK:DB1", ("DRUGBANK:DB1", "Lebrikizumab"), ("UNII:U1", "LEBRIKIZUMAB"))
+UNRELATED = clique("CHEBI:15377", ("CHEBI:15377", "water"), ("MESH:D014867", "Water"))
+
+
+def test_interner_round_trip():
+    """Test that interned IDs are stable and reversible."""
+    interner = overlap.Interner()
+    a = interner.intern("CHEBI:1")
+    assert interner.intern("CHEBI:1") == a
+    assert interner.intern("CHEBI:2") != a
+    assert interner.lookup(a) == "CHEBI:1"
+
+
+def test_analyze_overlap_split():
+    """Test that two cliques with the same labels score as a likely split."""
+    result = overlap.analyze_overlap(SPLIT_1, SPLIT_2)
+
+    assert result["same_clique"] is False
+    assert result["shared_count"] == 0
+    assert result["label_token_jaccard"] == 1.0
+    assert result["near_duplicate_labels"] == ["lebrikizumab"]
+    assert result["split_score"] == pytest.approx(0.8)
+
+
+def test_analyze_overlap_unrelated():
+    """Test that unrelated cliques score low."""
+    result = overlap.analyze_overlap(SPLIT_1, UNRELATED)
+
+    assert result["label_token_jaccard"] == 0.0
+    assert result["near_duplicate_labels"] == []
+    assert result["shared_prefixes"] == ["MESH"]
+    assert result["split_score"] == 0.0
+
+
+def test_analyze_overlap_same_clique():
+    """Test that a clique compared with itself is not a split."""
+    result = overlap.analyze_overlap(SPLIT_1, SPLIT_1)
+
+    assert result["same_clique"] is True
+    assert result["shared"] == ["MESH:C2", "UMLS:C1"]
+    assert result["identifier_jaccard"] == 1.0
+    assert result["split_score"] == 0.0
+
+
+def test_analyze_overlap_missing_side():
+    """Test comparing with a CURIE that did not normalize."""
+    result = overlap.analyze_overlap(SPLIT_1, None)
+
+    assert result["only_1_count"] == 2
+    assert result["split_score"] == 0.0
+
+
+def test_analyze_pairs():
+    """Test bulk analysis over many pairs."""
+    pairs = [
+        {"id": 1, "entity_name": "lebrikizumab", "curie_1": "MESH:C2", "curie_2": "UNII:U1"},
+        {"id": 2, "entity_name": "water", "curie_1": "MESH:D014867", "curie_2": "MESH:C2"},
+        {"id": 3, "entity_name": "dangling", "curie_1": "FAKE:1", "curie_2": "UNII:U1"},
+    ]
+    norm_results = {
+        "MESH:C2": SPLIT_1,
+        "UNII:U1": SPLIT_2,
+        "MESH:D014867": UNRELATED,
+        "FAKE:1": None,
+    }
+
+    rows = overlap.analyze_pairs(pairs, norm_results)
+
+    assert [row["id"] for row in rows] == [1, 2, 3]
+    assert rows[0]["preferred_1"] == "UMLS:C1"
+    assert rows[0]["preferred_2"] == "DRUGBANK:DB1"
+    assert rows[0]["split_score"] > rows[1]["split_score"]
+    assert rows[2]["preferred_1"] is None
+    assert rows[2]["split_score"] == 0.0
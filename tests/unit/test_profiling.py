@@ -0,0 +1,111 @@
+"""Tests for request profiling."""
+
+import os
+import tempfile
+import threading
+import time
+import pytest
+from src.nn_investigator import database
+from src.nn_investigator import profiling
+
+
+@pytest.fixture
+def temp_db():
+    """Create a temporary database."""
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    database.init_db(db_path)
+    yield db_path
+    os.unlink(db_path)
+
+
+def busy(seconds):
+    """Spin for a while so profilers have something to see."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+@pytest.mark.skipif(not profiling.CPROFILE_PER_THREAD, reason="cProfile sees every thread on Python 3.12+")
+def test_cprofile_capture_includes_followed_thread():
+    """Test that cProfile captures the request thread and work it hands to other threads."""
+    capture = profiling.start("cprofile")
+    busy(0.01)
+    thread = threading.Thread(target=capture.follow(busy), args=(0.01,))
+    thread.start()
+    thread.join()
+    capture.stop()
+
+    rows = {row["function"]: row for row in capture.top_functions(50)}
+    busy_row = next(row for name, row in rows.items() if name.endswith("(busy)"))
+    assert busy_row["calls"] == 2
+    assert busy_row["total_seconds"] >= 0.02
+
+
+def test_sample_capture_sees_hot_function():
+    """Test that the stack sampler attributes time to the function that was running."""
+    capture = profiling.start("sample", interval=0.001)
+    busy(0.05)
+    capture.stop()
+
+    rows = capture.top_functions(5)
+    assert capture.samples > 0
+    assert any(row["function"].endswith("(busy)") for row in rows)
+    assert all(row["calls"] is None for row in rows)
+
+    # Stopped captures no longer collect samples
+    samples = capture.samples
+    busy(0.01)
+    assert capture.samples == samples
+
+
+def test_cprofile_falls_back_to_sampling(monkeypatch):
+    """Test that cProfile is not used where it would record other threads."""
+    monkeypatch.setattr(profiling, "CPROFILE_PER_THREAD", False)
+    capture = profiling.start("cprofile")
+    capture.stop()
+    assert capture.mode == "sample"
+
+
+def test_start_rejects_unknown_mode():
+    """Test that an unknown mode is an error."""
+    with pytest.raises(ValueError):
+        profiling.start("perf")
+
+
+def test_save_and_list_profiles(temp_db):
+    """Test storing profiles, pruning old ones and filtering by route."""
+    for i in range(4):
+        profiling.save_profile({
+            "method": "GET",
+            "path": f"/pair/{i}",
+            "endpoint": "investigate_pair" if i % 2 else "index",
+            "pair_id": i,
+            "status": 200,
+            "duration_ms": 10.0 * i,
+            "mode": "cprofile",
+            "reason": "sampled",
+            "functions": [{"function": "f", "calls": 1, "self_seconds": 0.5, "total_seconds": 1.0}],
+        }, keep=3, db_path=temp_db)
+
+    profiles = profiling.list_profiles(db_path=temp_db)
+    assert [p["pair_id"] for p in profiles] == [3, 2, 1]
+    assert profiles[0]["functions"][0]["function"] == "f"
+
+    assert [p["pair_id"] for p in profiling.list_profiles(endpoint="investigate_pair", db_path=temp_db)] == [3, 1]
+    assert profiling.get_profile(profiles[0]["id"], db_path=temp_db)["path"] == "/pair/3"
+    assert profiling.get_profile(999, db_path=temp_db) is None
+
+
+def test_hot_functions_adds_up_profiles():
+    """Test that hot functions are summed over profiles."""
+    profiles = [
+        {"functions": [{"function": "a", "self_seconds": 1.0, "total_seconds": 2.0},
+                       {"function": "b", "self_seconds": 3.0, "total_seconds": 3.0}]},
+        {"functions": [{"function": "a", "self_seconds": 2.5, "total_seconds": 2.5}]},
+    ]
+
+    hot = profiling.hot_functions(profiles)
+    assert [row["function"] for row in hot] == ["a", "b"]
+    assert hot[0]["self_seconds"] == 3.5
+    assert hot[0]["profiles"] == 2
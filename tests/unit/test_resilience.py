@@ -0,0 +1,162 @@
+"""Tests for the circuit breaker and stale cache fallback."""
+
+import pytest
+import tempfile
+import time
+import os
+import requests
+from src.nn_investigator import nodenorm
+from src.nn_investigator.cache import SQLiteCache
+from src.nn_investigator.resilience import CircuitBreaker, CircuitOpenError, call_with_deadline
+
+
+def fail():
+    raise requests.ConnectionError("connection refused")
+
+
+def http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(response=response)
+
+
+@pytest.fixture
+def cache():
+    """Create a cache backed by a temporary file."""
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    yield SQLiteCache(path, ttl=60)
+    os.unlink(path)
+
+
+def test_breaker_opens_after_threshold():
+    """Test that the circuit opens after consecutive failures."""
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            breaker.call(fail)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "not called")
+
+
+def test_breaker_success_resets_failures():
+    """Test that a success in between failures keeps the circuit closed."""
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+
+    with pytest.raises(requests.ConnectionError):
+        breaker.call(fail)
+    assert breaker.call(lambda: "ok") == "ok"
+    with pytest.raises(requests.ConnectionError):
+        breaker.call(fail)
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_half_open_trial():
+    """Test that a successful trial call after the reset timeout closes the circuit."""
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01)
+
+    with pytest.raises(requests.ConnectionError):
+        breaker.call(fail)
+    time.sleep(0.02)
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_ignores_client_errors():
+    """Test that 4xx responses do not count as upstream failures."""
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=60)
+
+    def bad_request():
+        raise http_error(400)
+
+    with pytest.raises(requests.HTTPError):
+        breaker.call(bad_request)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    def server_error():
+        raise http_error(502)
+
+    with pytest.raises(requests.HTTPError):
+        breaker.call(server_error)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_stale_entries_served_and_refreshed(cache, monkeypatch):
+    """Test that expired entries are returned as stale and refreshed in the background."""
+    cache.set("nodenorm:11:A:1", {"id": {"identifier": "OLD:1"}})
+    cache.ttl = -1
+
+    def normalize_curies(curies, **kwargs):
+        return {curie: {"id": {"identifier": "NEW:1"}} for curie in curies}
+
+    monkeypatch.setattr(nodenorm, "normalize_curies", normalize_curies)
+
+    result = nodenorm.normalize_curies_cached(["A:1"], cache)
+    assert result.stale is True
+    assert result["A:1"]["id"]["identifier"] == "OLD:1"
+
+    deadline = time.time() + 2
+    while cache.get_entries(["nodenorm:11:A:1"])["nodenorm:11:A:1"][0]["id"]["identifier"] != "NEW:1":
+        assert time.time() < deadline, "background refresh did not complete"
+        time.sleep(0.01)
+
+
+def test_stale_entries_survive_upstream_outage(cache, monkeypatch):
+    """Test that stale entries are still served when the refresh fails."""
+    cache.set("nodenorm:11:A:1", {"id": {"identifier": "OLD:1"}})
+    cache.ttl = -1
+
+    monkeypatch.setattr(nodenorm, "normalize_curies", lambda curies, **kwargs: fail())
+
+    result = nodenorm.normalize_curies_cached(["A:1"], cache)
+    assert result.stale is True
+    assert result["A:1"]["id"]["identifier"] == "OLD:1"
+
+    # Let the failing background refresh finish before the client is restored
+    deadline = time.time() + 2
+    while nodenorm._refreshing:
+        assert time.time() < deadline, "background refresh did not finish"
+        time.sleep(0.01)
+
+
+def test_uncached_curies_raise_on_outage(cache, monkeypatch):
+    """Test that an outage is reported when nothing is cached."""
+    monkeypatch.setattr(nodenorm, "normalize_curies", lambda curies, **kwargs: fail())
+
+    with pytest.raises(requests.ConnectionError):
+        nodenorm.normalize_curies_cached(["A:1"], cache)
+
+
+def test_cached_curies_survive_partial_outage(cache, monkeypatch):
+    """Test that cached entries are returned when the uncached CURIEs cannot be fetched."""
+    cache.set("nodenorm:11:A:1", {"id": {"identifier": "OLD:1"}})
+    monkeypatch.setattr(nodenorm, "normalize_curies", lambda curies, **kwargs: fail())
+
+    result = nodenorm.normalize_curies_cached(["A:1", "B:1"], cache)
+    assert result["A:1"]["id"]["identifier"] == "OLD:1"
+    assert result["B:1"] is None
+    assert result.stale is True
+    assert result.fetched_at is not None
+    assert "connection refused" in result.error
+
+    # The unknown CURIE is not cached as unresolvable
+    assert "nodenorm:11:B:1" not in cache.get_entries(["nodenorm:11:B:1"])
+
+
+def test_call_with_deadline():
+    """Test that a call is abandoned at its deadline however it is progressing."""
+    assert call_with_deadline(lambda x: x * 2, 1, 21) == 42
+
+    start = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        call_with_deadline(time.sleep, 0.05, 0.5)
+    assert time.monotonic() - start < 0.4
+
+    with pytest.raises(ValueError):
+        call_with_deadline(int, 1, "not a number")
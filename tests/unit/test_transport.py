@@ -0,0 +1,122 @@
+"""Tests for the record/replay HTTP transport."""
+
+import os
+import tempfile
+import time
+import pytest
+import requests
+from src.nn_investigator import nameres
+from src.nn_investigator import nodenorm
+from src.nn_investigator import transport
+
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+        self.text = str(body)
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeTransport:
+    """Answers every request with the CURIEs it was asked about, counting calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def post(self, url, json=None, params=None, timeout=None):
+        self.calls += 1
+        if json and "curies" in json:
+            return FakeResponse(200, {curie: {"id": {"identifier": curie}} for curie in json["curies"]})
+        return FakeResponse(200, [{"curie": "MONDO:1", "call": self.calls}])
+
+
+@pytest.fixture
+def cassette_path():
+    """Path for a cassette that does not exist yet."""
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "cassette.json")
+    yield path
+    if os.path.exists(path):
+        os.unlink(path)
+    os.rmdir(directory)
+
+
+def test_record_then_replay(cassette_path):
+    """Test that recorded client calls replay without the network."""
+    fake = FakeTransport()
+    cassette = transport.Cassette(cassette_path)
+    with transport.use_transport(transport.RecordingTransport(cassette, inner=fake)):
+        recorded = nodenorm.normalize_curies(["A:1", "B:2"])
+    cassette.save()
+
+    assert fake.calls == 1
+    assert len(transport.Cassette(cassette_path)) == 1
+
+    with transport.use_transport(transport.ReplayTransport(transport.Cassette(cassette_path), latency=0)):
+        assert nodenorm.normalize_curies(["A:1", "B:2"]) == recorded
+
+        # A different request body is not a match
+        with pytest.raises(transport.CassetteMissError):
+            nodenorm.normalize_curies(["A:1"])
+
+    assert isinstance(transport.get_transport(), transport.HttpTransport)
+
+
+def test_repeated_requests_replay_in_order(cassette_path):
+    """Test that the same request recorded twice replays both responses, then the last."""
+    fake = FakeTransport()
+    cassette = transport.Cassette(cassette_path)
+    with transport.use_transport(transport.RecordingTransport(cassette, inner=fake)):
+        nameres.lookup("asthma", limit=1, base_url="https://nameres.example.org")
+        nameres.lookup("asthma", limit=1, base_url="https://nameres.example.org")
+
+    with transport.use_transport(transport.ReplayTransport(cassette, latency=0)):
+        calls = [nameres.lookup("asthma", limit=1, base_url="https://nameres.example.org")[0]["call"] for _ in range(3)]
+
+    assert calls == [1, 2, 2]
+
+
+def test_replay_latency(cassette_path):
+    """Test replaying at a multiple of the recorded latency."""
+    cassette = transport.Cassette(cassette_path)
+    request = {"method": "POST", "url": "https://example.org", "params": {}, "json": {"curies": []}}
+    cassette.add(request, {"status": 200, "body": {}, "elapsed": 0.05})
+
+    replay = transport.ReplayTransport(cassette, latency=2)
+    start = time.perf_counter()
+    replay.post("https://example.org", json={"curies": []})
+    assert time.perf_counter() - start >= 0.1
+
+
+def test_replayed_error_status(cassette_path):
+    """Test that a recorded server error raises like a live one."""
+    cassette = transport.Cassette(cassette_path)
+    request = {"method": "POST", "url": nodenorm.NODENORM_URL + "?down", "params": {}, "json": None}
+    cassette.add(request, {"status": 502, "body": "Bad Gateway", "elapsed": 0})
+
+    response = transport.ReplayTransport(cassette, latency=0).post(nodenorm.NODENORM_URL + "?down")
+    with pytest.raises(requests.HTTPError) as excinfo:
+        response.raise_for_status()
+    assert excinfo.value.response.status_code == 502
+
+
+def test_from_config(cassette_path):
+    """Test building transports from the app config."""
+    assert transport.from_config({"HTTP_MODE": ""}) is None
+    assert isinstance(
+        transport.from_config({"HTTP_MODE": "record", "HTTP_CASSETTE": cassette_path}),
+        transport.RecordingTransport
+    )
+    replay = transport.from_config({"HTTP_MODE": "replay", "HTTP_CASSETTE": cassette_path, "HTTP_REPLAY_LATENCY": 0.0})
+    assert replay.latency == 0.0
+
+    with pytest.raises(ValueError):
+        transport.from_config({"HTTP_MODE": "replay", "HTTP_CASSETTE": ""})
+    with pytest.raises(ValueError):
+        transport.from_config({"HTTP_MODE": "sometimes"})
@@ -0,0 +1,62 @@
+"""Tests for clique snapshots and evaluation suggestions."""
+
+from src.nn_investigator import triage
+
+
+def clique(curie, types, label=None):
+    return {"id": {"identifier": curie, "label": label}, "type": types}
+
+
+def test_build_snapshot_same_clique():
+    """Test snapshotting a pair whose CURIEs share a clique."""
+    pair = {"id": 1, "curie_1": "A:1", "curie_2": "B:1"}
+    results = {"A:1": clique("A:1", ["biolink:SmallMolecule", "biolink:ChemicalEntity"], "aspirin"), "B:1": clique("A:1", [])}
+
+    snapshot = triage.build_snapshot(pair, results)
+
+    assert snapshot == {
+        "pair_id": 1,
+        "preferred_1": "A:1", "label_1": "aspirin", "type_1": "biolink:SmallMolecule",
+        "preferred_2": "A:1", "label_2": None, "type_2": None,
+        "same_clique": True,
+        "suggestion": None,
+    }
+
+
+def test_build_snapshot_unnormalized():
+    """Test that CURIEs that did not normalize are never in the same clique."""
+    snapshot = triage.build_snapshot({"id": 1, "curie_1": "A:1", "curie_2": "B:1"}, {"A:1": None})
+
+    assert snapshot["preferred_1"] is None and snapshot["preferred_2"] is None
+    assert snapshot["same_clique"] is False
+
+
+def test_suggest_evaluation_for_cell_chemical_mismatch():
+    """Test that a cell/chemical type mismatch is suggested."""
+    cell = clique("CL:1", ["biolink:Cell"])
+    chemical = clique("CHEBI:1", ["biolink:ChemicalEntity"])
+
+    assert triage.suggest_evaluation(cell, chemical) == "Different types (cell/chemical)"
+    assert triage.suggest_evaluation(chemical, cell) == "Different types (cell/chemical)"
+    assert triage.suggest_evaluation(chemical, chemical) is None
+    assert triage.suggest_evaluation(cell, None) is None
+    assert triage.suggest_evaluation(cell, chemical) in triage.EVALUATIONS
+
+
+def test_group_pairs_links_shared_cliques():
+    """Test that pairs sharing a clique, directly or through another pair, form one group."""
+    members = [
+        ("UMLS:1", 1), ("CHEMBL:1", 1),
+        ("UMLS:1", 2), ("CHEMBL:2", 2),
+        ("CHEMBL:2", 3), ("MESH:3", 3),
+        ("CHEMBL:9", 4), ("MESH:9", 4),
+        ("CHEMBL:5", 5), ("CHEMBL:5", 6),
+    ]
+
+    groups = triage.group_pairs(members)
+
+    assert groups == [
+        {"pair_ids": [1, 2, 3], "preferred_ids": ["CHEMBL:2", "UMLS:1"]},
+        {"pair_ids": [5, 6], "preferred_ids": ["CHEMBL:5"]},
+    ]
+    assert triage.group_pairs([]) == []